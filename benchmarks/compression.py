@@ -0,0 +1,63 @@
+"""
+Bytes on the wire and decompression time per summary response with and
+without compression, against the local mock server.
+
+Usage::
+
+    $ python -m benchmarks.compression --payload-size 8192 --queries 500
+"""
+
+import argparse
+import json
+from unittest import mock
+
+import wikinode
+from wikinode import decoding
+from wikinode.client import Client
+from wikinode.instrument import Instruments
+from wikinode.ratelimit import RateLimiter
+from benchmarks.server import MockServer
+
+
+def measure(server, accept_encoding, queries):
+    instruments = Instruments()
+    client = Client(
+        headers={"Accept-Encoding": accept_encoding},
+        limiter=RateLimiter(rate=1e9, burst=1e9),
+        instruments=instruments,
+    )
+    with mock.patch("wikinode.summary.API_URL", server.api_url):
+        for i in range(queries):
+            wikinode.fetch(f"Page {i}", client=client)
+    snapshot = instruments.snapshot()
+    return {
+        "wire_bytes_per_response": snapshot["wire_bytes"] / queries,
+        "body_bytes_per_response": snapshot["body_bytes"] / queries,
+        "decompress_us_per_response": (
+            snapshot["decompress_seconds"] / queries * 1e6
+        ),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--payload-size", type=int, default=8192)
+    parser.add_argument("--queries", type=int, default=500)
+    options = parser.parse_args(argv)
+    encodings = ["identity"] + decoding.ACCEPT_ENCODING.split(", ")
+    encodings.remove("deflate")
+    with MockServer(payload_size=options.payload_size) as server:
+        report = {
+            encoding: measure(server, encoding, options.queries)
+            for encoding in encodings
+        }
+    identity = report["identity"]["wire_bytes_per_response"]
+    for result in report.values():
+        result["saved_wire_ratio"] = (
+            1 - result["wire_bytes_per_response"] / identity
+        )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+CPU time spent decoding one summary response, before and after the
+decoding path of :py:mod:`wikinode.decoding`.
+
+Usage::
+
+    $ python -m benchmarks.decode --payload-size 8192
+"""
+
+import argparse
+import json
+import time
+
+from wikinode import decoding
+from wikinode.fields import default_fields
+from benchmarks.server import make_payload
+
+
+def stdlib_full(content):
+    data = json.loads(content)
+    return {k: data[k] for k in data if k in default_fields}
+
+
+def selective(content):
+    return decoding.keep_fields(
+        decoding.loads(content), ("type", *default_fields)
+    )
+
+
+def cpu_per_call(decode, content, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        decode(content)
+    return (time.process_time() - start) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--payload-size", type=int, default=4096)
+    parser.add_argument("--repeat", type=int, default=20000)
+    options = parser.parse_args(argv)
+    content = json.dumps(
+        make_payload("Hello world", options.payload_size)
+    ).encode()
+    before = cpu_per_call(stdlib_full, content, options.repeat)
+    after = cpu_per_call(selective, content, options.repeat)
+    report = {
+        "backend": "orjson" if decoding.orjson is not None else "json",
+        "payload_bytes": len(content),
+        "stdlib_us_per_response": before * 1e6,
+        "wikinode_us_per_response": after * 1e6,
+        "saved_us_per_response": (before - after) * 1e6,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
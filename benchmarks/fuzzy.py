@@ -0,0 +1,120 @@
+"""
+Memory and latency of resolving misspelled and partial queries with a
+title index.
+
+Without *--titles*, a dump of synthetic titles, with words drawn from a
+Zipf-distributed vocabulary like those of Wikipedia, is written first.
+17 million titles is about the size of the English Wikipedia's.
+
+Usage::
+
+    $ python -m benchmarks.fuzzy --count 17000000
+    $ python -m benchmarks.fuzzy --titles enwiki-latest-all-titles-in-ns0.gz
+"""
+
+import argparse
+import gzip
+import itertools
+import json
+import os
+import random
+import resource
+import string
+import tempfile
+import time
+
+from wikinode.fuzzy import TitleIndex
+
+
+VOCABULARY = 200000
+
+
+def make_words(count):
+    return [
+        "".join(random.choices(string.ascii_lowercase, k=random.randint(2, 9)))
+        for _ in range(count)
+    ]
+
+
+def write_titles(path, count):
+    words = make_words(VOCABULARY)
+    weights = list(
+        itertools.accumulate(1 / rank for rank in range(1, VOCABULARY + 1))
+    )
+    with gzip.open(path, "wt", encoding="UTF-8", compresslevel=1) as dump:
+        dump.write("page_title\n")
+        for _ in range(count):
+            title = random.choices(
+                words, cum_weights=weights, k=random.randint(1, 4)
+            )
+            dump.write("_".join(title).capitalize() + "\n")
+
+
+def sample_titles(path, size):
+    """Return *size* titles of the dump at *path*, sampled uniformly."""
+    sample = []
+    with gzip.open(path, "rt", encoding="UTF-8") as lines:
+        next(lines)
+        for number, line in enumerate(lines):
+            if number < size:
+                sample.append(line.strip())
+                continue
+            slot = random.randrange(number + 1)
+            if slot < size:
+                sample[slot] = line.strip()
+    return [title.replace("_", " ") for title in sample]
+
+
+def typo(title):
+    """Swap two adjacent letters of *title*, past its first two."""
+    if len(title) < 4:
+        return title
+    position = random.randrange(2, len(title) - 1)
+    chars = list(title)
+    chars[position], chars[position + 1] = chars[position + 1], chars[position]
+    return "".join(chars)
+
+
+def per_call(resolve, queries):
+    start = time.perf_counter()
+    for query in queries:
+        resolve(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def max_rss_bytes():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--count", type=int, default=1000000)
+    parser.add_argument("--titles", help="titles dump to load instead")
+    parser.add_argument("--repeat", type=int, default=1000)
+    options = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as directory:
+        path = options.titles
+        if path is None:
+            path = os.path.join(directory, "titles.gz")
+            write_titles(path, options.count)
+        sample = sample_titles(path, options.repeat)
+        rss = max_rss_bytes()
+        start = time.perf_counter()
+        index = TitleIndex.from_file(path)
+        build_seconds = time.perf_counter() - start
+    report = {
+        "titles": len(index),
+        "build_seconds": build_seconds,
+        "index_bytes": index.nbytes,
+        "bytes_per_title": index.nbytes / len(index),
+        "build_peak_rss_bytes": max_rss_bytes() - rss,
+        "exact_us": per_call(index.resolve, sample) * 1e6,
+        "prefix_us": per_call(index.resolve, [t[:-2] for t in sample]) * 1e6,
+        "typo_us": per_call(index.resolve, [typo(t) for t in sample]) * 1e6,
+        "resolved_rate": index.resolved_rate,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
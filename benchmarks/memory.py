@@ -0,0 +1,54 @@
+"""
+Memory taken by summary results kept in memory, dicts vs compact
+:py:class:`wikinode.Summary` objects.
+
+Usage::
+
+    $ python -m benchmarks.memory --count 1000000
+"""
+
+import argparse
+import json
+import tracemalloc
+
+from wikinode.summary import _parse_summary
+from benchmarks.server import make_payload
+
+
+def measure(count, compact, payload_size):
+    payloads = [make_payload(f"Page {i}", payload_size) for i in range(1000)]
+    # queries and payload strings exist before results are built
+    queries = [f"query {i}" for i in range(count)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    results = [
+        _parse_summary(payloads[i % 1000], query=query, compact=compact)
+        for i, query in enumerate(queries)
+    ]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del results
+    return after - before
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--count", type=int, default=1000000)
+    parser.add_argument("--payload-size", type=int, default=2048)
+    options = parser.parse_args(argv)
+    per_million = 1000000 / options.count
+    dicts = measure(options.count, False, options.payload_size)
+    compact = measure(options.count, True, options.payload_size)
+    report = {
+        "count": options.count,
+        "dict_mb_per_million": dicts * per_million / 2**20,
+        "compact_mb_per_million": compact * per_million / 2**20,
+        "saved_mb_per_million": (dicts - compact) * per_million / 2**20,
+        "dict_bytes_per_result": dicts / options.count,
+        "compact_bytes_per_result": compact / options.count,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
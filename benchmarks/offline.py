@@ -0,0 +1,60 @@
+"""
+Build time, size and lookup latency of an offline summary index.
+
+Usage::
+
+    $ python -m benchmarks.offline --count 1000000
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from wikinode import offline
+from benchmarks.server import make_payload
+
+
+def records(count, payload_size):
+    for number in range(count):
+        title = f"Article {number}"
+        yield make_payload(title, payload_size)
+        if number % 10 == 0:
+            yield {"redirect": f"Alias {number}", "title": title}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--payload-size", type=int, default=512)
+    parser.add_argument("--repeat", type=int, default=100000)
+    options = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "summaries.idx")
+        start = time.perf_counter()
+        titles = offline.build(
+            records(options.count, options.payload_size), path
+        )
+        build_seconds = time.perf_counter() - start
+        queries = [
+            f"article {random.randrange(options.count)}"
+            for _ in range(options.repeat)
+        ]
+        with offline.OfflineIndex(path) as index:
+            start = time.perf_counter()
+            for query in queries:
+                index.payload(offline.normalize(query))
+            lookup = (time.perf_counter() - start) / options.repeat
+        report = {
+            "titles": titles,
+            "index_bytes": os.path.getsize(path),
+            "build_seconds": build_seconds,
+            "lookup_us": lookup * 1e6,
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Offline benchmarks for wikinode against a local mock Wikipedia server.
+
+Each scenario runs in a fresh process so CPU time and peak RSS belong to
+that scenario alone; the mock server runs in the parent process.
+
+Usage::
+
+    $ python -m benchmarks.run --latency 0.1 --output bench.json
+    $ python -m benchmarks.run --compare bench.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import statistics
+import sys
+import time
+from unittest import mock
+
+import wikinode
+from wikinode.client import Client
+from wikinode.ratelimit import RateLimiter
+from benchmarks.server import MockServer
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(percent / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def peak_rss_kb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def make_client(options):
+    return Client(
+        pool_size=max(10, options["workers"]),
+        limiter=RateLimiter(rate=1e9, burst=1e9),
+    )
+
+
+def bench_fetch(options):
+    client = make_client(options)
+    latencies = []
+    for i in range(options["queries"]):
+        start = time.perf_counter()
+        wikinode.fetch(f"Page {i}", client=client)
+        latencies.append(time.perf_counter() - start)
+    return latencies, options["queries"]
+
+
+def bench_fetch_many(options):
+    client = make_client(options)
+    latencies = []
+    queries = [f"Page {i}" for i in range(options["queries"])]
+    for _ in range(options["repeat"]):
+        start = time.perf_counter()
+        wikinode.fetch_many(
+            queries, max_workers=options["workers"], client=client
+        )
+        latencies.append(time.perf_counter() - start)
+    return latencies, options["queries"] * options["repeat"]
+
+
+def bench_fetch_random(options):
+    client = make_client(options)
+    latencies = []
+    for _ in range(options["queries"]):
+        start = time.perf_counter()
+        wikinode.fetch_random(client=client)
+        latencies.append(time.perf_counter() - start)
+    return latencies, options["queries"]
+
+
+scenarios = {
+    "fetch": bench_fetch,
+    "fetch_many": bench_fetch_many,
+    "fetch_random": bench_fetch_random,
+}
+
+
+def run_scenario(name, options, urls, queue):
+    api_url, random_summary_url = urls
+    with mock.patch("wikinode.summary.API_URL", api_url), mock.patch(
+        "wikinode.summary.RANDOM_SUMMARY_URL", random_summary_url
+    ):
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        latencies, requests = scenarios[name](options)
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+    queue.put(
+        {
+            "scenario": name,
+            "calls": len(latencies),
+            "requests": requests,
+            "wall_s": wall,
+            "requests_per_s": requests / wall,
+            "latency_p50_s": percentile(latencies, 50),
+            "latency_p99_s": percentile(latencies, 99),
+            "latency_mean_s": statistics.mean(latencies),
+            "cpu_s": cpu,
+            "cpu_per_request_ms": cpu / requests * 1000,
+            "peak_rss_kb": peak_rss_kb(),
+        }
+    )
+
+
+def run(options):
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with MockServer(
+        latency=options["latency"],
+        error_rate=options["error_rate"],
+        payload_size=options["payload_size"],
+    ) as server:
+        for name in options["scenarios"]:
+            queue = context.Queue()
+            urls = (server.api_url, server.random_summary_url)
+            process = context.Process(
+                target=run_scenario, args=(name, options, urls, queue)
+            )
+            process.start()
+            results.append(queue.get())
+            process.join()
+    return {
+        "wikinode": wikinode.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": options,
+        "results": results,
+    }
+
+
+def compare(report, baseline):
+    """Print the relative change of every metric against *baseline*."""
+    previous = {result["scenario"]: result for result in baseline["results"]}
+    for result in report["results"]:
+        old = previous.get(result["scenario"])
+        if old is None:
+            continue
+        print(f"{result['scenario']} vs {baseline['wikinode']}:")
+        for key, value in result.items():
+            if isinstance(value, float) and old.get(key):
+                change = (value - old[key]) / old[key] * 100
+                print(
+                    f"  {key:<20} {old[key]:>12.4f} -> {value:>12.4f}"
+                    f" ({change:+.1f}%)"
+                )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "scenarios", nargs="*", help=f"any of {', '.join(scenarios)}"
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--payload-size", type=int, default=2048)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="JSON results to compare with")
+    options = vars(parser.parse_args(argv))
+    options["scenarios"] = options["scenarios"] or list(scenarios)
+    unknown = set(options["scenarios"]) - set(scenarios)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    output = options.pop("output")
+    baseline = options.pop("compare")
+    report = run(options)
+    print(json.dumps(report["results"], indent=2))
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+    if baseline:
+        with open(baseline) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
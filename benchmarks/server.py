@@ -0,0 +1,203 @@
+"""Local stand-in for the Wikipedia REST summary endpoints."""
+
+import gzip
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+from wikinode.decoding import brotli
+
+SUMMARY_PATH = "/api/rest_v1/page/summary/"
+RANDOM_SUMMARY_PATH = "/api/rest_v1/page/random/summary"
+# filler text compressing about as well as article prose
+WORDS = (
+    "the of and in to was is for on as by with he at from his an were are "
+    "which this also be has or had first one their its new after who they "
+    "two her she been other when time during there into school more may "
+    "years over only year most would world city some where between later "
+    "three state such then national used made known under many university "
+    "united while part season team these american than film second born "
+    "south became states war through being including both before north"
+).split()
+
+
+def _text(title, size):
+    words = random.Random(title)
+    text = []
+    length = 0
+    while length < size:
+        word = words.choice(WORDS)
+        text.append(word)
+        length += len(word) + 1
+    return " ".join(text)[:size]
+
+
+def make_payload(title, payload_size):
+    """Return a summary payload whose JSON is about *payload_size* bytes."""
+    payload = {
+        "type": "standard",
+        "title": title,
+        "pageid": abs(hash(title)) % 10**8,
+        "revision": "1",
+        "description": f"Description of {title}",
+        "extract": "",
+        "extract_html": "",
+        "content_urls": {
+            "desktop": {"page": f"https://example.org/wiki/{title}"},
+            "mobile": {"page": f"https://example.org/m/{title}"},
+        },
+    }
+    padding = max(0, payload_size - len(json.dumps(payload)))
+    payload["extract"] = _text(title, padding // 3)
+    payload["extract_html"] = (
+        "<p>" + _text(title, padding - padding // 3) + "</p>"
+    )
+    return payload
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately; avoid delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.count()
+        time.sleep(server.pick_latency())
+        if random.random() < server.error_rate:
+            return self.send_json(503, {"title": "Service Unavailable"})
+        path = urlparse(self.path).path
+        if path == RANDOM_SUMMARY_PATH:
+            title = f"Random {random.randrange(server.random_pages)}"
+        elif path.startswith(SUMMARY_PATH):
+            title = path.replace(SUMMARY_PATH, "", 1)
+            title = unquote(title).replace("_", " ")
+        else:
+            return self.send_json(404, {"title": "Not found."})
+        if title.startswith("Missing"):
+            return self.send_json(404, {"title": "Not found."})
+        if title.startswith("Ambiguous"):
+            return self.send_json(200, {"type": "disambiguation"})
+        payload = make_payload(title, server.payload_size)
+        self.send_json(200, payload, {"ETag": f'"{payload["revision"]}"'})
+
+    def send_json(self, status, data, headers=None):
+        body = json.dumps(data).encode()
+        accepted = self.headers.get("Accept-Encoding", "")
+        if not self.server.compress:
+            accepted = ""
+        headers = dict(headers or {})
+        if "br" in accepted and brotli is not None:
+            body = brotli.compress(body, quality=5)
+            headers["Content-Encoding"] = "br"
+        elif "gzip" in accepted:
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MockServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering summary requests from a background
+    thread.
+
+    Args:
+        latency (float): Seconds to wait before answering.
+        error_rate (float): Fraction of requests answered with HTTP 503.
+        payload_size (int): Approximate size of a summary body in bytes.
+        random_pages (int): Number of distinct pages served at random.
+        compress (bool): Compress bodies with brotli or gzip when the
+            request accepts it.
+
+    Titles starting with "Missing" get a 404 and titles starting with
+    "Ambiguous" get a disambiguation payload.
+
+    Example:
+
+        >>> with MockServer(latency=0.1) as server:
+        ...     requests.get(f"{server.api_url}/Hello_world")
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(
+        self,
+        latency=0,
+        error_rate=0,
+        payload_size=2048,
+        random_pages=10000,
+        compress=True,
+    ):
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.payload_size = payload_size
+        self.random_pages = random_pages
+        self.compress = compress
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self):
+        return self.url + SUMMARY_PATH.rstrip("/")
+
+    @property
+    def random_summary_url(self):
+        return self.url + RANDOM_SUMMARY_PATH
+
+    def count(self):
+        with self._lock:
+            self.requests += 1
+
+    def pick_latency(self):
+        return self.latency
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+class SlowTailServer(MockServer):
+    """
+    Mock server answering a small fraction of requests much later than the
+    rest, like a stalled backend.
+
+    Args:
+        slow_rate (float): Fraction of requests answered late.
+        slow_latency (float): Seconds to wait before a late answer.
+        **options: Passed to :py:class:`MockServer`.
+    """
+
+    def __init__(self, slow_rate=0.02, slow_latency=1.0, **options):
+        super().__init__(**options)
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+
+    def pick_latency(self):
+        if random.random() < self.slow_rate:
+            return self.slow_latency
+        return self.latency
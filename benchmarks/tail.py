@@ -0,0 +1,79 @@
+"""
+Tail latency of single fetches with and without hedged requests, against
+a mock server that answers a few requests much later than the rest.
+
+Usage::
+
+    $ python -m benchmarks.tail --queries 1000 --slow-rate 0.02
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import wikinode
+from wikinode.client import DEFAULT_POOL_SIZE, Client
+from wikinode.hedging import HedgePolicy
+from wikinode.ratelimit import RateLimiter
+from benchmarks.run import percentile
+from benchmarks.server import SlowTailServer
+
+
+def measure(server, hedge, options):
+    client = Client(
+        pool_size=options.pool_size,
+        limiter=RateLimiter(rate=1e9, burst=1e9),
+        hedge=hedge,
+    )
+
+    def timed_fetch(i):
+        start = time.perf_counter()
+        wikinode.fetch(f"Page {i}", client=client)
+        return time.perf_counter() - start
+
+    sent = server.requests
+    with mock.patch("wikinode.summary.API_URL", server.api_url):
+        with ThreadPoolExecutor(max_workers=options.workers) as executor:
+            latencies = list(executor.map(timed_fetch, range(options.queries)))
+    client.close()
+    report = {
+        f"p{p}_ms": percentile(latencies, p) * 1000 for p in (50, 90, 99)
+    }
+    report["max_ms"] = max(latencies) * 1000
+    report["server_requests"] = server.requests - sent
+    if hedge is not None:
+        report.update(hedge.stats.snapshot())
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--slow-rate", type=float, default=0.02)
+    parser.add_argument("--slow-latency", type=float, default=0.5)
+    parser.add_argument("--percentile", type=float, default=95)
+    options = parser.parse_args(argv)
+    server = SlowTailServer(
+        latency=options.latency,
+        slow_rate=options.slow_rate,
+        slow_latency=options.slow_latency,
+    )
+    with server:
+        report = {
+            "plain": measure(server, None, options),
+            "hedged": measure(
+                server,
+                HedgePolicy(options.percentile, initial_delay=0.05),
+                options,
+            ),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
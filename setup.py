@@ -14,13 +14,18 @@ setup(
     author="Ricardo Veloz",
     author_email="ricardo@rvlz.io",
     url="https://github.com/rvlz/wikinode.git",
-    packages=find_packages(include=["wikinode"]),
+    packages=find_packages(include=["wikinode", "wikinode.*"]),
+    python_requires=">=3.7",
     install_requires=["requests"],
+    extras_require={
+        "aio": ["aiohttp"],
+        "fast": ["orjson"],
+        "brotli": ["brotli"],
+    },
     license="MIT license",
     keywords="wikipedia",
     classifiers=[
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
     ],
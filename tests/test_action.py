@@ -0,0 +1,420 @@
+import json
+import re
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pytest
+import responses as _responses
+
+from wikinode import action, summary
+from wikinode.cache import MemoryCache
+from wikinode.client import Client
+from wikinode.exceptions import QueryAmbiguousError, RequestFailedError
+from wikinode.requests import API_URL, ACTION_API_URL, action_api_url
+from wikinode.stats import Counters
+
+pages = {
+    '"Hello, World!" program': {
+        "pageid": 1,
+        "description": "Traditional beginners' computer program",
+        "extract": 'A "Hello, World!" program generally is a computer...',
+    },
+    "Saint Petersburg": {
+        "pageid": 2,
+        "description": "Federal city in Russia",
+        "extract": "Saint Petersburg, formerly known as Petrograd...",
+    },
+    "Micro": {"pageid": 3, "pageprops": {"disambiguation": ""}},
+    "Chicago": {
+        "pageid": 4,
+        "extract": "Chicago, officially the City of Chicago, is...",
+    },
+}
+normalized = {
+    "hello world": "Hello world",
+    "chicago": "Chicago",
+    "micro": "Micro",
+}
+redirects = {
+    "Hello world": '"Hello, World!" program',
+    "Leningrad": "Saint Petersburg",
+}
+# extracts per response, like the API's exlimit
+extract_limit = 2
+links = {
+    "Micro": ["Micro (album)", "Micro (disambiguation)", "Microphone"],
+}
+
+
+def action_api(request):
+    params = {
+        k: v[0] for k, v in parse_qs(urlparse(request.url).query).items()
+    }
+    if params["prop"] == "links":
+        limit = int(params["pllimit"])
+        data = {
+            "query": {
+                "pages": [
+                    {
+                        "title": title,
+                        "links": [
+                            {"ns": 0, "title": link}
+                            for link in links.get(title, [])[:limit]
+                        ],
+                    }
+                    for title in params["titles"].split("|")
+                ]
+            }
+        }
+        return 200, {}, json.dumps(data)
+    query = {"normalized": [], "redirects": [], "pages": []}
+    resolved = []
+    for title in params["titles"].split("|"):
+        if title in normalized:
+            query["normalized"].append(
+                {"from": title, "to": normalized[title]}
+            )
+            title = normalized[title]
+        if title in redirects:
+            query["redirects"].append({"from": title, "to": redirects[title]})
+            title = redirects[title]
+        resolved.append(title)
+    offset = int(params.get("excontinue", 0))
+    with_extracts = "extracts" in params["prop"]
+    for index, title in enumerate(resolved):
+        if title not in pages:
+            query["pages"].append({"title": title, "missing": True})
+            continue
+        page = {"title": title, **pages[title]}
+        if not with_extracts or not offset <= index < offset + extract_limit:
+            page.pop("extract", None)
+        query["pages"].append(page)
+    data = {"batchcomplete": True, "query": query}
+    if with_extracts and offset + extract_limit < len(resolved):
+        data["continue"] = {
+            "excontinue": offset + extract_limit,
+            "continue": "||description|pageprops",
+        }
+    return 200, {}, json.dumps(data)
+
+
+@pytest.fixture
+def action_responses():
+    with _responses.RequestsMock() as rsps:
+        rsps.add_callback(_responses.GET, ACTION_API_URL, callback=action_api)
+        yield rsps
+
+
+queries = ["hello world", "Leningrad", "micro", "hello123", "chicago"]
+
+
+def test_send_batch_maps_titles_back(action_responses):
+    """Test payloads are keyed by the titles asked for."""
+    payloads = action.send_batch(queries, Client())
+    # two extracts per response
+    assert len(action_responses.calls) == 3
+    assert payloads["hello world"]["title"] == '"Hello, World!" program'
+    assert payloads["hello world"]["extract"].startswith('A "Hello')
+    assert payloads["Leningrad"]["title"] == "Saint Petersburg"
+    assert payloads["micro"]["type"] == "disambiguation"
+    assert payloads["hello123"] == {}
+    assert payloads["chicago"] == {
+        "type": "standard",
+        "title": "Chicago",
+        "pageid": 4,
+        "extract": pages["Chicago"]["extract"],
+    }
+
+
+def test_fetch_many_bulk(action_responses):
+    """Test bulk mode keeps the result shapes and meta counts."""
+    results = summary.fetch_many(
+        queries + ["Chicago"], meta=True, bulk=True, client=Client()
+    )
+    assert results["hits"] == 4
+    assert results["not_found"] == ["hello123"]
+    assert results["ambiguous"] == ["micro"]
+    assert results["failed"] == []
+    assert results["results"][0] == {
+        "query": "hello world",
+        "title": '"Hello, World!" program',
+        "description": "Traditional beginners' computer program",
+        "extract": 'A "Hello, World!" program generally is a computer...',
+    }
+    assert [result["query"] for result in results["results"]] == [
+        "hello world",
+        "Leningrad",
+        "chicago",
+        "Chicago",
+    ]
+
+
+def test_fetch_many_bulk_short(action_responses):
+    """Test short bulk requests skip extracts and need one request."""
+    results = summary.fetch_many(queries, short=True, bulk=True)
+    assert len(action_responses.calls) == 1
+    assert "extracts" not in action_responses.calls[0].request.url
+    assert results[1] == {
+        "query": "Leningrad",
+        "title": "Saint Petersburg",
+        "description": "Federal city in Russia",
+    }
+
+
+def test_fetch_many_bulk_chunks(action_responses, mocker):
+    """Test queries are split into chunks and cached."""
+    mocker.patch("wikinode.action.MAX_TITLES", 2)
+    client = Client(cache=MemoryCache())
+    summary.fetch_many(queries, bulk=True, max_workers=3, client=client)
+    requested = sorted(
+        parse_qs(urlparse(call.request.url).query)["titles"][0]
+        for call in action_responses.calls
+    )
+    assert requested == sorted(
+        ["hello world|Leningrad", "micro|hello123", "chicago"]
+    )
+    calls = len(action_responses.calls)
+    results = summary.fetch_many(queries, bulk=True, client=client)
+    assert len(action_responses.calls) == calls
+    assert len(results) == 3
+    # summaries requested one at a time never get bulk payloads
+    assert client.cache.get("Leningrad") is None
+    assert client.cache.get("action:Leningrad") is not None
+
+
+def test_fetch_many_bulk_failed(mocker):
+    """Test queries of a failing batch are reported as failed."""
+    mocker.patch(
+        "wikinode.action.send_batch",
+        side_effect=RequestFailedError(ACTION_API_URL, 503),
+    )
+    results = summary.fetch_many(["hello world"], meta=True, bulk=True)
+    assert results["failed"] == ["hello world"]
+
+
+def random_api(state):
+    def callback(request):
+        params = {
+            k: v[0] for k, v in parse_qs(urlparse(request.url).query).items()
+        }
+        if "excontinue" not in params:
+            # consecutive batches share one page
+            start = state["batches"] * (int(params["grnlimit"]) - 1)
+            state["batches"] += 1
+            state["ids"] = range(start, start + int(params["grnlimit"]))
+        offset = int(params.get("excontinue", 0))
+        with_extracts = "extracts" in params["prop"]
+        query = {"pages": []}
+        for index, pageid in enumerate(state["ids"]):
+            page = {"pageid": pageid, "title": f"Page {pageid}", "ns": 0}
+            if with_extracts and offset <= index < offset + extract_limit:
+                page["extract"] = f"Page {pageid} is..."
+            query["pages"].append(page)
+        data = {"query": query, "continue": {"grncontinue": "0.5|123"}}
+        if with_extracts and offset + extract_limit < len(state["ids"]):
+            data["continue"]["excontinue"] = offset + extract_limit
+        return 200, {}, json.dumps(data)
+
+    return callback
+
+
+@pytest.fixture
+def random_responses():
+    state = {"batches": 0}
+    with _responses.RequestsMock() as rsps:
+        rsps.add_callback(
+            _responses.GET, ACTION_API_URL, callback=random_api(state)
+        )
+        yield rsps
+
+
+def test_send_random_batch(random_responses):
+    """Test a random batch follows extract continuations only."""
+    payloads = action.send_random_batch(Client(), size=5)
+    # two extracts per response
+    assert len(random_responses.calls) == 3
+    params = parse_qs(urlparse(random_responses.calls[0].request.url).query)
+    assert params["generator"] == ["random"]
+    assert params["grnnamespace"] == ["0"]
+    assert [payload["pageid"] for payload in payloads] == [0, 1, 2, 3, 4]
+    assert all("extract" in payload for payload in payloads)
+
+
+def test_fetch_random_many(random_responses, mocker):
+    """Test random samples are unique and need few requests."""
+    mocker.patch("wikinode.action.MAX_TITLES", 4)
+    results = list(summary.fetch_random_many(10, short=True, max_workers=1))
+    assert len(results) == 10
+    assert len(set(result["title"] for result in results)) == 10
+    # four pages per batch, one of them already seen
+    assert len(random_responses.calls) == 3
+    assert "extracts" not in random_responses.calls[0].request.url
+    assert results[0] == {"title": "Page 0"}
+
+
+def test_fetch_random_many_duplicates(random_responses, mocker):
+    """Test duplicates are kept when uniqueness is not required."""
+    mocker.patch("wikinode.action.MAX_TITLES", 4)
+    results = summary.fetch_random_many(
+        8, unique=False, max_workers=1, fields=["pageid", "extract"]
+    )
+    assert [result["pageid"] for result in results] == [
+        0,
+        1,
+        2,
+        3,
+        3,
+        4,
+        5,
+        6,
+    ]
+
+
+def test_fetch_random_many_small_wiki(mocker):
+    """Test sampling stops when batches keep adding no new article."""
+    mocker.patch("wikinode.summary.MAX_IDLE_BATCHES", 3)
+    pages = [{"type": "standard", "title": "Page 0", "pageid": 0}]
+    send = mocker.patch.object(
+        action, "send_random_batch", side_effect=lambda *a, **k: pages
+    )
+    results = list(summary.fetch_random_many(5, max_workers=1))
+    assert results == [{"title": "Page 0"}]
+    assert send.call_count == 4
+    pages = []
+    assert list(summary.fetch_random_many(5, max_workers=2)) == []
+
+
+def test_fetch_many_bulk_fields(action_responses):
+    """Test properties no field needs are not requested or cached."""
+    client = Client(cache=MemoryCache())
+    results = summary.fetch_many(
+        queries, bulk=True, client=client, fields=["title", "pageid"]
+    )
+    assert len(action_responses.calls) == 1
+    params = parse_qs(urlparse(action_responses.calls[0].request.url).query)
+    assert params["prop"] == ["pageprops"]
+    assert results[0] == {
+        "query": "hello world",
+        "title": '"Hello, World!" program',
+        "pageid": 1,
+    }
+    assert len(client.cache) == 0
+
+
+def test_fetch_many_bulk_languages():
+    """Test bulk batches are sent to the Action API of each wiki."""
+    with _responses.RequestsMock() as rsps:
+        for lang in ("en", "fr"):
+            rsps.add_callback(
+                _responses.GET, action_api_url(lang), callback=action_api
+            )
+        results = summary.fetch_many(
+            [("chicago", "fr"), "hello world", ("Leningrad", "fr")],
+            bulk=True,
+            client=Client(),
+        )
+        hosts = sorted(
+            urlparse(call.request.url).hostname for call in rsps.calls
+        )
+    assert [result["title"] for result in results] == [
+        "Chicago",
+        '"Hello, World!" program',
+        "Saint Petersburg",
+    ]
+    assert hosts[0] == "en.wikipedia.org"
+    assert set(hosts[1:]) == {"fr.wikipedia.org"}
+
+
+summaries = {
+    "Chicago": {"type": "standard", "title": "Chicago"},
+    "Micro": {"type": "disambiguation", "title": "Micro"},
+    "Micro (disambiguation)": {
+        "type": "disambiguation",
+        "title": "Micro (disambiguation)",
+    },
+    "Micro (album)": {
+        "type": "standard",
+        "title": "Micro (album)",
+        "description": "1993 album",
+        "extract": "Micro is an album...",
+    },
+    "Microphone": {
+        "type": "standard",
+        "title": "Microphone",
+        "description": "Device that converts sound into an electrical signal",
+        "extract": "A microphone is a transducer...",
+    },
+}
+
+
+def rest_api(request):
+    title = unquote(urlparse(request.url).path.rsplit("/", 1)[-1])
+    data = summaries.get(title.replace("_", " "))
+    if data is None:
+        return 404, {}, json.dumps({"title": "Not found."})
+    return 200, {}, json.dumps(data)
+
+
+@pytest.fixture
+def expand_responses():
+    with _responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        rsps.add_callback(_responses.GET, ACTION_API_URL, callback=action_api)
+        rsps.add_callback(
+            _responses.GET, re.compile(f"^{API_URL}"), callback=rest_api
+        )
+        yield rsps
+
+
+def test_send_links(expand_responses):
+    """Test the links of a page are requested in one request."""
+    assert action.send_links("Micro", Client(), limit=2) == [
+        "Micro (album)",
+        "Micro (disambiguation)",
+    ]
+    assert len(expand_responses.calls) == 1
+
+
+def test_fetch_expand(expand_responses):
+    """Test ambiguous queries carry the summaries of their candidates."""
+    stats = Counters()
+    with pytest.raises(QueryAmbiguousError) as exc:
+        summary.fetch(
+            "micro", short=True, expand=True, client=Client(), stats=stats
+        )
+    assert exc.value.query == "micro"
+    assert exc.value.candidates == [
+        {
+            "title": "Micro (album)",
+            "description": "1993 album",
+        },
+        {
+            "title": "Microphone",
+            "description": summaries["Microphone"]["description"],
+        },
+    ]
+    # the page, its links and three candidates
+    assert len(expand_responses.calls) == 5
+    assert stats["downloaded"] == 4
+    with pytest.raises(QueryAmbiguousError) as exc:
+        summary.fetch("micro", client=Client())
+    assert exc.value.candidates is None
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_fetch_many_expand(expand_responses, bulk):
+    """Test meta maps ambiguous queries to their candidates."""
+    results = summary.fetch_many(
+        ["micro", "Chicago", "Micro"],
+        meta=True,
+        bulk=bulk,
+        max_workers=4,
+        client=Client(),
+        expand=True,
+        max_candidates=1,
+        fields=["title"],
+    )
+    assert results["ambiguous"] == ["micro", "Micro"]
+    assert results["candidates"] == {
+        "micro": [{"title": "Micro (album)"}],
+        "Micro": [{"title": "Micro (album)"}],
+    }
+    assert results["results"] == [{"query": "Chicago", "title": "Chicago"}]
@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web  # noqa: E402
+
+from wikinode import aio  # noqa: E402
+from wikinode.exceptions import QueryAmbiguousError  # noqa: E402
+from wikinode.requests import USER_AGENT  # noqa: E402
+from tests.fixtures import (  # noqa: E402
+    body,
+    body_not_found,
+    body_ambiguous,
+)
+
+
+# keyed by normalized title, as sent in the URL
+pages = {
+    "Hello_world": (200, body),
+    "Micro": (200, body_ambiguous),
+    "Hello123": (404, body_not_found),
+}
+
+
+def serve(coro_factory):
+    """Run *coro_factory(base_url, requests)* against a local summary app."""
+    requests = []
+
+    async def summary(request):
+        requests.append(request)
+        if request.match_info["title"] == "Dropped":
+            # promise more than is sent, then hang up
+            response = web.StreamResponse(headers={"Content-Length": "1000"})
+            await response.prepare(request)
+            await response.write(b"{")
+            request.transport.close()
+            return response
+        status, data = pages[request.match_info["title"]]
+        return web.json_response(data, status=status)
+
+    async def random_summary(request):
+        requests.append(request)
+        return web.json_response(body)
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/summary/random/summary", random_summary)
+        app.router.add_get("/summary/{title}", summary)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        try:
+            async with aio.Client(limit=2) as client:
+                return await coro_factory(
+                    f"http://127.0.0.1:{port}/summary", client
+                ), requests
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+
+def test_fetch(mocker):
+    """Test coroutine can fetch one summary."""
+
+    async def run(url, client):
+        mocker.patch("wikinode.aio.summary.API_URL", url)
+        return await aio.fetch("hello world", client=client)
+
+    result, requests = serve(run)
+    assert len(requests) == 1
+    assert requests[0].query["redirect"] == "true"
+    assert requests[0].headers["User-Agent"] == USER_AGENT
+    assert result == {
+        "query": "hello world",
+        "title": body["title"],
+        "description": body["description"],
+        "extract": body["extract"],
+    }
+
+
+def test_fetch_query_ambiguous(mocker):
+    """Test coroutine raises exception when query is not specific enough."""
+
+    async def run(url, client):
+        mocker.patch("wikinode.aio.summary.API_URL", url)
+        with pytest.raises(QueryAmbiguousError) as exc:
+            await aio.fetch("micro", client=client)
+        return exc.value
+
+    error, _ = serve(run)
+    assert error.query == "micro"
+
+
+def test_fetch_many_with_meta_data(mocker):
+    """Test coroutine keeps the sync result shape and order."""
+
+    async def run(url, client):
+        mocker.patch("wikinode.aio.summary.API_URL", url)
+        queries = ["hello world", "micro", "hello123", "hello world"]
+        return await aio.fetch_many(
+            queries, short=True, meta=True, client=client
+        )
+
+    results, requests = serve(run)
+    assert len(requests) == 4
+    assert results["hits"] == 2
+    assert results["not_found"] == ["hello123"]
+    assert results["ambiguous"] == ["micro"]
+    assert results["results"] == [
+        {
+            "query": "hello world",
+            "title": body["title"],
+            "description": body["description"],
+        }
+    ] * 2
+
+
+def test_fetch_many_connection_lost(mocker):
+    """Test coroutine retries lost connections, then reports the failure."""
+
+    async def run(url, client):
+        mocker.patch("wikinode.aio.summary.API_URL", url)
+        client.max_retries = 1
+        client.backoff_factor = 0
+        return await aio.fetch_many(
+            ["dropped", "hello world"], meta=True, client=client
+        )
+
+    results, requests = serve(run)
+    assert len(requests) == 3
+    assert results["hits"] == 1
+    assert results["failed"] == ["dropped"]
+
+
+def test_fetch_random(mocker):
+    """Test coroutine can fetch random article."""
+
+    async def run(url, client):
+        mocker.patch(
+            "wikinode.aio.summary.RANDOM_SUMMARY_URL",
+            f"{url}/random/summary",
+        )
+        return await aio.fetch_random(client=client)
+
+    result, requests = serve(run)
+    assert len(requests) == 1
+    assert set(result.keys()) == set(["title", "description", "extract"])
@@ -0,0 +1,105 @@
+import io
+import json
+import multiprocessing
+import re
+
+import pytest
+import responses as _responses
+
+from wikinode import batch
+from wikinode.requests import API_URL
+from tests.fixtures import body
+
+# workers inherit the mocked responses only when forked
+pytestmark = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="requires the fork start method",
+)
+
+
+@pytest.fixture
+def response():
+    # requests are sent by the workers, so the parent sees none of them
+    with _responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        rsps.add(_responses.GET, re.compile(f"^{API_URL}"), json=body)
+        yield rsps
+
+
+def lines(path):
+    with open(path) as results:
+        return [json.loads(line) for line in results]
+
+
+def test_finished_queries(tmp_path):
+    """Test answered queries are read and a cut off line is dropped."""
+    path = tmp_path / "out.ndjson"
+    path.write_text(
+        '{"query": "a", "status": "hit", "summary": {}}\n'
+        '{"query": "b", "status": "failed", "summary": {}}\n'
+        '{"query": "c", "status": "not_found", "summary": {}}\n'
+        '{"query": "d", "sta'
+    )
+    assert batch.finished_queries(str(path)) == {"a", "c"}
+    assert path.read_text().endswith('"not_found", "summary": {}}\n')
+    assert batch.finished_queries(str(tmp_path / "missing")) == set()
+
+
+def test_run(response):
+    """Test every title is written once as a JSON line."""
+    output = io.StringIO()
+    titles = ["hello world\n", "\n", "python language\n", "Chicago\n"]
+    progress = batch.run(
+        titles, output, processes=2, threads=2, finished={"Chicago"}
+    )
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert sorted(result["query"] for result in results) == [
+        "hello world",
+        "python language",
+    ]
+    assert all(result["status"] == "hit" for result in results)
+    assert results[0]["summary"]["title"] == body["title"]
+    assert progress.stats["hit"] == 2
+
+
+def test_run_query_error():
+    """Test a title failing unexpectedly is written as failed alone."""
+    output = io.StringIO()
+    with _responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        rsps.add(_responses.GET, re.compile(f"^{API_URL}/Broken"), body="{")
+        rsps.add(_responses.GET, re.compile(f"^{API_URL}"), json=body)
+        progress = batch.run(
+            ["broken\n", "hello world\n"], output, processes=1, threads=2
+        )
+    results = {
+        result["query"]: result
+        for result in map(json.loads, output.getvalue().splitlines())
+    }
+    assert results["broken"]["status"] == "failed"
+    assert "JSONDecodeError" in results["broken"]["error"]
+    assert results["hello world"]["status"] == "hit"
+    assert progress.stats.snapshot()["failed"] == 1
+
+
+def test_run_worker_error(response):
+    """Test a worker error stops the run."""
+    with pytest.raises(RuntimeError):
+        batch.run(["hello world"], io.StringIO(), processes=1, fields=["x"])
+
+
+def test_main_resume(response, tmp_path):
+    """Test a resumed run only fetches titles not answered yet."""
+    titles = tmp_path / "titles.txt"
+    titles.write_text("hello world\npython language\n")
+    output = tmp_path / "out.ndjson"
+    output.write_text(
+        '{"query": "hello world", "status": "hit", "summary": {}}\n'
+    )
+    batch.main(
+        [str(titles), "-o", str(output), "-p", "1", "--resume", "--short"]
+    )
+    results = lines(output)
+    assert [result["query"] for result in results] == [
+        "hello world",
+        "python language",
+    ]
+    assert "extract" not in results[1]["summary"]
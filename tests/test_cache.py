@@ -0,0 +1,244 @@
+import re
+
+import pytest
+import responses as _responses
+
+from wikinode import summary
+from wikinode.cache import MemoryCache, SQLiteCache
+from wikinode.client import Client
+from wikinode.exceptions import QueryAmbiguousError, RequestFailedError
+from wikinode.requests import API_URL
+from wikinode.stats import Counters
+from tests.fixtures import body, body_not_found, body_ambiguous
+
+
+@pytest.fixture
+def clock(mocker):
+    now = [1000.0]
+    mocker.patch("wikinode.cache.time.time", side_effect=lambda: now[0])
+    return now
+
+
+def test_memory_cache_get_set():
+    """Test cache returns stored payloads and counts hits and misses."""
+    cache = MemoryCache()
+    assert cache.get("Hello world") is None
+    cache.set("Hello world", body)
+    assert cache.get("Hello world") == body
+    assert cache.stats.snapshot() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "revalidated": 0,
+    }
+
+
+def test_memory_cache_evicts_least_recently_used():
+    """Test cache drops the least recently used entry when full."""
+    cache = MemoryCache(maxsize=2)
+    cache.set("A", body)
+    cache.set("B", body)
+    cache.get("A")
+    cache.set("C", body)
+    assert len(cache) == 2
+    assert cache.get("B") is None
+    assert cache.get("A") == body
+    assert cache.get("C") == body
+    assert cache.stats["evictions"] == 1
+
+
+def test_memory_cache_ttl(clock):
+    """Test summaries and negative payloads expire after their own TTL."""
+    cache = MemoryCache(ttl=60, negative_ttl=10)
+    cache.set("Hello world", body)
+    cache.set("Hello123", body_not_found)
+    cache.set("Micro", body_ambiguous)
+    clock[0] += 11
+    assert cache.get("Hello123") is None
+    assert cache.get("Micro") is None
+    assert cache.get("Hello world") == body
+    clock[0] += 50
+    assert cache.get("Hello world") is None
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        [
+            (200, body, {}, f"{API_URL}/Hello"),
+            (200, body_ambiguous, {}, f"{API_URL}/Micro"),
+            (404, body_not_found, {}, f"{API_URL}/Hello123"),
+        ]
+    ],
+)
+def test_fetch_reads_through_cache(responses):
+    """Test fetch only sends requests for normalized queries not cached."""
+    client = Client(cache=MemoryCache())
+    first = summary.fetch("hello world", client=client)
+    second = summary.fetch("Hello_world", client=client)
+    assert len(responses.calls) == 1
+    assert first["title"] == second["title"] == body["title"]
+    assert second["query"] == "Hello_world"
+    for _ in range(2):
+        with pytest.raises(QueryAmbiguousError):
+            summary.fetch("micro", client=client)
+        assert summary.fetch("hello123", client=client) == {}
+    assert len(responses.calls) == 3
+
+
+@pytest.mark.parametrize(
+    "data", [[(503, {"title": "Unavailable"}, {}, API_URL)]]
+)
+def test_fetch_does_not_cache_errors(responses):
+    """Test server errors are not cached as missing pages."""
+    client = Client(cache=MemoryCache(), max_retries=0)
+    for _ in range(2):
+        with pytest.raises(RequestFailedError):
+            summary.fetch("hello world", client=client)
+    assert len(responses.calls) == 2
+    assert len(client.cache) == 0
+
+
+@pytest.mark.parametrize("status_code,body,url", [(200, body, API_URL)])
+def test_fetch_many_only_requests_misses(response):
+    """Test fetch_many answers cached queries without requests."""
+    client = Client(cache=MemoryCache())
+    summary.fetch("hello world", client=client)
+    results = summary.fetch_many(
+        ["hello world", "python language"], client=client, max_workers=2
+    )
+    assert len(response.calls) == 2
+    assert [result["query"] for result in results] == [
+        "hello world",
+        "python language",
+    ]
+    assert client.cache.stats["hits"] == 1
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return str(tmp_path / "summaries.sqlite3")
+
+
+def test_sqlite_cache_get_set(sqlite_path):
+    """Test cache stores payloads with their ETag and revision."""
+    cache = SQLiteCache(sqlite_path)
+    assert cache.get("Hello world") is None
+    cache.set("Hello world", {**body, "revision": "42"}, etag='"42/abc"')
+    assert cache.get("Hello world") == {**body, "revision": "42"}
+    row = cache._connection().execute(
+        "SELECT etag, revision FROM summaries WHERE key = 'Hello world'"
+    )
+    assert row.fetchone() == ('"42/abc"', "42")
+    assert cache.stats.snapshot() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "revalidated": 0,
+    }
+
+
+def test_sqlite_cache_ttl(sqlite_path, clock):
+    """Test summaries and negative payloads expire after their own TTL."""
+    cache = SQLiteCache(sqlite_path, ttl=60, negative_ttl=10)
+    cache.set("Hello world", body)
+    cache.set("Hello123", body_not_found)
+    clock[0] += 11
+    assert cache.get("Hello123") is None
+    assert cache.get("Hello world") == body
+    clock[0] += 50
+    assert cache.get("Hello world") is None
+    cache.prune()
+    assert len(cache) == 0
+    assert cache.stats["evictions"] == 2
+
+
+def test_sqlite_cache_prunes_oldest(sqlite_path, clock):
+    """Test pruning keeps the most recently fetched entries."""
+    cache = SQLiteCache(sqlite_path, maxsize=2)
+    for key in ["A", "B", "C"]:
+        cache.set(key, body)
+        clock[0] += 1
+    cache.prune()
+    assert len(cache) == 2
+    assert cache.get("A") is None
+    assert cache.get("C") == body
+
+
+def test_sqlite_cache_shared_between_instances(sqlite_path):
+    """Test entries written by one cache are read by another."""
+    writer = SQLiteCache(sqlite_path)
+    reader = SQLiteCache(sqlite_path)
+    writer.set("Hello world", body)
+    assert reader.get("Hello world") == body
+
+
+@pytest.mark.parametrize("status_code,body,url", [(200, body, API_URL)])
+def test_fetch_warm_restart(response, sqlite_path):
+    """Test a new client on the same cache file sends no requests."""
+    summary.fetch("hello world", client=Client(cache=SQLiteCache(sqlite_path)))
+    client = Client(cache=SQLiteCache(sqlite_path))
+    result = summary.fetch("hello world", client=client)
+    assert len(response.calls) == 1
+    assert result["title"] == body["title"]
+
+
+@pytest.fixture
+def conditional_responses():
+    with _responses.RequestsMock() as rsps:
+        url = re.compile(f"^{API_URL}")
+        rsps.add(_responses.GET, url, json=body, headers={"ETag": '"1/abc"'})
+        rsps.add(_responses.GET, url, status=304)
+        rsps.add(
+            _responses.GET,
+            url,
+            json=body_ambiguous,
+            headers={"ETag": '"2/def"'},
+        )
+        yield rsps
+
+
+@pytest.mark.parametrize("make_cache", [MemoryCache, SQLiteCache])
+def test_fetch_revalidates_stale_entries(
+    conditional_responses, make_cache, sqlite_path, clock
+):
+    """Test stale entries are revalidated with a conditional request."""
+    responses = conditional_responses
+    if make_cache is SQLiteCache:
+        cache = SQLiteCache(sqlite_path, ttl=60)
+    else:
+        cache = make_cache(ttl=60)
+    client = Client(cache=cache)
+    stats = Counters()
+    summary.fetch("hello world", client=client, stats=stats)
+    summary.fetch("hello world", client=client, stats=stats)
+    assert "If-None-Match" not in responses.calls[0].request.headers
+    # entry expired but unchanged on the server
+    clock[0] += 61
+    result = summary.fetch("hello world", client=client, stats=stats)
+    assert responses.calls[1].request.headers["If-None-Match"] == '"1/abc"'
+    assert result["title"] == body["title"]
+    assert cache.get("Hello world")["title"] == body["title"]
+    # entry expired and changed on the server
+    clock[0] += 61
+    with pytest.raises(QueryAmbiguousError):
+        summary.fetch("hello world", client=client, stats=stats)
+    assert responses.calls[2].request.headers["If-None-Match"] == '"1/abc"'
+    assert len(responses.calls) == 3
+    assert stats.snapshot() == {"cached": 1, "revalidated": 1, "downloaded": 2}
+    assert cache.stats["revalidated"] == 1
+
+
+@pytest.mark.parametrize("status_code,body,url", [(200, body, API_URL)])
+def test_fetch_caches_selected_fields(response):
+    """Test only returned and configured payload fields are cached."""
+    client = Client(cache=MemoryCache())
+    summary.fetch("hello world", client=client)
+    assert set(client.cache.get("Hello world")) == set(
+        ["type", "title", "description", "extract"]
+    )
+    client = Client(cache=MemoryCache(), extra_fields=["content_urls"])
+    summary.fetch("hello world", client=client)
+    cached = client.cache.get("Hello world")
+    assert cached["content_urls"] == body["content_urls"]
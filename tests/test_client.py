@@ -0,0 +1,251 @@
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+import requests
+
+from wikinode import client as _client
+from wikinode import summary
+from wikinode.client import Client
+from wikinode.exceptions import RequestFailedError, RequestTimeoutError
+from wikinode.hedging import HedgePolicy
+from wikinode.instrument import Instruments
+from wikinode.ratelimit import RateLimiter
+from wikinode.requests import USER_AGENT, API_URL
+from tests.fixtures import body
+from benchmarks.server import SlowTailServer
+
+
+@pytest.mark.parametrize("status_code,body,url", [(200, body, API_URL)])
+def test_client_reuses_session(response, mocker):
+    """Test consecutive requests go through the same session."""
+    client = Client()
+    send = mocker.spy(client.session, "send")
+    summary.fetch("hello world", client=client)
+    summary.fetch("hello world", client=client)
+    assert len(response.calls) == 2
+    assert send.call_count == 2
+    assert response.calls[1].request.headers["User-Agent"] == USER_AGENT
+
+
+def test_client_pool_size():
+    """Test client mounts adapters with the configured pool size."""
+    client = Client(pool_size=32)
+    adapter = client.session.get_adapter(API_URL)
+    assert adapter._pool_maxsize == 32
+    assert adapter._pool_connections == _client.DEFAULT_HOST_POOLS
+
+
+def test_client_limiter_per_host():
+    """Test every wiki gets its own limiter with the client's settings."""
+    limiter = RateLimiter(rate=8, burst=4)
+    client = Client(limiter=limiter, lang="fr")
+    assert client.host == "fr.wikipedia.org"
+    assert client.limiter_for("fr.wikipedia.org") is limiter
+    german = client.limiter_for("de.wikipedia.org")
+    assert german is not limiter
+    assert (german.max_rate, german.burst) == (8, 4)
+    assert client.limiter_for("de.wikipedia.org") is german
+
+
+@pytest.mark.parametrize("status_code,body,url", [(200, body, API_URL)])
+def test_client_custom_session_and_headers(response):
+    """Test client sends default headers through a swapped-in session."""
+    session = requests.Session()
+    client = Client(session=session, headers={"X-Request-Id": "abc"})
+    assert client.session is session
+    summary.fetch("hello world", client=client)
+    headers = response.calls[0].request.headers
+    assert headers["User-Agent"] == USER_AGENT
+    assert headers["X-Request-Id"] == "abc"
+
+
+def test_default_client(mocker):
+    """Test module-level functions share one lazily created client."""
+    mocker.patch.object(_client, "_default_client", None)
+    default = _client.get_default_client()
+    assert isinstance(default, Client)
+    assert _client.get_default_client() is default
+    custom = Client()
+    _client.set_default_client(custom)
+    assert _client.get_default_client() is custom
+
+
+def test_client_timeout(mocker):
+    """Test requests that keep timing out raise RequestTimeoutError."""
+    client = Client(max_retries=1, backoff_factor=0)
+    get = mocker.patch.object(
+        client.session, "get", side_effect=requests.ReadTimeout
+    )
+    with pytest.raises(RequestTimeoutError):
+        client.get(API_URL)
+    assert get.call_count == 2
+    assert get.call_args.kwargs["timeout"] == _client.DEFAULT_TIMEOUT
+
+
+@pytest.mark.parametrize(
+    "timeout,longest", [(5, 5), ((5, None), 5), ((None, None), None)]
+)
+def test_client_scalar_timeout(mocker, timeout, longest):
+    """Test single numbers and None parts are valid timeouts."""
+    client = Client(timeout=timeout, max_retries=0)
+    get = mocker.patch.object(
+        client.session, "get", side_effect=requests.ReadTimeout
+    )
+    with pytest.raises(RequestTimeoutError) as exc:
+        client.get(API_URL)
+    assert exc.value.timeout == longest
+    assert str(exc.value).startswith(f"{API_URL} timed out")
+    connect, read = get.call_args.kwargs["timeout"]
+    assert (connect, read) == _client._timeout_pair(timeout)
+
+
+def test_client_connection_errors(mocker):
+    """Test unreachable hosts are retried, then reported as failed."""
+    client = Client(max_retries=2, backoff_factor=0)
+    get = mocker.patch.object(
+        client.session, "get", side_effect=requests.ConnectionError
+    )
+    with pytest.raises(RequestFailedError) as exc:
+        client.get(API_URL)
+    assert exc.value.status_code is None
+    assert get.call_count == 3
+    results = summary.fetch_many(
+        ["hello world", "chicago"], max_workers=2, meta=True, client=client
+    )
+    assert results["failed"] == ["hello world", "chicago"]
+    statuses = {
+        result.status
+        for result in summary.iter_fetch(["hello world"], client=client)
+    }
+    assert statuses == {"failed"}
+
+
+class TruncatingHandler(socketserver.StreamRequestHandler):
+    """Promises a body of 1000 bytes, then closes after one."""
+
+    def handle(self):
+        self.server.connections += 1
+        self.rfile.readline()
+        while self.rfile.readline() not in (b"\r\n", b""):
+            pass
+        self.wfile.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: application/json\r\n"
+            b"Content-Length: 1000\r\n\r\n{"
+        )
+
+
+@pytest.fixture
+def truncating_server():
+    server = socketserver.ThreadingTCPServer(
+        ("127.0.0.1", 0), TruncatingHandler
+    )
+    server.daemon_threads = True
+    server.connections = 0
+    thread = threading.Thread(
+        target=server.serve_forever, args=(0.05,), daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("instruments", [None, Instruments()])
+def test_client_truncated_bodies(truncating_server, instruments):
+    """Test bodies cut short are retried, then reported as failed."""
+    client = Client(max_retries=1, backoff_factor=0, instruments=instruments)
+    host, port = truncating_server.server_address
+    url = f"http://{host}:{port}/api/rest_v1/page/summary"
+    with mock.patch("wikinode.summary.API_URL", url):
+        results = summary.fetch_many(
+            ["a", "b"], meta=True, max_workers=2, client=client
+        )
+    assert results["failed"] == ["a", "b"]
+    assert truncating_server.connections == 4
+
+
+def test_client_deadline_caps_timeouts(mocker):
+    """Test a deadline shortens timeouts and stops retries."""
+    client = Client(timeout=(5, 30))
+    get = mocker.patch.object(
+        client.session, "get", side_effect=requests.ConnectTimeout
+    )
+    with pytest.raises(RequestTimeoutError):
+        client.get(API_URL, deadline=time.monotonic() + 0.2)
+    connect, read = get.call_args_list[0].kwargs["timeout"]
+    assert 0 < connect <= 0.2 and 0 < read <= 0.2
+    with pytest.raises(RequestTimeoutError):
+        client.get(API_URL, deadline=time.monotonic() - 1)
+
+
+def test_fetch_timeout():
+    """Test a fetch gives up on a stalled server by its timeout."""
+    client = Client()
+    with SlowTailServer(slow_rate=1, slow_latency=2) as server:
+        with mock.patch("wikinode.summary.API_URL", server.api_url):
+            start = time.monotonic()
+            with pytest.raises(RequestTimeoutError):
+                summary.fetch("hello world", client=client, timeout=0.2)
+    assert time.monotonic() - start < 1
+
+
+def test_client_hedges_slow_requests(mocker):
+    """Test a second request is sent when the first one is slow."""
+    hedge = HedgePolicy(initial_delay=0.05)
+    client = Client(hedge=hedge)
+    answers = iter([1, 0])
+
+    def get_json(url, headers, deadline, **kwargs):
+        delay = next(answers)
+        time.sleep(delay)
+        return delay, None
+
+    mocker.patch.object(client, "_get_json", side_effect=get_json)
+    start = time.monotonic()
+    assert client.get_json(API_URL) == (0, None)
+    assert time.monotonic() - start < 0.5
+    assert hedge.stats.snapshot() == {"hedged": 1, "won": 1}
+
+
+def test_client_hedges_from_send_time(mocker):
+    """Test requests queued behind others are not hedged for the wait."""
+    hedge = HedgePolicy(initial_delay=0.15)
+    # two hedging threads for four callers
+    client = Client(pool_size=1, hedge=hedge)
+
+    def get_json(url, headers, deadline, **kwargs):
+        time.sleep(0.1)
+        return None, None
+
+    mocker.patch.object(client, "_get_json", side_effect=get_json)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: client.get_json(API_URL), range(4)))
+    assert hedge.stats["hedged"] == 0
+
+
+def test_hedge_policy_budget():
+    """Test hedges stop at the budget share of requests."""
+    hedge = HedgePolicy(percentile=90)
+    allowed = 0
+    for _ in range(100):
+        hedge.request()
+        allowed += hedge.allow()
+    assert allowed == 11
+    assert hedge.stats["hedged"] == 11
+
+
+def test_hedge_policy_delay():
+    """Test the hedge delay follows the latency percentile."""
+    hedge = HedgePolicy(percentile=90, initial_delay=1, window=50)
+    for _ in range(10):
+        hedge.observe(2)
+    assert hedge.delay() == 1
+    for i in range(118):
+        hedge.observe(0.01 * (i % 10))
+    # the last 50 latencies hold five of each
+    assert hedge.delay() == pytest.approx(0.08)
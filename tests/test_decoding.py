@@ -0,0 +1,54 @@
+import gzip
+import json
+import zlib
+
+import pytest
+
+from wikinode import decoding
+from tests.fixtures import body
+
+
+content = json.dumps(body).encode()
+
+
+def raw_deflate(data):
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+@pytest.mark.parametrize("backend", ["default", "stdlib"])
+def test_loads(mocker, backend):
+    """Test documents decode the same with and without orjson."""
+    if backend == "stdlib":
+        mocker.patch.object(decoding, "orjson", None)
+    assert decoding.loads(content) == body
+
+
+def test_keep_fields():
+    """Test only the listed fields are kept."""
+    data = decoding.loads(content)
+    assert decoding.keep_fields(data, ("type", "title", "pageid")) == {
+        "type": "standard",
+        "title": body["title"],
+    }
+
+
+@pytest.mark.parametrize(
+    "encoding,compress",
+    [
+        (None, lambda data: data),
+        ("identity", lambda data: data),
+        ("gzip", gzip.compress),
+        ("deflate", zlib.compress),
+        ("deflate", raw_deflate),
+    ],
+)
+def test_decompress(encoding, compress):
+    """Test bodies are decompressed for each supported encoding."""
+    assert decoding.decompress(compress(content), encoding) == content
+
+
+def test_decompress_unsupported():
+    """Test unknown encodings are reported."""
+    with pytest.raises(ValueError):
+        decoding.decompress(content, "compress")
@@ -0,0 +1,24 @@
+from wikinode.fields import Projection, compile_fields, default_projection
+
+
+def test_projection():
+    """Test projection copies flat and nested fields that exist."""
+    projection = Projection(["title", "thumbnail.source", "pageid", "a.b.c"])
+    data = {
+        "title": "Chicago",
+        "thumbnail": {"source": "https://upload...", "width": 320},
+        "a": {"b": "not a dict"},
+    }
+    assert projection.project(data) == {
+        "title": "Chicago",
+        "thumbnail.source": "https://upload...",
+    }
+    assert projection.roots == {"title", "thumbnail", "pageid", "a"}
+
+
+def test_compile_fields():
+    """Test fields are compiled once and projections pass through."""
+    assert compile_fields(None) is default_projection
+    projection = compile_fields(["title"])
+    assert compile_fields(projection) is projection
+    assert projection.fields == ("title",)
@@ -0,0 +1,136 @@
+import gzip
+
+import pytest
+
+import wikinode
+from wikinode.client import Client
+from wikinode.fuzzy import TitleIndex
+from wikinode.instrument import Instruments
+from wikinode.requests import API_URL
+from wikinode.stats import Counters
+from tests.fixtures import body
+
+
+titles = [
+    "Paris",
+    "Python (programming language)",
+    "Chicago",
+    "Pars",
+    "Paris Hilton",
+    "Python",
+    '"Hello, World!" program',
+]
+
+
+@pytest.fixture
+def index():
+    return TitleIndex(titles)
+
+
+def test_resolve_exact(index):
+    """Test exact titles resolve to themselves, ignoring case."""
+    assert index.resolve("chicago") == "Chicago"
+    assert index.resolve("python_(Programming language)") == titles[1]
+    assert index.stats.snapshot() == {
+        "exact": 2,
+        "resolved": 0,
+        "unresolved": 0,
+    }
+
+
+@pytest.mark.parametrize(
+    "query,title",
+    [
+        ("chicgo", "Chicago"),
+        ("chciago", "Chicago"),
+        ("pyhton", "Python"),
+        ("python (programing language)", titles[1]),
+        ("python (prog", titles[1]),
+        ("paris h", "Paris Hilton"),
+        ('"hello, world', '"Hello, World!" program'),
+    ],
+)
+def test_resolve_misses(index, query, title):
+    """Test misspelled and partial queries resolve to the closest title."""
+    assert index.resolve(query) == title
+    assert index.stats["resolved"] == 1
+
+
+def test_resolve_ranks(index):
+    """Test ties go to the title listed first."""
+    # one edit from both "Paris" and "Pars"
+    assert index.resolve("Parxs") == "Paris"
+    assert index.complete("par") == ["Paris", "Pars", "Paris Hilton"]
+    assert index.complete("pyt", limit=1) == [titles[1]]
+
+
+def test_short_queries(index):
+    """Test short queries are neither completed nor corrected."""
+    assert index.resolve("Pyt") is None
+    assert index.resolve("Chi") is None
+    assert index.stats["unresolved"] == 2
+    assert index.resolved_rate == 0.0
+
+
+def test_search(index):
+    """Test searches return titles by distance, then rank."""
+    assert index.search("paris", max_distance=1) == [
+        ("Paris", 0),
+        ("Pars", 1),
+    ]
+    assert index.search("chicago", max_distance=0) == [("Chicago", 0)]
+    assert index.search("nothing like it", max_distance=2) == []
+
+
+def test_packed_titles():
+    """Test titles differing by case keep the first, packed compactly."""
+    index = TitleIndex(["Apple", "apple", "Apple Inc."] + titles)
+    assert len(index) == len(titles) + 2
+    assert index.resolve("APPLE") == "Apple"
+    assert index.complete("appl") == ["Apple", "Apple Inc."]
+    assert index.nbytes < 40 * len(index)
+
+
+def test_from_file(tmp_path):
+    """Test title dumps are loaded without their header."""
+    path = tmp_path / "titles.gz"
+    path.write_bytes(gzip.compress(b"page_title\nSaint_Petersburg\n\n"))
+    index = TitleIndex.from_file(str(path))
+    assert len(index) == 1
+    assert "saint petersburg" in index
+    assert "page_title" not in index
+
+
+@pytest.mark.parametrize("status_code,body,url", [(200, body, API_URL)])
+def test_fetch_resolves_queries(response, index):
+    """Test misspelled queries are sent for the resolved title."""
+    instruments = Instruments()
+    client = Client(titles=index, instruments=instruments)
+    stats = Counters()
+    result = wikinode.fetch("python (progr", client=client, stats=stats)
+    assert result["query"] == "python (progr"
+    assert response.calls[0].request.url == (
+        f"{API_URL}/Python_%28programming_language%29?redirect=true"
+    )
+    assert stats["resolved"] == 1
+    # unresolved queries are still sent unless the index is strict
+    wikinode.fetch("unknown page", client=client)
+    assert len(response.calls) == 2
+    assert index.resolved_rate == 0.5
+    text = instruments.to_prometheus()
+    assert 'wikinode_title_lookups_total{outcome="resolved"} 1\n' in text
+    assert 'wikinode_title_lookups_total{outcome="unresolved"} 1\n' in text
+
+
+def test_fetch_strict(mocker):
+    """Test a strict index answers unknown queries without a request."""
+    client = Client(titles=TitleIndex(titles, strict=True))
+    get_json = mocker.patch.object(client, "get_json")
+    stats = Counters()
+    assert wikinode.fetch("unknown page", client=client, stats=stats) == {}
+    meta = wikinode.fetch_many(
+        ["unknown page"], meta=True, bulk=True, client=client
+    )
+    assert meta["not_found"] == ["unknown page"]
+    assert stats["unresolved"] == 1
+    get_json.assert_not_called()
@@ -0,0 +1,146 @@
+import re
+import time
+
+import pytest
+import responses as _responses
+import urllib3
+
+from wikinode import instrument, summary
+from wikinode.cache import MemoryCache
+from wikinode.client import Client
+from wikinode.instrument import Instruments
+from wikinode.requests import API_URL
+from tests.fixtures import body, body_redirect
+from benchmarks.server import MockServer
+
+
+@pytest.fixture
+def server_responses():
+    with _responses.RequestsMock() as rsps:
+        url = re.compile(f"^{API_URL}")
+        rsps.add(_responses.GET, url, status=503)
+        rsps.add(_responses.GET, url, status=302, headers={"Location": "X"})
+        rsps.add(_responses.GET, url, json=body_redirect)
+        rsps.add(_responses.GET, url, json=body)
+        yield rsps
+
+
+def test_instruments_hooks_and_counters(server_responses, mocker):
+    """Test hooks receive timings and counters track requests."""
+    mocker.patch("wikinode.client.time.sleep")
+    instruments = Instruments()
+    events = []
+    instruments.add_hook(events.append)
+    client = Client(cache=MemoryCache(), instruments=instruments)
+    summary.fetch("Leningrad", client=client)
+    summary.fetch("Leningrad", client=client)
+    summary.fetch("hello world", client=client)
+    assert len(events) == 2
+    event = events[0]
+    assert event.status_code == 200
+    assert event.redirects == 1
+    assert event.retries == 1
+    for stage in ("connect", "ttfb", "download", "decode"):
+        assert getattr(event, stage) >= 0
+    snapshot = instruments.snapshot()
+    assert snapshot["requests"] == 2
+    assert snapshot["status_200"] == 2
+    assert snapshot["redirects"] == 1
+    assert snapshot["retries"] == 1
+    assert snapshot["cache_hits"] == 1
+    assert snapshot["cache_misses"] == 2
+    assert snapshot["decode_seconds"] == pytest.approx(
+        sum(event.decode for event in events)
+    )
+
+
+def test_instruments_prometheus_export():
+    """Test counters are exported in the Prometheus text format."""
+    instruments = Instruments()
+    instruments.stats.incr("status_200", 3)
+    instruments.stats.incr("status_404")
+    instruments.stats.incr("retries", 2)
+    text = instruments.to_prometheus()
+    assert 'wikinode_requests_total{status="200"} 3\n' in text
+    assert 'wikinode_requests_total{status="404"} 1\n' in text
+    assert "# TYPE wikinode_retries_total counter\n" in text
+    assert "wikinode_retries_total 2\n" in text
+    assert 'wikinode_stage_seconds_total{stage="ttfb"} 0\n' in text
+
+
+def test_instruments_connect_time(mocker):
+    """Test connect time is only reported for new connections."""
+    instruments = Instruments()
+    events = []
+    instruments.add_hook(events.append)
+    client = Client(instruments=instruments)
+    with MockServer(latency=0.01) as server:
+        mocker.patch("wikinode.summary.API_URL", server.api_url)
+        summary.fetch("hello world", client=client)
+        summary.fetch("python language", client=client)
+    assert events[0].connect > 0
+    assert events[1].connect == 0
+    assert events[0].ttfb >= 0.01
+
+
+def test_instruments_stages_add_up(mocker):
+    """Test slow connections are not counted as waiting for the answer."""
+    instruments = Instruments()
+    events = []
+    instruments.add_hook(events.append)
+    client = Client(instruments=instruments)
+    connect = urllib3.util.connection.create_connection
+
+    def slow_connect(*args, **kwargs):
+        time.sleep(0.2)
+        return connect(*args, **kwargs)
+
+    mocker.patch("urllib3.util.connection.create_connection", slow_connect)
+    with MockServer(latency=0.01) as server:
+        mocker.patch("wikinode.summary.API_URL", server.api_url)
+        start = time.perf_counter()
+        summary.fetch("hello world", client=client)
+        elapsed = time.perf_counter() - start
+    event = events[0]
+    assert event.connect >= 0.2
+    assert event.ttfb < 0.2
+    stages = sum(getattr(event, stage) for stage in instrument.stages)
+    assert stages <= elapsed
+
+
+@pytest.mark.parametrize("status_code,body,url", [(200, body, API_URL)])
+def test_no_instruments(response, mocker):
+    """Test clients without instruments skip timing."""
+    client = Client()
+    get = mocker.spy(client.session, "get")
+    reset = mocker.patch("wikinode.instrument.reset_connect_seconds")
+    summary.fetch("hello world", client=client)
+    assert "stream" not in get.call_args.kwargs
+    reset.assert_not_called()
+
+
+@pytest.mark.parametrize("accept_encoding", [None, "identity"])
+def test_instruments_response_size(mocker, accept_encoding):
+    """Test compressed and decompressed body sizes are recorded."""
+    instruments = Instruments()
+    events = []
+    instruments.add_hook(events.append)
+    headers = {"Accept-Encoding": accept_encoding} if accept_encoding else {}
+    client = Client(instruments=instruments, headers=headers)
+    with MockServer(payload_size=8192) as server:
+        mocker.patch("wikinode.summary.API_URL", server.api_url)
+        result = summary.fetch("hello world", client=client)
+    assert result["title"] == "Hello world"
+    event = events[0]
+    assert event.body_bytes > 8000
+    if accept_encoding == "identity":
+        assert event.wire_bytes == event.body_bytes
+    else:
+        assert event.wire_bytes < event.body_bytes / 2
+    assert event.decompress >= 0
+    snapshot = instruments.snapshot()
+    assert snapshot["wire_bytes"] == event.wire_bytes
+    assert snapshot["body_bytes"] == event.body_bytes
+    text = instruments.to_prometheus()
+    line = f'wikinode_response_bytes_total{{size="wire"}} {event.wire_bytes}'
+    assert line in text
@@ -0,0 +1,198 @@
+import gc
+import gzip
+import json
+import multiprocessing
+import weakref
+
+import pytest
+
+import wikinode
+from wikinode import offline
+from wikinode.client import Client
+from wikinode.exceptions import QueryAmbiguousError
+from wikinode.requests import API_URL
+from wikinode.stats import Counters
+from tests.fixtures import body, body_ambiguous, body_redirect
+
+
+abstracts = """<feed>
+<doc>
+<title>Wikipedia: Saint Petersburg</title>
+<url>https://en.wikipedia.org/wiki/Saint_Petersburg</url>
+<abstract>Saint Petersburg is the second-largest city in Russia.</abstract>
+<links><sublink linktype="nav"><anchor>History</anchor></sublink></links>
+</doc>
+<doc>
+<title>Wikipedia: Mercury</title>
+<url>https://en.wikipedia.org/wiki/Mercury</url>
+<abstract>Mercury may refer to:</abstract>
+</doc>
+</feed>
+"""
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = str(tmp_path / "summaries.idx")
+    offline.build(
+        [
+            body,
+            body_ambiguous,
+            body_redirect,
+            {"redirect": "Leningrad", "title": "Saint Petersburg"},
+            {"redirect": "Petrograd", "title": "leningrad"},
+        ],
+        path,
+    )
+    with offline.OfflineIndex(path) as index:
+        yield index
+
+
+def test_build(index):
+    """Test titles are stored sorted with the payload fields only."""
+    assert len(index) == 5
+    assert list(index.titles()) == sorted(index.titles())
+    assert "leningrad" in index
+    data = dict(body_redirect)
+    del data["content_urls"]
+    assert index.payload("Saint Petersburg") == data
+    assert index.payload("Unknown") is None
+
+
+def test_redirects(index):
+    """Test redirects are followed, including chains of them."""
+    assert index.payload("Leningrad")["title"] == "Saint Petersburg"
+    assert index.payload("Petrograd")["title"] == "Saint Petersburg"
+
+
+def test_read_abstracts(tmp_path):
+    """Test abstracts dumps are read, gzipped or not."""
+    path = tmp_path / "abstract.xml.gz"
+    path.write_bytes(gzip.compress(abstracts.encode()))
+    records = list(offline.read_abstracts(str(path)))
+    assert records == [
+        {
+            "type": "standard",
+            "title": "Saint Petersburg",
+            "extract": (
+                "Saint Petersburg is the second-largest city in Russia."
+            ),
+        },
+        {
+            "type": "disambiguation",
+            "title": "Mercury",
+            "extract": "Mercury may refer to:",
+        },
+    ]
+
+
+def test_read_abstracts_clears_feed(tmp_path, mocker):
+    """Test docs already read are not kept by the feed element."""
+    path = tmp_path / "abstract.xml"
+    path.write_text(abstracts)
+    iterparse = offline.ElementTree.iterparse
+    docs = []
+
+    def spy(*args, **kwargs):
+        for event, element in iterparse(*args, **kwargs):
+            if element.tag == "doc" and event == "end":
+                docs.append(weakref.ref(element))
+            yield event, element
+
+    mocker.patch("wikinode.offline.ElementTree.iterparse", spy)
+    records = offline.read_abstracts(str(path))
+    next(records)
+    next(records)
+    gc.collect()
+    assert docs[0]() is None
+    records.close()
+
+
+def test_main(tmp_path):
+    """Test the command line builds an index from a dump and redirects."""
+    dump = tmp_path / "summaries.ndjson"
+    dump.write_text(json.dumps(body_redirect) + "\n\n")
+    redirects = tmp_path / "redirects.tsv"
+    redirects.write_text("Leningrad\tSaint_Petersburg\n")
+    output = str(tmp_path / "out.idx")
+    offline.main([str(dump), output, "--redirects", str(redirects)])
+    with offline.OfflineIndex(output) as index:
+        assert index.payload("Leningrad")["title"] == "Saint Petersburg"
+
+
+def test_invalid_index(tmp_path):
+    """Test files that are not indexes are rejected."""
+    path = tmp_path / "other.idx"
+    path.write_bytes(b"\0" * offline.HEADER.size)
+    with pytest.raises(ValueError):
+        offline.OfflineIndex(str(path))
+
+
+def test_fetch(mocker, index):
+    """Test the index answers queries without touching the network."""
+    client = Client(index=index)
+    get_json = mocker.patch.object(client, "get_json")
+    stats = Counters()
+    result = wikinode.fetch("leningrad", client=client, stats=stats)
+    assert result["title"] == "Saint Petersburg"
+    assert wikinode.fetch("unknown page", client=client) == {}
+    with pytest.raises(QueryAmbiguousError):
+        wikinode.fetch("micro", client=client)
+    meta = wikinode.fetch_many(
+        ["Leningrad", "Micro", "Unknown"], meta=True, client=client
+    )
+    assert meta["hits"] == 1
+    assert meta["ambiguous"] == ["Micro"]
+    assert meta["not_found"] == ["Unknown"]
+    assert stats["indexed"] == 1
+    get_json.assert_not_called()
+
+
+def test_fetch_bulk(mocker, index):
+    """Test bulk requests skip queries answered by the index."""
+    client = Client(index=index)
+    send_batch = mocker.patch.object(wikinode.action, "send_batch")
+    stats = Counters()
+    meta = wikinode.fetch_many(
+        ["Leningrad", "Unknown"],
+        meta=True,
+        bulk=True,
+        client=client,
+        stats=stats,
+    )
+    assert meta["results"][0]["title"] == "Saint Petersburg"
+    assert meta["not_found"] == ["Unknown"]
+    assert stats["indexed"] == 2
+    send_batch.assert_not_called()
+
+
+@pytest.mark.parametrize("status_code,body,url", [(200, body, API_URL)])
+def test_fallback(response, tmp_path):
+    """Test titles missing from a fallback index are requested."""
+    path = str(tmp_path / "summaries.idx")
+    offline.build([body_redirect], path)
+    client = Client(index=offline.OfflineIndex(path, fallback=True))
+    assert wikinode.fetch("hello world", client=client)["title"] == (
+        body["title"]
+    )
+    assert wikinode.fetch("Saint Petersburg", client=client)["title"] == (
+        "Saint Petersburg"
+    )
+    assert len(response.calls) == 1
+
+
+def _lookup(path, title, results):
+    with offline.OfflineIndex(path) as index:
+        results.put(index.payload(title)["title"])
+
+
+def test_processes(index):
+    """Test worker processes open the same index file."""
+    context = multiprocessing.get_context()
+    results = context.Queue()
+    worker = context.Process(
+        target=_lookup, args=(index.path, "Leningrad", results)
+    )
+    worker.start()
+    assert results.get(timeout=10) == "Saint Petersburg"
+    worker.join()
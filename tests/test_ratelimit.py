@@ -0,0 +1,113 @@
+import re
+
+import pytest
+import responses as _responses
+
+from wikinode import summary
+from wikinode.client import Client
+from wikinode.exceptions import RequestFailedError
+from wikinode.ratelimit import RateLimiter, parse_retry_after, retry_delay
+from wikinode.requests import API_URL
+from tests.fixtures import body
+
+
+@pytest.fixture
+def clock(mocker):
+    now = [100.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    mocker.patch("wikinode.ratelimit.time.monotonic", lambda: now[0])
+    mocker.patch("wikinode.ratelimit.time.sleep", side_effect=sleep)
+    mocker.patch("wikinode.client.time.sleep", side_effect=sleep)
+    return now
+
+
+def test_rate_limiter_burst_then_rate(clock):
+    """Test limiter lets a burst through, then spaces requests out."""
+    limiter = RateLimiter(rate=10, burst=3)
+    assert [limiter.reserve() for _ in range(3)] == [0, 0, 0]
+    assert limiter.reserve() == pytest.approx(0.1)
+    assert limiter.reserve() == pytest.approx(0.2)
+    clock[0] += 10
+    assert limiter.reserve() == 0
+
+
+def test_rate_limiter_adapts(clock):
+    """Test limiter slows down on pushback and recovers on success."""
+    limiter = RateLimiter(rate=10, burst=1, min_rate=2)
+    limiter.backoff(pause=5)
+    assert limiter.rate == 5
+    assert limiter.reserve() == pytest.approx(5)
+    limiter.backoff()
+    limiter.backoff()
+    assert limiter.rate == 2
+    for _ in range(100):
+        limiter.recover()
+    assert limiter.rate == 10
+
+
+def test_parse_retry_after(mocker):
+    """Test both forms of the Retry-After header are understood."""
+    mocker.patch("wikinode.ratelimit.time.time", return_value=1593705600)
+    assert parse_retry_after("3") == 3
+    assert parse_retry_after("Thu, 02 Jul 2020 16:00:10 GMT") == 10
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_retry_delay_jitter():
+    """Test backoff window grows exponentially up to its maximum."""
+    assert retry_delay(0, retry_after=7) == 7
+    for attempt in range(10):
+        delay = retry_delay(attempt, backoff_factor=0.5, max_backoff=30)
+        assert 0 <= delay <= min(30, 0.5 * 2 ** attempt)
+
+
+@pytest.fixture
+def flaky_server():
+    """Stub server pushing back twice before answering."""
+    with _responses.RequestsMock() as rsps:
+        url = re.compile(f"^{API_URL}")
+        rsps.add(_responses.GET, url, status=429, headers={"Retry-After": "2"})
+        rsps.add(_responses.GET, url, status=503)
+        rsps.add(_responses.GET, url, status=502)
+        rsps.add(_responses.GET, url, json=body)
+        yield rsps
+
+
+def test_client_retries_with_backoff(flaky_server, clock):
+    """Test client retries pushback, honors Retry-After and slows down."""
+    limiter = RateLimiter(rate=8, burst=8)
+    client = Client(limiter=limiter, max_retries=3)
+    start = clock[0]
+    result = summary.fetch("hello world", client=client)
+    assert result["title"] == body["title"]
+    assert len(flaky_server.calls) == 4
+    assert clock[0] - start >= 2
+    # halved twice, then one success
+    assert limiter.rate == pytest.approx(2 + 8 / 100)
+
+
+def test_client_gives_up_after_retries(flaky_server, clock):
+    """Test client raises once retries are exhausted."""
+    client = Client(max_retries=1)
+    with pytest.raises(RequestFailedError) as exc:
+        summary.fetch("hello world", client=client)
+    assert exc.value.status_code == 503
+    assert len(flaky_server.calls) == 2
+    # the stub still holds unused responses
+    flaky_server.reset()
+
+
+def test_fetch_many_reports_failed_queries(mocker):
+    """Test fetch_many lists queries that kept failing in meta."""
+    fetch_mock = mocker.patch("wikinode.summary.fetch")
+    fetch_mock.side_effect = [
+        {"query": "hello world", "title": body["title"]},
+        RequestFailedError(API_URL, 429),
+    ]
+    results = summary.fetch_many(["hello world", "Chicago"], meta=True)
+    assert results["hits"] == 1
+    assert results["failed"] == ["Chicago"]
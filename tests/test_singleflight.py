@@ -0,0 +1,55 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from wikinode.singleflight import SingleFlight
+
+
+def test_single_flight_shares_concurrent_calls():
+    """Test concurrent callers for one key share a single call."""
+    flights = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def slow():
+        calls.append(1)
+        release.wait(1)
+        return "payload"
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [
+            executor.submit(flights.do, "Hello world", slow) for _ in range(8)
+        ]
+        time.sleep(0.05)
+        release.set()
+        results = [future.result() for future in futures]
+    assert len(calls) == 1
+    assert [result for result, _ in results] == ["payload"] * 8
+    assert sorted(shared for _, shared in results) == [False] + [True] * 7
+
+
+def test_single_flight_propagates_errors():
+    """Test waiting callers receive the leader's exception."""
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def failing():
+        release.wait(1)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(flights.do, "A", failing) for _ in range(2)]
+        time.sleep(0.05)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result()
+
+
+def test_single_flight_runs_again_after_completion():
+    """Test a finished call is not reused by later callers."""
+    flights = SingleFlight()
+    assert flights.do("A", lambda: 1) == (1, False)
+    assert flights.do("A", lambda: 2) == (2, False)
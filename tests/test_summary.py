@@ -1,8 +1,26 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
 import pytest
 
 from wikinode import summary
-from wikinode.exceptions import QueryAmbiguousError
-from wikinode.requests import USER_AGENT, API_URL, RANDOM_SUMMARY_URL
+from wikinode.cache import MemoryCache
+from wikinode.client import Client
+from wikinode.exceptions import (
+    QueryAmbiguousError,
+    RequestFailedError,
+    RequestTimeoutError,
+)
+from wikinode.requests import (
+    USER_AGENT,
+    API_URL,
+    RANDOM_SUMMARY_URL,
+    summary_url,
+)
+from wikinode.stats import Counters
+from wikinode.titles import AliasMap
 from tests.fixtures import (
     body,
     body_not_found,
@@ -111,6 +129,41 @@ def test_fetch_permanent_redirects(responses):
     assert result["extract"] == body["extract"]
 
 
+@pytest.mark.parametrize(
+    "data",
+    [
+        [
+            (302, "", {"Location": "Saint_Petersburg"}, API_URL),
+            (200, body_redirect, {}, API_URL),
+        ]
+    ],
+)
+def test_fetch_learns_aliases(responses, tmp_path):
+    """Test known aliases are sent straight to the canonical title."""
+    path = str(tmp_path / "aliases.jsonl")
+    client = Client(aliases=AliasMap(path))
+    summary.fetch("Leningrad", client=client)
+    assert client.aliases.get("Leningrad") == "Saint Petersburg"
+    result = summary.fetch("leningrad", client=client)
+    assert len(responses.calls) == 3
+    assert responses.calls[2].request.url == (
+        f"{API_URL}/Saint_Petersburg?redirect=true"
+    )
+    assert result["query"] == "leningrad"
+    assert result["title"] == body_redirect["title"]
+    # aliases are loaded by later clients
+    assert AliasMap(path).resolve("leningrad") == "Saint Petersburg"
+
+
+@pytest.mark.parametrize("status_code,body,url", [(200, body, API_URL)])
+def test_fetch_encodes_query(response):
+    """Test queries are normalized and percent-encoded in the URL."""
+    summary.fetch("  ac/dc_live? #1 ", client=Client())
+    assert response.calls[0].request.url == (
+        f"{API_URL}/Ac%2Fdc_live%3F_%231?redirect=true"
+    )
+
+
 @pytest.mark.parametrize("status_code,body,url", [(200, body, API_URL)])
 def test_fetch_remove_extract_field(response):
     """Test 'extract' field removal from result."""
@@ -232,7 +285,7 @@ def test_fetch_many_with_meta_data(mocker):
 )
 def test_fetch_input(mocker, input):
     """Test fetch raises exception when query is not a string."""
-    mocker.patch("wikinode.summary.requests.get")  # prevent HTTP real requests
+    mocker.patch("wikinode.client.Client.get")  # prevent HTTP real requests
     with pytest.raises(ValueError) as exc:
         summary.fetch(input)
     assert "Invalid argument. Argument must have type 'str'." in str(exc.value)
@@ -299,3 +352,425 @@ def test_fetch_random_remove_extract_field(response):
     assert set(result.keys()) == set(["title", "description"])
     assert result["title"] == body["title"]
     assert result["description"] == body["description"]
+
+
+def test_fetch_many_concurrently(mocker):
+    """
+    Test function keeps results in order when queries run concurrently.
+    """
+    results_by_query = dict(
+        zip(
+            ["hello world", "micro", "python language", "hello123", "Chicago"],
+            fetch_results_mixed,
+        )
+    )
+
+    def fake_fetch(query, short=False):
+        # finish the first queries last
+        time.sleep(0.01 * (len(queries) - queries.index(query)))
+        result = results_by_query[query]
+        if isinstance(result, QueryAmbiguousError):
+            raise result
+        return result
+
+    fetch_mock = mocker.patch("wikinode.summary.fetch")
+    fetch_mock.side_effect = fake_fetch
+    queries = list(results_by_query)
+    results = summary.fetch_many(queries, meta=True, max_workers=5)
+    assert fetch_mock.call_count == 5
+    for query in queries:
+        fetch_mock.assert_any_call(query, short=False)
+    assert results["hits"] == 3
+    assert results["not_found"] == ["hello123"]
+    assert results["ambiguous"] == ["micro"]
+    assert results["results"] == [
+        fetch_results_mixed[0],  # hello world
+        fetch_results_mixed[2],  # python language
+        fetch_results_mixed[4],  # Chicago
+    ]
+
+
+def test_fetch_many_deduplicates_queries(mocker):
+    """
+    Test function requests each page once and keeps duplicates in order.
+    """
+    fetch_mock = mocker.patch("wikinode.summary.fetch")
+    fetch_mock.side_effect = fetch_results_mixed
+    queries = [
+        "hello world",
+        "micro",
+        "Hello_world",
+        "python language",
+        "hello123",
+        "Chicago",
+        "micro",
+        "hello123",
+        "chicago",
+    ]
+    results = summary.fetch_many(queries, meta=True, max_workers=2)
+    assert fetch_mock.call_count == 5
+    assert results["hits"] == 5
+    assert results["not_found"] == ["hello123", "hello123"]
+    assert results["ambiguous"] == ["micro", "micro"]
+    assert [result["query"] for result in results["results"]] == [
+        "hello world",
+        "Hello_world",
+        "python language",
+        "Chicago",
+        "chicago",
+    ]
+    assert results["results"][1] == {
+        **fetch_results_mixed[0],
+        "query": "Hello_world",
+    }
+
+
+@pytest.mark.parametrize("status_code,body,url", [(200, body, API_URL)])
+def test_fetch_coalesces_concurrent_requests(response, mocker):
+    """Test concurrent fetches for one page share a single request."""
+    release = threading.Event()
+    client = Client()
+    get_json = client.get_json
+
+    def slow_get_json(*args, **kwargs):
+        release.wait(1)
+        return get_json(*args, **kwargs)
+
+    mocker.patch.object(client, "get_json", side_effect=slow_get_json)
+    stats = Counters()
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        futures = [
+            executor.submit(summary.fetch, query, client=client, stats=stats)
+            for query in ["hello world", "Hello world", "hello_world"] * 2
+        ]
+        time.sleep(0.05)
+        release.set()
+        results = [future.result() for future in futures]
+    assert len(response.calls) == 1
+    assert results[1]["query"] == "Hello world"
+    assert results[1]["title"] == body["title"]
+    assert stats.snapshot() == {"downloaded": 1, "coalesced": 5}
+
+
+def test_iter_fetch(mocker):
+    """
+    Test generator yields tagged results while reading queries lazily.
+    """
+    results_by_query = dict(
+        zip(
+            ["hello world", "micro", "python language", "hello123", "Chicago"],
+            fetch_results_mixed,
+        )
+    )
+    results_by_query["failing"] = RequestFailedError(API_URL, 503)
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+
+    def fake_fetch(query, short=False):
+        with lock:
+            in_flight.append(query)
+            peak.append(len(in_flight))
+        time.sleep(0.01)
+        with lock:
+            in_flight.remove(query)
+        result = results_by_query[query]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    read = []
+
+    def queries():
+        for query in results_by_query:
+            read.append(query)
+            yield query
+
+    mocker.patch("wikinode.summary.fetch", side_effect=fake_fetch)
+    results = summary.iter_fetch(queries(), max_workers=2)
+    first = next(results)
+    assert len(read) <= 3
+    results = [first, *results]
+    assert max(peak) <= 2
+    assert sorted(results, key=lambda result: result.query) == sorted(
+        [
+            ("hello world", "hit", fetch_results_mixed[0]),
+            ("micro", "ambiguous", {}),
+            ("python language", "hit", fetch_results_mixed[2]),
+            ("hello123", "not_found", {}),
+            ("Chicago", "hit", fetch_results_mixed[4]),
+            ("failing", "failed", {}),
+        ],
+        key=lambda result: result[0],
+    )
+
+
+@pytest.mark.parametrize("status_code,body,url", [(200, body, API_URL)])
+def test_fetch_compact(response):
+    """Test compact results match the dict results."""
+    result = summary.fetch("hello world", compact=True)
+    assert isinstance(result, summary.Summary)
+    assert not hasattr(result, "__dict__")
+    assert result.title == body["title"]
+    assert result.to_dict() == summary.fetch("hello world")
+    short = summary.fetch("hello world", short=True, compact=True)
+    assert short.extract is None
+    assert short.to_dict() == summary.fetch("hello world", short=True)
+
+
+@pytest.mark.parametrize(
+    "status_code,body,url", [(200, body, RANDOM_SUMMARY_URL)]
+)
+def test_fetch_random_compact(response):
+    """Test compact random results have no query."""
+    result = summary.fetch_random(compact=True)
+    assert result.query is None
+    assert set(result.to_dict()) == set(["title", "description", "extract"])
+
+
+@pytest.mark.parametrize("status_code,body,url", [(200, body, API_URL)])
+def test_fetch_many_compact(response):
+    """Test compact results of duplicate queries keep their own query."""
+    results = summary.fetch_many(["hello world", "Hello_world"], compact=True)
+    assert len(response.calls) == 1
+    assert [result.query for result in results] == [
+        "hello world",
+        "Hello_world",
+    ]
+    assert results[0].replace(query="Hello_world") == results[1]
+
+
+body_extended = {
+    **body,
+    "pageid": 13834,
+    "revision": "1001867466",
+    "timestamp": "2021-01-21T18:24:05Z",
+    "thumbnail": {"source": "https://upload...", "width": 320},
+    "coordinates": {"lat": 41.88, "lon": -87.63},
+}
+
+
+@pytest.mark.parametrize(
+    "status_code,body,url", [(200, body_extended, API_URL)]
+)
+def test_fetch_fields(response):
+    """Test fetch returns the projected fields, including nested ones."""
+    result = summary.fetch(
+        "hello world",
+        fields=["pageid", "revision", "thumbnail.source", "coordinates.alt"],
+    )
+    assert result == {
+        "query": "hello world",
+        "pageid": 13834,
+        "revision": "1001867466",
+        "thumbnail.source": "https://upload...",
+    }
+    result = summary.fetch(
+        "hello world", short=True, fields=["title", "extract", "timestamp"]
+    )
+    assert result == {
+        "query": "hello world",
+        "title": body["title"],
+        "timestamp": "2021-01-21T18:24:05Z",
+    }
+
+
+@pytest.mark.parametrize(
+    "status_code,body,url", [(200, body_extended, API_URL)]
+)
+def test_fetch_many_fields(response):
+    """Test fetch_many applies one projection to every result."""
+    results = summary.fetch_many(
+        ["hello world", "Hello_world"], fields=["pageid"], max_workers=2
+    )
+    assert results == [
+        {"query": "hello world", "pageid": 13834},
+        {"query": "Hello_world", "pageid": 13834},
+    ]
+
+
+@pytest.mark.parametrize(
+    "status_code,body,url", [(200, body_extended, RANDOM_SUMMARY_URL)]
+)
+def test_fetch_random_fields(response):
+    """Test fetch_random returns the projected fields."""
+    result = summary.fetch_random(fields=["title", "coordinates"])
+    assert result == {
+        "title": body["title"],
+        "coordinates": {"lat": 41.88, "lon": -87.63},
+    }
+
+
+@pytest.mark.parametrize(
+    "fields,options",
+    [
+        (["content_urls.desktop"], {}),
+        ("title", {}),
+        (["title"], {"compact": True}),
+    ],
+)
+def test_fetch_fields_input(mocker, fields, options):
+    """Test invalid fields fail before any request is sent."""
+    get_json = mocker.patch("wikinode.client.Client.get_json")
+    with pytest.raises(ValueError):
+        summary.fetch("hello world", fields=fields, **options)
+    with pytest.raises(ValueError):
+        summary.fetch_many(["hello world"], fields=fields, **options)
+    get_json.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "status_code,body,url", [(200, body_extended, API_URL)]
+)
+def test_fetch_fields_extra_fields(response):
+    """Test fields may reach into the client's extra fields."""
+    client = Client(extra_fields=["content_urls"])
+    result = summary.fetch(
+        "hello world", client=client, fields=["content_urls.mobile.page"]
+    )
+    assert result == {
+        "query": "hello world",
+        "content_urls.mobile.page": "...",
+    }
+
+
+def test_fetch_many_deadline(mocker):
+    """Test queries not answered by the deadline are reported apart."""
+    release = threading.Event()
+
+    def fake_fetch(query, short, timeout):
+        if query == "slow":
+            release.wait(timeout)
+            raise RequestTimeoutError(API_URL, timeout)
+        return {"query": query}
+
+    fetch_mock = mocker.patch("wikinode.summary.fetch", side_effect=fake_fetch)
+    start = time.monotonic()
+    results = summary.fetch_many(
+        ["hello world", "slow", "Chicago"],
+        meta=True,
+        max_workers=3,
+        deadline=0.2,
+    )
+    release.set()
+    assert time.monotonic() - start < 1
+    assert results["hits"] == 2
+    assert results["timed_out"] == ["slow"]
+    assert results["failed"] == []
+    assert 0 < fetch_mock.call_args.kwargs["timeout"] <= 0.2
+
+
+def test_fetch_many_deadline_queued(mocker):
+    """Test queries still queued at the deadline are never sent."""
+
+    def fake_fetch(query, short, timeout):
+        time.sleep(0.3)
+        return {"query": query}
+
+    fetch_mock = mocker.patch("wikinode.summary.fetch", side_effect=fake_fetch)
+    results = summary.fetch_many(["a", "b", "c"], meta=True, deadline=0.1)
+    assert fetch_mock.call_count == 1
+    assert results["timed_out"] == ["b", "c"]
+
+
+fr_body = {
+    "type": "standard",
+    "title": "Paris",
+    "description": "capitale de la France",
+    "extract": "Paris est la capitale de la France.",
+}
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        [
+            (200, fr_body, {}, summary_url("fr")),
+            (200, body_redirect, {}, API_URL),
+        ]
+    ],
+)
+def test_fetch_lang(responses):
+    """Test queries go to the wiki of their language, cached apart."""
+    client = Client(cache=MemoryCache())
+    result = summary.fetch("paris", lang="fr", client=client)
+    assert responses.calls[0].request.url == (
+        "https://fr.wikipedia.org/api/rest_v1/page/summary/Paris"
+        "?redirect=true"
+    )
+    assert result["description"] == fr_body["description"]
+    result = summary.fetch("Paris", client=client)
+    assert result["title"] == body_redirect["title"]
+    result = summary.fetch("Paris", lang="fr", client=client)
+    assert result["description"] == fr_body["description"]
+    assert len(responses.calls) == 2
+    french = Client(lang="fr")
+    assert summary.fetch("Paris", client=french)["title"] == "Paris"
+
+
+wiktionary_body = {
+    "type": "standard",
+    "title": "apple",
+    "extract": "A common, round fruit produced by the tree Malus domestica.",
+}
+
+
+@pytest.mark.parametrize(
+    "data", [[(200, wiktionary_body, {}, summary_url("en.wiktionary.org"))]]
+)
+def test_fetch_case_sensitive_wiki(responses):
+    """Test titles of case-sensitive wikis keep their first letter."""
+    cache = MemoryCache()
+    client = Client(cache=cache)
+    result = summary.fetch("apple", lang="en.wiktionary.org", client=client)
+    assert responses.calls[0].request.url == (
+        "https://en.wiktionary.org/api/rest_v1/page/summary/apple"
+        "?redirect=true"
+    )
+    assert result["title"] == "apple"
+    assert cache.get("en.wiktionary.org:apple") is not None
+    assert cache.get("en.wiktionary.org:Apple") is None
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        [
+            (200, fr_body, {}, summary_url("fr")),
+            (200, body_ambiguous, {}, summary_url("de")),
+            (200, body, {}, API_URL),
+        ]
+    ],
+)
+def test_fetch_many_languages(responses):
+    """Test mixed-language batches come back in input order."""
+    queries = [("Paris", "fr"), "hello world", ("Paris", "de"), "Paris"]
+    results = summary.fetch_many(
+        queries, meta=True, max_workers=4, client=Client()
+    )
+    assert [result["title"] for result in results["results"]] == [
+        "Paris",
+        body["title"],
+        body["title"],
+    ]
+    assert [result["query"] for result in results["results"]] == [
+        "Paris",
+        "hello world",
+        "Paris",
+    ]
+    assert results["ambiguous"] == [("Paris", "de")]
+    hosts = sorted(
+        urlparse(call.request.url).hostname for call in responses.calls
+    )
+    assert hosts == [
+        "de.wikipedia.org",
+        "en.wikipedia.org",
+        "en.wikipedia.org",
+        "fr.wikipedia.org",
+    ]
+
+
+def test_fetch_many_query_pairs_input():
+    """Test queries must be strings or (query, lang) pairs."""
+    with pytest.raises(ValueError):
+        summary.fetch_many([("Paris", "fr", "extra")])
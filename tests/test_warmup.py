@@ -0,0 +1,97 @@
+import time
+
+import pytest
+import responses as _responses
+
+import wikinode
+from wikinode import warmup
+from wikinode.cache import MemoryCache
+from wikinode.client import Client
+from wikinode.requests import API_URL
+from tests.fixtures import body, body_not_found
+
+
+@pytest.mark.parametrize("status_code,body,url", [(200, body, API_URL)])
+def test_prefetch(response):
+    """Test prefetched titles are served from the cache."""
+    client = Client(cache=MemoryCache())
+    warmup = wikinode.prefetch(
+        ["hello world", "Hello_world", "python language"], client
+    )
+    assert warmup.wait(timeout=5)
+    assert warmup.done()
+    assert warmup.total == 2
+    assert warmup.progress == 1.0
+    assert warmup.stats["fetched"] == 2
+    calls = len(response.calls)
+    result = wikinode.fetch("Python language", client=client)
+    assert len(response.calls) == calls == 2
+    assert result["title"] == body["title"]
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize("status_code,body,url", [(200, body, API_URL)])
+def test_prefetch_refresh_ahead(response, mocker):
+    """Test hot entries are requested again before they expire."""
+    # every entry is due again as soon as it is scheduled
+    mocker.patch.object(
+        warmup.Prefetcher, "_due", lambda self, title, data: time.monotonic()
+    )
+    client = Client(cache=MemoryCache(ttl=60))
+    prefetcher = wikinode.prefetch(["hello world"], client, refresh_ahead=1)
+    assert prefetcher.wait(timeout=5)
+    wait_for(lambda: prefetcher.stats["refreshed"] >= 2)
+    prefetcher.stop()
+    assert len(response.calls) == 1 + prefetcher.stats["refreshed"]
+    assert client.cache.get("Hello world")["title"] == body["title"]
+
+
+def test_prefetch_due(mocker):
+    """Test entries are refreshed ahead of their expiry."""
+    mocker.patch("wikinode.warmup.time.monotonic", return_value=100)
+    mocker.patch("wikinode.warmup.time.time", return_value=1000)
+    cache = MemoryCache(ttl=60, negative_ttl=8)
+    cache.set("Hello world", body)
+    cache.set("Hello123", body_not_found)
+    prefetcher = warmup.Prefetcher([], Client(cache=cache), refresh_ahead=5)
+    assert prefetcher._due("hello world", body) == 155
+    # negative entries and failures are refreshed halfway through
+    assert prefetcher._due("hello123", body_not_found) == 104
+    assert prefetcher._due("hello world", None) == 105
+
+
+def test_prefetch_due_cached():
+    """Test entries cached before the prefetch keep their own expiry."""
+    cache = MemoryCache(ttl=60)
+    cache.set("Hello world", body)
+    # cached 40 seconds before the prefetch
+    entry = cache.lookup("Hello world")
+    cache._entries["Hello world"] = entry._replace(
+        expires_at=entry.expires_at - 40
+    )
+    prefetcher = warmup.Prefetcher(
+        ["hello world"], Client(cache=cache), refresh_ahead=5
+    )
+    start = time.monotonic()
+    with _responses.RequestsMock():
+        title, data = prefetcher._fetch("hello world")
+    assert data == body
+    assert start + 14 < prefetcher._due(title, data) < start + 16
+
+
+def test_prefetch_input():
+    """Test prefetching needs a cache that outlives the refresh window."""
+    with pytest.raises(ValueError):
+        wikinode.prefetch(["hello world"], Client())
+    with pytest.raises(ValueError):
+        wikinode.prefetch(
+            ["hello world"],
+            Client(cache=MemoryCache(ttl=60)),
+            refresh_ahead=60,
+        )
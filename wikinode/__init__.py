@@ -1,7 +1,12 @@
+from wikinode.client import Client
 from wikinode.summary import (
+    Summary,
     fetch,
     fetch_many,
+    iter_fetch,
     fetch_random,
+    fetch_random_many,
 )
+from wikinode.warmup import prefetch
 
 __version__ = "0.2.0"
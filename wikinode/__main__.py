@@ -0,0 +1,5 @@
+from wikinode.batch import main
+
+
+if __name__ == "__main__":
+    main()
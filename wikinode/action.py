@@ -0,0 +1,281 @@
+"""Bulk summaries through the MediaWiki Action API."""
+from concurrent.futures import ThreadPoolExecutor
+
+from wikinode.exceptions import RequestFailedError
+from wikinode.requests import (
+    ACTION_API_URL,
+    DEFAULT_HOST,
+    action_api_url,
+    wiki_host,
+)
+from wikinode.titles import normalize, page_key
+
+
+# most titles the Action API accepts in one request
+MAX_TITLES = 50
+# most links the Action API sends in one response
+MAX_LINKS = 500
+# bulk payloads have longer extracts than REST summaries, and no revision,
+# thumbnail or ETag, so they are cached under keys of their own; titles of
+# the default wiki start with a capital, so none is mistaken for one
+CACHE_KEY_PREFIX = "action:"
+
+
+def _chunks(items, size):
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def _wants(fields, field):
+    return fields is None or field in fields
+
+
+def _complete(short, fields):
+    """Return True when payloads get every field a summary may hold."""
+    wanted = _wants(fields, "description") and _wants(fields, "extract")
+    return wanted and not short
+
+
+def _api_url(client, lang):
+    host = client.host if lang is None else wiki_host(lang)
+    return ACTION_API_URL if host == DEFAULT_HOST else action_api_url(host)
+
+
+def _query_params(short, fields=None, **params):
+    # pageprops tells disambiguation pages apart and is always requested;
+    # the other properties are skipped when no field needs them
+    props = ["pageprops"]
+    if _wants(fields, "description"):
+        props.insert(0, "description")
+    params = {
+        "action": "query",
+        "format": "json",
+        "formatversion": "2",
+        "ppprop": "disambiguation",
+        **params,
+    }
+    if not short and _wants(fields, "extract"):
+        props.insert(0, "extracts")
+        params.update(exintro="1", explaintext="1", exlimit="max")
+    params["prop"] = "|".join(props)
+    return params
+
+
+def _send_query(params, client, lang=None):
+    """
+    Send an Action API query, following continuations until every page of
+    the batch is complete.
+
+    Returns:
+        (tuple): Title aliases from normalization and redirects, and the
+        pages by title, in the order the API sent them.
+    """
+    url = _api_url(client, lang)
+    aliases = {}
+    pages = {}
+    while True:
+        _, data = client.get_json(url, params=params)
+        query = data.get("query", {})
+        for alias in query.get("normalized", []) + query.get("redirects", []):
+            aliases[alias["from"]] = alias["to"]
+        for page in query.get("pages", []):
+            pages.setdefault(page["title"], {}).update(page)
+        # generator parameters start with "g"; continuing the generator
+        # alone would start the next batch
+        continuation = {
+            key: value
+            for key, value in data.get("continue", {}).items()
+            if not key.startswith("g")
+        }
+        if set(continuation) <= {"continue"}:
+            break
+        params = {**params, **data["continue"]}
+    return aliases, pages
+
+
+def _payload(page):
+    """Convert an Action API page into a REST summary-like payload."""
+    if not page or page.get("missing") or page.get("invalid"):
+        return {}
+    payload_type = "standard"
+    if "disambiguation" in page.get("pageprops", {}):
+        payload_type = "disambiguation"
+    payload = {"type": payload_type, "title": page["title"]}
+    for field in ("pageid", "description", "extract"):
+        if field in page:
+            payload[field] = page[field]
+    return payload
+
+
+def _resolve(title, aliases):
+    seen = set()
+    while title in aliases and title not in seen:
+        seen.add(title)
+        title = aliases[title]
+    return title
+
+
+def send_batch(titles, client, short=False, fields=None, lang=None):
+    """
+    Request up to :py:data:`MAX_TITLES` pages in one batch.
+
+    Continuations are followed until every page is complete; the API sends
+    fewer extracts than titles per response. When *fields* is given, page
+    properties none of them need, such as extracts, are not requested.
+    The batch goes to the client's wiki unless *lang* names another.
+
+    Returns:
+        (dict): Payload for each title as given. Normalized and redirected
+        titles are mapped back to the title that was asked for.
+    """
+    params = _query_params(
+        short, fields, redirects="1", titles="|".join(titles)
+    )
+    aliases, pages = _send_query(params, client, lang)
+    return {
+        title: _payload(pages.get(_resolve(title, aliases)))
+        for title in titles
+    }
+
+
+def send_random_batch(
+    client, size=MAX_TITLES, short=False, fields=None, lang=None
+):
+    """
+    Request up to *size* random articles in one batch.
+
+    The same article may appear in several batches. Like for
+    :py:func:`send_batch`, only the page properties *fields* need are
+    requested.
+
+    Returns:
+        (list): Summary payloads of the articles.
+    """
+    params = _query_params(
+        short,
+        fields,
+        generator="random",
+        grnnamespace="0",
+        grnlimit=str(size),
+    )
+    _, pages = _send_query(params, client, lang)
+    return [_payload(page) for page in pages.values()]
+
+
+def send_links(title, client, limit=MAX_LINKS, lang=None, deadline=None):
+    """
+    Request the titles of up to *limit* articles a page links to, such as
+    the candidates listed by a disambiguation page, in one request.
+
+    Returns:
+        (list): Linked titles, in the alphabetical order the API sends.
+    """
+    params = {
+        "action": "query",
+        "format": "json",
+        "formatversion": "2",
+        "redirects": "1",
+        "prop": "links",
+        "plnamespace": "0",
+        "pllimit": str(min(limit, MAX_LINKS)),
+        "titles": title,
+    }
+    url = _api_url(client, lang)
+    _, data = client.get_json(url, deadline=deadline, params=params)
+    pages = data.get("query", {}).get("pages", [])
+    return [link["title"] for page in pages for link in page.get("links", [])]
+
+
+def _send_or_fail(titles, client, short, fields, lang):
+    try:
+        return send_batch(
+            titles, client, short=short, fields=fields, lang=lang
+        )
+    except RequestFailedError as exc:
+        return dict.fromkeys(titles, exc)
+
+
+def _cache_key(query, host):
+    return CACHE_KEY_PREFIX + page_key(normalize(query, host), host)
+
+
+def _read_index(queries, client, payloads, stats):
+    # returns the queries left for the cache and the network
+    index = client.index
+    pending = []
+    for query in queries:
+        data = index.payload(normalize(query, index.host))
+        if data is None and index.fallback:
+            pending.append(query)
+        else:
+            payloads[query] = data if data is not None else {}
+    if stats is not None and payloads:
+        stats.incr("indexed", len(payloads))
+    return pending
+
+
+def fetch_payloads(
+    queries,
+    client,
+    short=False,
+    max_workers=None,
+    stats=None,
+    fields=None,
+    lang=None,
+):
+    """
+    Return a summary payload for every query, sending batches of
+    :py:data:`MAX_TITLES` titles for the queries missing from the cache.
+
+    Queries in a batch that kept failing map to the
+    :py:class:`wikinode.exceptions.RequestFailedError` raised for it.
+    Payloads requested without some fields (*short*, or *fields* leaving
+    out *description* or *extract*) are not cached. Payloads are cached
+    apart from REST summaries, which hold other fields, so neither kind of
+    request is answered with the other's payload. Queries answered by the
+    client's offline index are not sent. Queries are sent to the client's
+    wiki unless *lang* names another.
+    """
+    host = client.host if lang is None else wiki_host(lang)
+    payloads = {}
+    if client.index is not None and client.index.host == host:
+        queries = _read_index(queries, client, payloads, stats)
+    misses = []
+    cached = 0
+    cache = client.cache
+    for query in queries:
+        key = _cache_key(query, host)
+        data = cache.get(key) if cache is not None else None
+        if data is None:
+            misses.append(query)
+        else:
+            payloads[query] = data
+            cached += 1
+    if stats is not None and cached:
+        stats.incr("cached", cached)
+    chunks = _chunks(misses, MAX_TITLES)
+    if max_workers is None:
+        batches = [
+            _send_or_fail(chunk, client, short, fields, lang)
+            for chunk in chunks
+        ]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            batches = list(
+                executor.map(
+                    lambda chunk: _send_or_fail(
+                        chunk, client, short, fields, lang
+                    ),
+                    chunks,
+                )
+            )
+    complete = _complete(short, fields)
+    for batch in batches:
+        for query, data in batch.items():
+            payloads[query] = data
+            if isinstance(data, RequestFailedError):
+                continue
+            if stats is not None:
+                stats.incr("downloaded")
+            if cache is not None and complete:
+                cache.set(_cache_key(query, host), data)
+    return payloads
@@ -0,0 +1,6 @@
+from wikinode.aio.client import Client
+from wikinode.aio.summary import (
+    fetch,
+    fetch_many,
+    fetch_random,
+)
@@ -0,0 +1,127 @@
+"""Shared asynchronous HTTP client for the wikinode.aio API."""
+import asyncio
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    raise ImportError(
+        "wikinode.aio requires aiohttp. "
+        "Install it with 'pip install wikinode[aio]'."
+    )
+
+from wikinode.client import (
+    DEFAULT_MAX_RETRIES,
+    pushback_status_codes,
+    retry_status_codes,
+)
+from wikinode.exceptions import RequestFailedError
+from wikinode.ratelimit import (
+    DEFAULT_BACKOFF_FACTOR,
+    RateLimiter,
+    parse_retry_after,
+    retry_delay,
+)
+from wikinode.requests import USER_AGENT
+
+
+DEFAULT_LIMIT = 100
+
+
+class Client:
+    """
+    Asynchronous HTTP client shared by many concurrent lookups.
+
+    Args:
+        limit (int): Maximum number of requests in flight at once.
+        headers (dict): Headers sent with every request. By default, only
+            the wikinode *User-Agent* is sent.
+        limiter (:py:class:`wikinode.ratelimit.RateLimiter`): Rate limiter
+            shared by all requests. Retries follow the same rules as
+            :py:class:`wikinode.client.Client`.
+        max_retries (int): Retries of a failed request before
+            :py:class:`wikinode.exceptions.RequestFailedError` is raised.
+        backoff_factor (float): Seconds of the first backoff window.
+
+    Example:
+
+        >>> async with wikinode.aio.Client(limit=50) as client:
+        ...     await wikinode.aio.fetch("hello world", client=client)
+    """
+
+    def __init__(
+        self,
+        limit=DEFAULT_LIMIT,
+        headers=None,
+        limiter=None,
+        max_retries=DEFAULT_MAX_RETRIES,
+        backoff_factor=DEFAULT_BACKOFF_FACTOR,
+    ):
+        self.limit = limit
+        self.headers = {"User-Agent": USER_AGENT, **(headers or {})}
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self._semaphore = None
+        self._session = None
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit)
+            self._session = aiohttp.ClientSession(
+                connector=connector, headers=self.headers
+            )
+        return self._session
+
+    async def get_json(self, url, params=None):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        attempt = 0
+        while True:
+            await asyncio.sleep(self.limiter.reserve())
+            try:
+                async with self._semaphore:
+                    async with self.session.get(url, params=params) as resp:
+                        status_code = resp.status
+                        retry_after = resp.headers.get("Retry-After")
+                        if status_code not in retry_status_codes:
+                            data = await resp.json(content_type=None)
+                            self.limiter.recover()
+                            return data
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                # connection refused, reset or closed partway through a body
+                status_code = retry_after = None
+            if attempt >= self.max_retries:
+                raise RequestFailedError(url, status_code)
+            retry_after = parse_retry_after(retry_after)
+            delay = retry_delay(attempt, retry_after, self.backoff_factor)
+            if status_code in pushback_status_codes:
+                self.limiter.backoff(pause=delay)
+            else:
+                await asyncio.sleep(delay)
+            attempt += 1
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+_default_clients = {}
+
+
+def get_default_client():
+    """Return the client shared by calls made on the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _default_clients.get(loop)
+    if client is None:
+        for stale in [key for key in _default_clients if key.is_closed()]:
+            del _default_clients[stale]
+        client = _default_clients[loop] = Client()
+    return client
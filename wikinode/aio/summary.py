@@ -0,0 +1,141 @@
+import asyncio
+
+from wikinode.aio.client import get_default_client
+from wikinode.fields import compile_fields
+from wikinode.exceptions import QueryAmbiguousError, RequestFailedError
+from wikinode.requests import API_URL, RANDOM_SUMMARY_URL
+from wikinode.summary import _collect, _parse_summary
+from wikinode.titles import normalize, quote_title
+
+
+async def _send_query(query, client):
+    url = f"{API_URL}/{quote_title(normalize(query))}"
+    return await client.get_json(url, params={"redirect": "true"})
+
+
+async def _send_request(url, client):
+    return await client.get_json(url)
+
+
+async def fetch(query, short=False, client=None, compact=False, fields=None):
+    """
+    Request a single summary without blocking the event loop.
+
+    Mirrors :py:func:`wikinode.summary.fetch`.
+
+    Args:
+        query (str): Search term to find an article summary.
+        short (bool): Exclude *extract* field from returned result.
+        client (:py:class:`wikinode.aio.Client`): Client used to send the
+            request. By default, a client shared by the running event loop.
+        compact (bool): Return a :py:class:`wikinode.summary.Summary`
+            instead of a dict.
+        fields (list): Payload fields to return, as for
+            :py:func:`wikinode.summary.fetch`.
+
+    Returns:
+        (dict): Result contains the fields *query*, *title*, *description*,
+        and *extract*, which can be omitted.
+
+    Raises:
+        :py:class:`wikinode.exceptions.QueryAmbiguousError`
+            If more than one article summary corresponds to the search term.
+
+    Example:
+
+        >>> await wikinode.aio.fetch("hello world")
+        {
+          'query': 'hello world',
+          'title': '"Hello, World!" program',
+          'description': "Traditional beginners' computer program",
+          'extract': 'A "Hello, World!" program generally is a computer...'
+        }
+    """
+    if not isinstance(query, str):
+        raise ValueError("Invalid argument. Argument must have type 'str'.")
+    projection = compile_fields(fields, compact)
+    data = await _send_query(query, client or get_default_client())
+    return _parse_summary(
+        data,
+        short=short,
+        query=query,
+        compact=compact,
+        projection=projection,
+    )
+
+
+async def _try_fetch(query, short, client, compact, fields):
+    try:
+        return await fetch(
+            query, short=short, client=client, compact=compact, fields=fields
+        )
+    except (QueryAmbiguousError, RequestFailedError) as exc:
+        return exc
+
+
+async def fetch_many(
+    queries, short=False, meta=False, client=None, compact=False, fields=None
+):
+    """
+    Request multiple summaries concurrently.
+
+    Mirrors :py:func:`wikinode.summary.fetch_many`. All queries are
+    scheduled at once; the client's *limit* bounds how many requests are in
+    flight.
+
+    Args:
+        queries (list): A list of strings, each representing a single query.
+        short (bool): Exclude the *extract* field from all successful results.
+        meta (bool): Include *hits*, *not_found*, *ambiguous* and *failed*
+            data about the batch of queries. The *results* key has the
+            summary data.
+        client (:py:class:`wikinode.aio.Client`): Client used to send the
+            requests. By default, a client shared by the running event loop.
+        compact (bool): Return :py:class:`wikinode.summary.Summary` objects
+            instead of dicts.
+        fields (list): Payload fields to return, as for
+            :py:func:`wikinode.summary.fetch`.
+
+    Returns:
+        (list): Each result contains the fields *query*, *title*,
+        *description*, and *extract*, which can be omitted.
+    """
+    if not isinstance(queries, list):
+        raise ValueError("Invalid argument. Argument must have type 'list'.")
+    client = client or get_default_client()
+    if fields is not None:
+        fields = compile_fields(fields, compact)
+    outcomes = await asyncio.gather(
+        *(
+            _try_fetch(query, short, client, compact, fields)
+            for query in queries
+        )
+    )
+    return _collect(queries, outcomes, meta)
+
+
+async def fetch_random(short=False, client=None, compact=False, fields=None):
+    """
+    Request a random summary without blocking the event loop.
+
+    Mirrors :py:func:`wikinode.summary.fetch_random`.
+
+    Args:
+        short (bool): Exclude *extract* field from returned result.
+        client (:py:class:`wikinode.aio.Client`): Client used to send the
+            request. By default, a client shared by the running event loop.
+        compact (bool): Return a :py:class:`wikinode.summary.Summary`
+            instead of a dict.
+        fields (list): Payload fields to return, as for
+            :py:func:`wikinode.summary.fetch`.
+
+    Returns:
+        (dict): Result contains the fields *title*, *description*,
+        and *extract*, which can be omitted.
+    """
+    client = client or get_default_client()
+    projection = compile_fields(fields, compact)
+    data = await _send_request(RANDOM_SUMMARY_URL, client)
+    return _parse_summary(
+        data, short=short, compact=compact, projection=projection
+    )
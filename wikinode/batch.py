@@ -0,0 +1,355 @@
+"""Backfill summaries for large title lists across worker processes."""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+
+from wikinode.cache import SQLiteCache
+from wikinode.client import Client
+from wikinode.requests import DEFAULT_LANG
+from wikinode.stats import Counters
+from wikinode.summary import (
+    DEFAULT_WORKERS,
+    _compile_options,
+    _fetch_result,
+    _iter_outcomes,
+    _try_fetch,
+)
+from wikinode.titles import normalize
+
+
+# titles queued per worker thread before the reader waits
+QUEUE_FACTOR = 4
+# statuses written again when a run resumes
+retried_statuses = ("failed", "timed_out")
+
+
+def finished_queries(path):
+    """
+    Return the queries already answered in the NDJSON file at *path*.
+
+    A line cut short by a crash is removed from the file, so new results can
+    be appended after the last complete one. Failed and timed out queries do
+    not count as answered and are fetched again.
+    """
+    finished = set()
+    if not os.path.exists(path):
+        return finished
+    complete = 0
+    with open(path, "rb") as lines:
+        for line in lines:
+            if not line.endswith(b"\n"):
+                break
+            complete += len(line)
+            result = json.loads(line)
+            if result["status"] not in retried_statuses:
+                finished.add(result["query"])
+    if complete < os.path.getsize(path):
+        os.truncate(path, complete)
+    return finished
+
+
+def _try_line(query, short, options):
+    try:
+        result = _fetch_result(query, _try_fetch(query, short, options))
+        return result.status, result._asdict()
+    except Exception as exc:
+        # an unexpected error fails this title alone; it is fetched again
+        # when the run resumes
+        line = {"query": query, "status": "failed", "summary": {}}
+        return "failed", {**line, "error": repr(exc)}
+
+
+def _work(titles, results, options):
+    cache = options["cache"]
+    client = Client(
+        pool_size=options["threads"],
+        cache=SQLiteCache(cache) if cache is not None else None,
+        lang=options["lang"],
+    )
+    try:
+        fetch_options = _compile_options(
+            {"client": client, "fields": options["fields"]}
+        )
+        short = options["short"]
+        outcomes = _iter_outcomes(
+            lambda title: _try_line(title, short, fetch_options),
+            iter(titles.get, None),
+            options["threads"],
+        )
+        for _, (status, line) in outcomes:
+            # encoding here keeps the parent free to write
+            results.put((status, json.dumps(line)))
+    except Exception as exc:
+        results.put(("error", repr(exc)))
+    finally:
+        client.close()
+        results.put(None)
+
+
+def _put(shard, item, done):
+    while not done.is_set():
+        try:
+            shard.put(item, timeout=1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _shard(titles, queues, finished, done):
+    # duplicate titles land on the same worker, so its cache, if any,
+    # answers all but the first
+    for title in titles:
+        title = title.strip()
+        if not title or title in finished:
+            continue
+        shard = queues[hash(normalize(title)) % len(queues)]
+        if not _put(shard, title, done):
+            return
+    for shard in queues:
+        _put(shard, None, done)
+
+
+class Progress:
+    """
+    Counts written results and reports them at most every *interval* seconds.
+
+    Args:
+        stream: File the report is written to, or None for no report.
+        interval (float): Seconds between two reports.
+
+    Attributes:
+        stats (:py:class:`wikinode.stats.Counters`): *hit*, *not_found*,
+            *ambiguous*, *failed* and *timed_out* counters.
+    """
+
+    def __init__(self, stream=None, interval=1.0):
+        self.stream = stream
+        self.interval = interval
+        self.stats = Counters(
+            "hit", "not_found", "ambiguous", "failed", "timed_out"
+        )
+        self.started = time.monotonic()
+        self._reported = self.started
+
+    @property
+    def total(self):
+        return sum(self.stats.snapshot().values())
+
+    def update(self, status):
+        self.stats.incr(status)
+        now = time.monotonic()
+        if now - self._reported >= self.interval:
+            self._reported = now
+            self.report()
+
+    def report(self, end="\r"):
+        if self.stream is None:
+            return
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        snapshot = self.stats.snapshot()
+        counts = ", ".join(f"{k} {v}" for k, v in snapshot.items())
+        self.stream.write(
+            f"{self.total} summaries ({counts}), "
+            f"{self.total / elapsed:.0f}/s{end}"
+        )
+        self.stream.flush()
+
+
+def run(
+    titles,
+    output,
+    processes=None,
+    threads=DEFAULT_WORKERS,
+    short=False,
+    fields=None,
+    cache=None,
+    finished=(),
+    progress=None,
+    lang=DEFAULT_LANG,
+):
+    """
+    Fetch summaries for *titles* in worker processes and write them as NDJSON.
+
+    Titles are sharded across *processes* workers by normalized title, so
+    JSON decoding runs in parallel and each worker keeps its own connection
+    pool. Inside a worker, *threads* requests are in flight at once. Every
+    line of *output* is a :py:class:`wikinode.summary.FetchResult` as a JSON
+    object, in completion order. A title failing with an unexpected error is
+    written as *failed*, with the error as *error*, and the run goes on.
+
+    Args:
+        titles (iterable): Titles, e.g. an open file with one per line.
+            Blank lines are skipped.
+        output: Text file the results are written to.
+        processes (int): Number of worker processes. By default, one per
+            CPU.
+        threads (int): Number of concurrent requests per worker.
+        short (bool): Exclude the *extract* field from all results.
+        fields (list): Payload fields to return, as for
+            :py:func:`wikinode.summary.fetch`.
+        cache (str): Path of a :py:class:`wikinode.cache.SQLiteCache` file
+            shared by all workers. By default, nothing is cached.
+        finished (set): Titles to skip, e.g. the
+            :py:func:`finished_queries` of an interrupted run.
+        progress (:py:class:`Progress`): Progress counters updated with
+            every result.
+        lang (str): Wikipedia edition to search, as for
+            :py:func:`wikinode.summary.fetch`.
+
+    Returns:
+        (:py:class:`Progress`): Counts of the written results.
+
+    Raises:
+        RuntimeError
+            If a worker could not go on, e.g. because its cache could not
+            be opened. Results written so far are kept, so the run can be
+            resumed.
+
+    Example:
+
+        >>> with open("titles.txt") as titles, open("out.ndjson", "a") as out:
+        ...     wikinode.batch.run(titles, out, processes=4, threads=16)
+    """
+    processes = processes or os.cpu_count() or 1
+    progress = progress or Progress()
+    options = {
+        "threads": threads,
+        "short": short,
+        "fields": fields,
+        "cache": cache,
+        "lang": lang,
+    }
+    context = multiprocessing.get_context()
+    queues = [context.Queue(threads * QUEUE_FACTOR) for _ in range(processes)]
+    results = context.Queue()
+    workers = [
+        context.Process(target=_work, args=(shard, results, options))
+        for shard in queues
+    ]
+    for worker in workers:
+        worker.start()
+    done = threading.Event()
+    reader = threading.Thread(
+        target=_shard, args=(titles, queues, set(finished), done), daemon=True
+    )
+    reader.start()
+    error = None
+    running = processes
+    try:
+        while running and error is None:
+            try:
+                message = results.get(timeout=1)
+            except queue.Empty:
+                error = _crashed(workers)
+                continue
+            if message is None:
+                running -= 1
+            elif message[0] == "error":
+                error = message[1]
+            else:
+                output.write(message[1] + "\n")
+                progress.update(message[0])
+    finally:
+        done.set()
+        output.flush()
+        for worker in workers:
+            # stopped early, e.g. on an error or Ctrl-C
+            if running:
+                worker.terminate()
+            worker.join()
+    progress.report(end="\n")
+    if error is not None:
+        raise RuntimeError(f"Worker stopped: {error}")
+    return progress
+
+
+def _crashed(workers):
+    for worker in workers:
+        if worker.exitcode not in (None, 0):
+            return f"{worker.name} exited with code {worker.exitcode}"
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m wikinode",
+        description="Fetch summaries for a list of titles as NDJSON.",
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="file with one title per line (default: stdin)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="NDJSON file results are appended to (default: stdout)",
+    )
+    parser.add_argument(
+        "-p", "--processes", type=int, help="worker processes (default: CPUs)"
+    )
+    parser.add_argument(
+        "-t",
+        "--threads",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"requests in flight per process (default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument("--short", action="store_true", help="omit extracts")
+    parser.add_argument(
+        "--fields", help="comma-separated fields to return, e.g. title,pageid"
+    )
+    parser.add_argument("--cache", help="SQLite cache file shared by workers")
+    parser.add_argument(
+        "--lang",
+        default=DEFAULT_LANG,
+        help=f"Wikipedia language edition (default: {DEFAULT_LANG})",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="skip titles already answered in the output file",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="do not report progress"
+    )
+    options = parser.parse_args(argv)
+    if options.resume and options.output == "-":
+        parser.error("--resume requires --output")
+    finished = set()
+    if options.resume:
+        finished = finished_queries(options.output)
+    fields = options.fields.split(",") if options.fields else None
+    progress = Progress(None if options.quiet else sys.stderr)
+    titles = sys.stdin if options.input == "-" else open(options.input)
+    output = sys.stdout
+    if options.output != "-":
+        output = open(options.output, "a" if options.resume else "w")
+    try:
+        run(
+            titles,
+            output,
+            processes=options.processes,
+            threads=options.threads,
+            short=options.short,
+            fields=fields,
+            cache=options.cache,
+            finished=finished,
+            progress=progress,
+            lang=options.lang,
+        )
+    except RuntimeError as exc:
+        parser.exit(1, f"{exc}\n")
+    finally:
+        if titles is not sys.stdin:
+            titles.close()
+        if output is not sys.stdout:
+            output.close()
@@ -0,0 +1,291 @@
+"""Summary caches consulted before sending requests."""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from wikinode.stats import Counters
+
+
+DEFAULT_MAXSIZE = 1024
+DEFAULT_TTL = 3600
+DEFAULT_NEGATIVE_TTL = 300
+
+
+def _is_negative(data):
+    return data.get("type") != "standard"
+
+
+class CacheEntry(namedtuple("CacheEntry", "data etag expires_at")):
+    """A cached payload with its ETag and expiry time."""
+
+    __slots__ = ()
+
+    @property
+    def fresh(self):
+        return self.expires_at > time.time()
+
+
+class MemoryCache:
+    """
+    In-process LRU cache of summary payloads with per-entry expiry.
+
+    Payloads for missing and ambiguous pages are cached as well, with their
+    own (usually shorter) time to live. Expired entries that carry an ETag
+    are kept until evicted, so they can be revalidated with a conditional
+    request instead of downloaded again.
+
+    Args:
+        maxsize (int): Maximum number of entries. The least recently used
+            entry is evicted when the cache is full.
+        ttl (float): Seconds a summary stays fresh.
+        negative_ttl (float): Seconds a not-found or disambiguation payload
+            stays fresh.
+
+    Attributes:
+        stats (:py:class:`wikinode.stats.Counters`): *hits*, *misses*,
+            *evictions* and *revalidated* counters.
+
+    Example:
+
+        >>> client = wikinode.Client(cache=MemoryCache(maxsize=10000))
+        >>> wikinode.fetch("hello world", client=client)  # request sent
+        >>> wikinode.fetch("Hello world", client=client)  # served from cache
+        >>> client.cache.stats.snapshot()
+        {'hits': 1, 'misses': 1, 'evictions': 0, 'revalidated': 0}
+    """
+
+    def __init__(
+        self,
+        maxsize=DEFAULT_MAXSIZE,
+        ttl=DEFAULT_TTL,
+        negative_ttl=DEFAULT_NEGATIVE_TTL,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stats = Counters("hits", "misses", "evictions", "revalidated")
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key):
+        """
+        Return the :py:class:`CacheEntry` stored under *key*, or None.
+
+        The entry may be stale; only fresh entries count as hits.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not entry.fresh and entry.etag is None:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        hit = entry is not None and entry.fresh
+        self.stats.incr("hits" if hit else "misses")
+        return entry
+
+    def get(self, key):
+        """Return the fresh payload stored under *key*, or None."""
+        entry = self.lookup(key)
+        if entry is None or not entry.fresh:
+            return None
+        return entry.data
+
+    def set(self, key, data, etag=None):
+        """Store the payload *data* under *key*."""
+        ttl = self.negative_ttl if _is_negative(data) else self.ttl
+        evicted = 0
+        with self._lock:
+            self._entries[key] = CacheEntry(data, etag, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            self.stats.incr("evictions", evicted)
+
+    def touch(self, key):
+        """Mark the entry under *key* as fresh again after revalidation."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            ttl = self.negative_ttl if _is_negative(entry.data) else self.ttl
+            self._entries[key] = entry._replace(expires_at=time.time() + ttl)
+        self.stats.incr("revalidated")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """
+    Persistent summary cache stored in a local SQLite file.
+
+    Entries survive restarts and the file can be shared by several
+    processes on the same host: the database runs in WAL mode and every
+    thread or process opens its own connection. Each row keeps the raw
+    payload, the time it was fetched and the page ETag and revision.
+    Expired rows that carry an ETag are kept until pruned for size, so they
+    can be revalidated with a conditional request.
+
+    Args:
+        path (str): Location of the database file. It is created if needed.
+        maxsize (int): Maximum number of entries. The oldest entries are
+            pruned once the cache grows past it.
+        ttl (float): Seconds a summary stays fresh.
+        negative_ttl (float): Seconds a not-found or disambiguation payload
+            stays fresh.
+        timeout (float): Seconds to wait for a lock held by another process.
+
+    Attributes:
+        stats (:py:class:`wikinode.stats.Counters`): *hits*, *misses*,
+            *evictions* and *revalidated* counters of this process.
+
+    Example:
+
+        >>> cache = SQLiteCache("~/.cache/wikinode.sqlite3", ttl=86400)
+        >>> client = wikinode.Client(cache=cache)
+    """
+
+    # inserts between two size checks
+    prune_interval = 100
+
+    def __init__(
+        self,
+        path,
+        maxsize=DEFAULT_MAXSIZE * 100,
+        ttl=DEFAULT_TTL,
+        negative_ttl=DEFAULT_NEGATIVE_TTL,
+        timeout=30,
+    ):
+        self.path = os.path.expanduser(path)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.stats = Counters("hits", "misses", "evictions", "revalidated")
+        self._local = threading.local()
+        self._inserts = 0
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                " key TEXT PRIMARY KEY,"
+                " payload TEXT NOT NULL,"
+                " etag TEXT,"
+                " revision TEXT,"
+                " fetched_at REAL NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS summaries_fetched_at"
+                " ON summaries (fetched_at)"
+            )
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        # connections must not cross a fork
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def lookup(self, key):
+        """
+        Return the :py:class:`CacheEntry` stored under *key*, or None.
+
+        The entry may be stale; only fresh entries count as hits.
+        """
+        row = (
+            self._connection()
+            .execute(
+                "SELECT payload, etag, expires_at FROM summaries"
+                " WHERE key = ? AND (expires_at > ? OR etag IS NOT NULL)",
+                (key, time.time()),
+            )
+            .fetchone()
+        )
+        entry = None
+        if row is not None:
+            entry = CacheEntry(json.loads(row[0]), row[1], row[2])
+        hit = entry is not None and entry.fresh
+        self.stats.incr("hits" if hit else "misses")
+        return entry
+
+    def get(self, key):
+        """Return the fresh payload stored under *key*, or None."""
+        entry = self.lookup(key)
+        if entry is None or not entry.fresh:
+            return None
+        return entry.data
+
+    def set(self, key, data, etag=None):
+        """Store the payload *data* under *key*."""
+        now = time.time()
+        ttl = self.negative_ttl if _is_negative(data) else self.ttl
+        revision = data.get("revision")
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO summaries"
+                " (key, payload, etag, revision, fetched_at, expires_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(data), etag, revision, now, now + ttl),
+            )
+        self._inserts += 1
+        if self._inserts % self.prune_interval == 0:
+            self.prune()
+
+    def touch(self, key):
+        """Mark the entry under *key* as fresh again after revalidation."""
+        now = time.time()
+        with self._connection() as connection:
+            # keep the time to live the entry was stored with
+            connection.execute(
+                "UPDATE summaries SET fetched_at = ?,"
+                " expires_at = ? + expires_at - fetched_at WHERE key = ?",
+                (now, now, key),
+            )
+        self.stats.incr("revalidated")
+
+    def prune(self):
+        """
+        Delete expired entries that cannot be revalidated and the oldest
+        entries past *maxsize*.
+        """
+        with self._connection() as connection:
+            deleted = connection.execute(
+                "DELETE FROM summaries WHERE expires_at <= ? AND etag IS NULL",
+                (time.time(),),
+            ).rowcount
+            deleted += connection.execute(
+                "DELETE FROM summaries WHERE key IN ("
+                " SELECT key FROM summaries ORDER BY fetched_at DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            ).rowcount
+        if deleted:
+            self.stats.incr("evictions", deleted)
+
+    def clear(self):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM summaries")
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def __len__(self):
+        row = self._connection().execute("SELECT COUNT(*) FROM summaries")
+        return row.fetchone()[0]
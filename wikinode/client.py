@@ -0,0 +1,463 @@
+"""Reusable HTTP client shared by summary requests."""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+import requests
+import urllib3
+
+from wikinode import decoding, instrument
+from wikinode.exceptions import RequestFailedError, RequestTimeoutError
+from wikinode.ratelimit import (
+    DEFAULT_BACKOFF_FACTOR,
+    RateLimiter,
+    parse_retry_after,
+    retry_delay,
+)
+from wikinode.requests import DEFAULT_LANG, USER_AGENT, wiki_host
+from wikinode.singleflight import SingleFlight
+from wikinode.titles import AliasMap
+
+
+DEFAULT_POOL_SIZE = 10
+# hosts whose connection pools are kept open at once
+DEFAULT_HOST_POOLS = 32
+DEFAULT_MAX_RETRIES = 3
+# seconds to connect and to wait for each read
+DEFAULT_TIMEOUT = (5, 30)
+retry_status_codes = (429, 500, 502, 503, 504)
+# answers asking the client to slow down
+pushback_status_codes = (429, 503)
+# resets, refused connections and DNS failures, including those cutting a
+# body short
+connection_errors = (
+    requests.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.ContentDecodingError,
+    urllib3.exceptions.HTTPError,
+)
+
+
+def _timeout_pair(timeout):
+    if isinstance(timeout, tuple):
+        return timeout
+    return timeout, timeout
+
+
+def _longest(timeout):
+    # None waits forever, so it says nothing of how long was waited
+    parts = [part for part in timeout if part is not None]
+    return max(parts) if parts else None
+
+
+def _discard(response):
+    if response is not None:
+        response.close()
+
+
+def _read_raw(response):
+    # the raw body, the seconds spent connecting for this attempt, and the
+    # seconds spent reading the body
+    connect = instrument.connect_seconds()
+    start = time.perf_counter()
+    raw = response.raw.read(decode_content=False) or b""
+    return raw, connect, time.perf_counter() - start
+
+
+def _remaining(deadline):
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0)
+
+
+class Client:
+    """
+    HTTP client holding a keep-alive session.
+
+    Connections are pooled by the session, so consecutive requests to
+    Wikipedia reuse TCP and TLS connections instead of opening new ones.
+    Concurrent summary requests for the same page share one request.
+
+    Every request waits for the rate limiter of its host. Responses with
+    status 429, 500, 502, 503 or 504, timeouts and connection errors are
+    retried with jittered exponential backoff, honoring *Retry-After*; 429
+    and 503 also slow the host's limiter down for all threads sharing the
+    client.
+
+    Requests go to the English Wikipedia unless another *lang* is set, on
+    the client or per call. Each wiki gets its own connection pool and rate
+    limiter, so a slow or throttled wiki does not hold back the others.
+
+    Args:
+        session (:py:class:`requests.Session`): Session used to send requests.
+            By default, a new session with a pool of *pool_size* connections
+            for each of up to 32 hosts is created. Swap in a session with
+            tuned adapters to change retry or pooling behavior.
+        pool_size (int): Maximum number of connections kept open per host.
+            Should be at least the number of threads sharing the client.
+        headers (dict): Headers sent with every request. The wikinode
+            *User-Agent* is sent unless overridden, as is an
+            *Accept-Encoding* asking for gzip, or brotli when the brotli
+            package is installed.
+        cache: Cache consulted before a summary request is sent, such as
+            :py:class:`wikinode.cache.MemoryCache` or
+            :py:class:`wikinode.cache.SQLiteCache`. By default, nothing is
+            cached.
+        limiter (:py:class:`wikinode.ratelimit.RateLimiter`): Rate limiter
+            shared by all requests to the client's wiki. Other wikis get a
+            limiter with the same settings each. By default, up to 100
+            requests per second per wiki.
+        max_retries (int): Retries of a failed request before
+            :py:class:`wikinode.exceptions.RequestFailedError` is raised.
+        backoff_factor (float): Seconds of the first backoff window. The
+            window doubles with every retry.
+        instruments (:py:class:`wikinode.instrument.Instruments`): Hooks and
+            counters observing every request. By default, requests are not
+            timed.
+        timeout (tuple): Seconds to wait for a connection and between two
+            reads of the response, as a ``(connect, read)`` tuple or a single
+            number for both. Timed out requests are retried like failed
+            ones. Deadlines of :py:func:`wikinode.summary.fetch` shorten
+            them.
+        hedge (:py:class:`wikinode.hedging.HedgePolicy`): When set, a
+            request still unanswered after the policy's delay is sent a
+            second time, and the first answer wins. By default, requests
+            are not hedged.
+        extra_fields (list): Summary payload fields kept in addition to
+            those wikinode returns. Other fields, such as *extract_html*
+            and *content_urls*, are dropped as soon as a response is decoded
+            and never reach the cache.
+        aliases (:py:class:`wikinode.titles.AliasMap`): Titles learned from
+            redirects, so later queries for an alias are sent straight to
+            the canonical title. By default, aliases are kept in memory for
+            the lifetime of the client.
+        index (:py:class:`wikinode.offline.OfflineIndex`): Local summary
+            index answering queries before the cache and the network. By
+            default, every query is requested from Wikipedia.
+        titles (:py:class:`wikinode.fuzzy.TitleIndex`): Titles misspelled
+            or partial queries are resolved to before a request is sent. By
+            default, queries are sent as typed.
+        lang (str): Language code of the Wikipedia edition requested when
+            a call does not name one, such as ``"fr"``, or the host of
+            another wiki, such as ``"en.wiktionary.org"``.
+
+    Example:
+
+        >>> client = wikinode.Client(pool_size=32)
+        >>> wikinode.fetch_many(queries, max_workers=32, client=client)
+    """
+
+    def __init__(
+        self,
+        session=None,
+        pool_size=DEFAULT_POOL_SIZE,
+        headers=None,
+        cache=None,
+        limiter=None,
+        max_retries=DEFAULT_MAX_RETRIES,
+        backoff_factor=DEFAULT_BACKOFF_FACTOR,
+        instruments=None,
+        extra_fields=(),
+        aliases=None,
+        timeout=DEFAULT_TIMEOUT,
+        hedge=None,
+        index=None,
+        lang=DEFAULT_LANG,
+        titles=None,
+    ):
+        self.pool_size = pool_size
+        self.headers = {
+            "User-Agent": USER_AGENT,
+            "Accept-Encoding": decoding.ACCEPT_ENCODING,
+            **(headers or {}),
+        }
+        self.cache = cache
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.instruments = instruments
+        self.extra_fields = tuple(extra_fields)
+        self.aliases = aliases if aliases is not None else AliasMap()
+        self.timeout = _timeout_pair(timeout)
+        self.hedge = hedge
+        self.index = index
+        self.titles = titles
+        self.lang = lang
+        self.host = wiki_host(lang)
+        self._limiters = {self.host: self.limiter}
+        self._limiters_lock = threading.Lock()
+        self.flights = SingleFlight()
+        self._hedge_pool = None
+        self._hedge_lock = threading.Lock()
+        if session is None:
+            session = self._create_session(pool_size)
+        self.session = session
+
+    @staticmethod
+    def _create_session(pool_size):
+        session = requests.Session()
+        adapter = instrument.TimedHTTPAdapter(
+            pool_connections=DEFAULT_HOST_POOLS, pool_maxsize=pool_size
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def limiter_for(self, host):
+        """Return the rate limiter of requests to *host*."""
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            with self._limiters_lock:
+                limiter = self._limiters.get(host)
+                if limiter is None:
+                    limiter = self.limiter.clone()
+                    self._limiters[host] = limiter
+        return limiter
+
+    def _timeout(self, url, deadline):
+        if deadline is None:
+            return self.timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RequestTimeoutError(url, 0)
+        return tuple(
+            remaining if part is None else min(part, remaining)
+            for part in self.timeout
+        )
+
+    def _send(self, url, headers, deadline=None, read=None, **kwargs):
+        """
+        Send a GET request, retrying failed ones.
+
+        A streamed response is read by *read*, inside the retry loop, so a
+        connection lost partway through the body is retried too.
+
+        Returns:
+            (tuple): The response, the number of retries and what *read*
+            returned, or None.
+        """
+        headers = {**self.headers, **(headers or {})}
+        limiter = self.limiter_for(urlparse(url).hostname)
+        attempt = 0
+        while True:
+            limiter.acquire()
+            timeout = self._timeout(url, deadline)
+            if read is not None:
+                # connections opened for earlier attempts are not timed
+                instrument.reset_connect_seconds()
+            response = None
+            body = None
+            try:
+                response = self.session.get(
+                    url, headers=headers, timeout=timeout, **kwargs
+                )
+                status_code = response.status_code
+                if read is not None and status_code not in retry_status_codes:
+                    body = read(response)
+            except (requests.Timeout, urllib3.exceptions.TimeoutError):
+                _discard(response)
+                if attempt >= self.max_retries:
+                    raise RequestTimeoutError(url, _longest(timeout)) from None
+                delay = retry_delay(attempt, None, self.backoff_factor)
+                self._sleep(url, delay, deadline)
+                attempt += 1
+                continue
+            except connection_errors:
+                _discard(response)
+                if attempt >= self.max_retries:
+                    raise RequestFailedError(url, None) from None
+                delay = retry_delay(attempt, None, self.backoff_factor)
+                self._sleep(url, delay, deadline)
+                attempt += 1
+                continue
+            if status_code not in retry_status_codes:
+                limiter.recover()
+                return response, attempt, body
+            # the connection goes back to the pool for the retry
+            _discard(response)
+            if attempt >= self.max_retries:
+                raise RequestFailedError(url, status_code)
+            retry_after = response.headers.get("Retry-After")
+            retry_after = parse_retry_after(retry_after)
+            delay = retry_delay(attempt, retry_after, self.backoff_factor)
+            if deadline is not None and time.monotonic() + delay > deadline:
+                # the retry could not be answered in time
+                raise RequestFailedError(url, status_code)
+            if status_code in pushback_status_codes:
+                # the limiter holds every thread, including this one
+                limiter.backoff(pause=delay)
+            else:
+                time.sleep(delay)
+            attempt += 1
+
+    def _sleep(self, url, delay, deadline):
+        if deadline is not None and time.monotonic() + delay > deadline:
+            raise RequestTimeoutError(url, delay)
+        time.sleep(delay)
+
+    def get(self, url, headers=None, deadline=None, **kwargs):
+        """
+        Send a GET request through the pooled session.
+
+        Args:
+            deadline (float): :py:func:`time.monotonic` time by which the
+                request, retries included, must be answered.
+
+        Raises:
+            :py:class:`wikinode.exceptions.RequestFailedError`
+                If the server still answers with an error, or cannot be
+                reached, after all retries.
+            :py:class:`wikinode.exceptions.RequestTimeoutError`
+                If the server did not answer in time.
+        """
+        response, _, _ = self._send(url, headers, deadline, **kwargs)
+        return response
+
+    def get_json(self, url, headers=None, deadline=None, **kwargs):
+        """
+        Send a GET request and decode its JSON body.
+
+        The request is hedged when the client has a hedge policy.
+
+        Args:
+            deadline (float): :py:func:`time.monotonic` time by which the
+                request, retries included, must be answered.
+
+        Returns:
+            (tuple): The response and the decoded body, which is None when
+            the response has no body.
+
+        Raises:
+            :py:class:`wikinode.exceptions.RequestFailedError`
+                If the server still answers with an error, or cannot be
+                reached, after all retries.
+            :py:class:`wikinode.exceptions.RequestTimeoutError`
+                If the server did not answer in time.
+        """
+        if self.hedge is None:
+            return self._get_json(url, headers, deadline, **kwargs)
+        return self._get_json_hedged(url, headers, deadline, **kwargs)
+
+    def _hedge_executor(self):
+        if self._hedge_pool is None:
+            with self._hedge_lock:
+                if self._hedge_pool is None:
+                    self._hedge_pool = ThreadPoolExecutor(
+                        max_workers=self.pool_size * 2
+                    )
+        return self._hedge_pool
+
+    def _get_json_timed(self, started, url, headers, deadline, **kwargs):
+        started.set()
+        start = time.monotonic()
+        result = self._get_json(url, headers, deadline, **kwargs)
+        self.hedge.observe(time.monotonic() - start)
+        return result
+
+    def _get_json_hedged(self, url, headers, deadline, **kwargs):
+        executor = self._hedge_executor()
+        send = self._get_json_timed
+        self.hedge.request()
+        started = threading.Event()
+        first = executor.submit(
+            send, started, url, headers, deadline, **kwargs
+        )
+        # time queued behind other requests is not the server's latency,
+        # so the hedge delay runs from the moment the request is sent
+        started.wait(_remaining(deadline))
+        delay = self.hedge.delay()
+        remaining = _remaining(deadline)
+        if remaining is not None:
+            delay = min(delay, remaining)
+        pending = {first}
+        if not wait(pending, timeout=delay).done and self.hedge.allow():
+            pending.add(
+                executor.submit(
+                    send, threading.Event(), url, headers, deadline, **kwargs
+                )
+            )
+        error = None
+        while pending:
+            done, pending = wait(
+                pending,
+                timeout=_remaining(deadline),
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                raise RequestTimeoutError(url, delay)
+            for future in done:
+                if future.exception() is None:
+                    if future is not first:
+                        self.hedge.stats.incr("won")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _get_json(self, url, headers=None, deadline=None, **kwargs):
+        instruments = self.instruments
+        if instruments is None:
+            response, _, _ = self._send(url, headers, deadline, **kwargs)
+            content = response.content
+            return response, decoding.loads(content) if content else None
+        response, retries, (raw, connect, download) = self._send(
+            url, headers, deadline, read=_read_raw, stream=True, **kwargs
+        )
+        downloaded = time.perf_counter()
+        encoding = response.headers.get("Content-Encoding")
+        content = decoding.decompress(raw, encoding)
+        decompressed = time.perf_counter()
+        data = decoding.loads(content) if content else None
+        decoded = time.perf_counter()
+        # the body was read past requests; keep response.content working
+        response._content = content
+        response._content_consumed = True
+        event = instrument.RequestEvent(
+            url=url,
+            status_code=response.status_code,
+            redirects=len(response.history),
+            retries=retries,
+            connect=connect,
+            # requests times the connection setup too
+            ttfb=max(response.elapsed.total_seconds() - connect, 0),
+            download=download,
+            decompress=decompressed - downloaded,
+            decode=decoded - decompressed,
+            wire_bytes=len(raw),
+            body_bytes=len(content),
+        )
+        instruments.record(event)
+        return response, data
+
+    def close(self):
+        if self._hedge_pool is not None:
+            # hedges still in flight finish in the background
+            self._hedge_pool.shutdown(wait=False)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_default_client():
+    """Return the client used when no client is passed, creating it once."""
+    global _default_client
+    if _default_client is None:
+        with _default_lock:
+            if _default_client is None:
+                _default_client = Client()
+    return _default_client
+
+
+def set_default_client(client):
+    """Replace the client used when no client is passed."""
+    global _default_client
+    with _default_lock:
+        _default_client = client
@@ -0,0 +1,63 @@
+"""Decompression and JSON decoding of response bodies."""
+import json
+import zlib
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+# content encodings :py:func:`decompress` understands
+ACCEPT_ENCODING = "gzip, deflate" + (", br" if brotli is not None else "")
+
+
+def decompress(content, encoding=None):
+    """
+    Decode a response body sent with the *Content-Encoding* *encoding*.
+
+    Handles gzip and deflate, brotli when the brotli package is installed,
+    and bodies sent as they are.
+    """
+    encoding = (encoding or "identity").strip().lower()
+    if not content or encoding == "identity":
+        return content
+    if encoding in ("gzip", "x-gzip"):
+        return zlib.decompress(content, 16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(content)
+        except zlib.error:
+            # some servers send raw deflate data without the zlib header
+            return zlib.decompress(content, -zlib.MAX_WBITS)
+    if encoding == "br" and brotli is not None:
+        return brotli.decompress(content)
+    raise ValueError(f"Unsupported content encoding '{encoding}'.")
+
+
+def loads(content):
+    """
+    Decode a JSON document from bytes.
+
+    Uses orjson when it is installed, which decodes summaries several times
+    faster than the standard library, and the :py:mod:`json` module
+    otherwise.
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def keep_fields(data, fields):
+    """
+    Return a dict with only the keys of *data* listed in *fields*.
+
+    Iterates over the few wanted fields rather than every key of the
+    payload.
+    """
+    return {field: data[field] for field in fields if field in data}
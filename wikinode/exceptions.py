@@ -5,10 +5,49 @@ class QueryAmbiguousError(Exception):
     """
     Exception raised when query is not specific
     enough to return any meaningful data.
+
+    Attributes:
+        query (str): The query.
+        candidates (list): Summaries of the articles the disambiguation
+            page lists, when the query was expanded; None otherwise.
     """
 
-    def __init__(self, query):
+    def __init__(self, query, candidates=None):
         self.query = query
+        self.candidates = candidates
 
     def __unicode__(self):
         return f'"{self.query}" not specific enough.'
+
+
+class RequestFailedError(Exception):
+    """
+    Exception raised when Wikipedia keeps answering a request with an
+    error, such as HTTP 429 or 503, or cannot be reached, after all
+    retries. *status_code* is None when no response was received.
+    """
+
+    def __init__(self, url, status_code):
+        self.url = url
+        self.status_code = status_code
+
+    def __str__(self):
+        if self.status_code is None:
+            return f"{self.url} failed without a response."
+        return f"{self.url} failed with status {self.status_code}."
+
+
+class RequestTimeoutError(RequestFailedError):
+    """
+    Exception raised when Wikipedia does not answer a request before its
+    timeout or deadline.
+    """
+
+    def __init__(self, url, timeout):
+        super().__init__(url, None)
+        self.timeout = timeout
+
+    def __str__(self):
+        if self.timeout is None:
+            return f"{self.url} timed out."
+        return f"{self.url} timed out after {self.timeout:.3g} seconds."
@@ -0,0 +1,79 @@
+"""Projection of summary payloads onto the requested fields."""
+
+
+default_fields = ["title", "description", "extract"]
+# payload fields available through *fields* besides the default ones
+extended_fields = [
+    "pageid",
+    "revision",
+    "timestamp",
+    "thumbnail",
+    "coordinates",
+]
+
+
+class Projection:
+    """
+    A compiled list of fields to copy from a summary payload.
+
+    Fields are top-level payload keys, or dotted paths reaching into nested
+    objects, e.g. ``thumbnail.source``. Each field becomes one key of the
+    result, named as given. Fields missing from a payload are left out.
+
+    Args:
+        fields (list): Field names or dotted paths.
+
+    Example:
+
+        >>> projection = Projection(["title", "thumbnail.source"])
+        >>> projection.project(payload)
+        {'title': 'Chicago', 'thumbnail.source': 'https://upload...'}
+    """
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        self._keys = [field for field in self.fields if "." not in field]
+        self._paths = [
+            (field, field.split(".")) for field in self.fields if "." in field
+        ]
+        self.roots = frozenset(field.split(".")[0] for field in self.fields)
+
+    def project(self, data):
+        """Return a dict with the projected fields of *data*."""
+        result = {key: data[key] for key in self._keys if key in data}
+        for field, path in self._paths:
+            value = data
+            for key in path:
+                if not isinstance(value, dict) or key not in value:
+                    break
+                value = value[key]
+            else:
+                result[field] = value
+        return result
+
+
+default_projection = Projection(default_fields)
+
+
+def compile_fields(fields, compact=False):
+    """
+    Return a :py:class:`Projection` for *fields*, which may be one.
+
+    Raises:
+        ValueError
+            If *fields* is not a list of strings, or is combined with
+            *compact* results, which have a fixed set of fields.
+    """
+    if fields is None:
+        return default_projection
+    if compact:
+        raise ValueError("Invalid argument. Fields require compact=False.")
+    if isinstance(fields, Projection):
+        return fields
+    if isinstance(fields, str) or not all(
+        isinstance(field, str) for field in fields
+    ):
+        raise ValueError(
+            "Invalid argument. Fields must be a list of 'str' values."
+        )
+    return Projection(fields)
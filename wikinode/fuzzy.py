@@ -0,0 +1,338 @@
+"""
+Local resolution of misspelled and partial queries to page titles.
+
+Load the titles of a wiki once, e.g. from *enwiki-latest-all-titles-in-ns0.gz*,
+and queries missing an exact title are sent for the closest one instead::
+
+    >>> titles = TitleIndex.from_file("enwiki-latest-all-titles-in-ns0.gz")
+    >>> client = wikinode.Client(titles=titles)
+    >>> wikinode.fetch("pyhton programming languag", client=client)["title"]
+    'Python (programming language)'
+"""
+import array
+import gzip
+import heapq
+
+from wikinode.requests import DEFAULT_LANG, wiki_host
+from wikinode.stats import Counters
+from wikinode.titles import normalize
+
+
+DEFAULT_MAX_DISTANCE = 2
+DEFAULT_MIN_PREFIX = 4
+# leading characters of a query assumed typed right, as typos there are rare
+DEFAULT_PREFIX_LENGTH = 2
+# characters of a query per allowed edit
+CHARS_PER_EDIT = 4
+# bytes of a title's rank while the index is sorted
+RANK_BYTES = 4
+
+
+def _key(title):
+    # typos ignore case; canonical titles keep theirs
+    return " ".join(title.replace("_", " ").split()).casefold()
+
+
+class TitleIndex:
+    """
+    Page titles sorted by their case-folded form, searched by prefix and by
+    edit distance.
+
+    A query matching no title exactly, ignoring case, resolves to the most
+    popular title it is a prefix of, or else to the closest title starting
+    with the same *prefix_length* characters, within one edit per four
+    characters and at most *max_distance* edits. A transposition of two
+    adjacent letters counts as one edit. Ties go to the title listed first,
+    so list titles most popular first, e.g. by page views.
+
+    Titles are packed into a single UTF-8 buffer with arrays of offsets and
+    ranks, about 32 bytes per title, so the millions of titles of a large
+    wiki fit in memory.
+
+    Args:
+        titles (iterable): Page titles, such as the
+            :py:meth:`wikinode.offline.OfflineIndex.titles` of an index.
+        max_distance (int): Most edits between a query and its title.
+        min_prefix (int): Fewest characters of a query completed as a
+            prefix.
+        prefix_length (int): Leading characters of a query that must match
+            a title exactly for a misspelling to be corrected. Each one cuts
+            the titles searched by an order of magnitude.
+        strict (bool): Answer queries that resolve to no title as not
+            found, without a request. By default, they are sent as typed.
+        lang (str): Wikipedia edition the titles come from, as for
+            :py:func:`wikinode.summary.fetch`. Queries for other wikis are
+            not resolved.
+
+    Attributes:
+        stats (:py:class:`wikinode.stats.Counters`): *exact* queries,
+            misses *resolved* to another title and *unresolved* misses.
+
+    Example:
+
+        >>> titles = TitleIndex(["Python (programming language)", "Chicago"])
+        >>> titles.resolve("chicgo")
+        'Chicago'
+        >>> titles.resolve("python prog")
+        'Python (programming language)'
+        >>> titles.stats.snapshot()
+        {'exact': 0, 'resolved': 2, 'unresolved': 0}
+    """
+
+    def __init__(
+        self,
+        titles=(),
+        max_distance=DEFAULT_MAX_DISTANCE,
+        min_prefix=DEFAULT_MIN_PREFIX,
+        prefix_length=DEFAULT_PREFIX_LENGTH,
+        strict=False,
+        lang=DEFAULT_LANG,
+    ):
+        self.max_distance = max_distance
+        self.min_prefix = min_prefix
+        self.prefix_length = prefix_length
+        self.strict = strict
+        self.host = wiki_host(lang)
+        self.stats = Counters("exact", "resolved", "unresolved")
+        self._data = bytearray()
+        self._offsets = array.array("Q", [0])
+        self._ranks = array.array("I")
+        self._pack(titles)
+
+    def _pack(self, titles):
+        # one bytes object per title, sorting by key, then by rank, with
+        # no per-title key kept alive by the sort
+        entries = []
+        for rank, title in enumerate(titles):
+            title = normalize(title, self.host)
+            entries.append(
+                _key(title).encode("utf-8")
+                + b"\0"
+                + rank.to_bytes(RANK_BYTES, "big")
+                + title.encode("utf-8")
+            )
+        entries.sort()
+        last = None
+        for entry in entries:
+            separator = entry.index(b"\0")
+            key = entry[:separator]
+            if key == last:
+                # a title differing only by case keeps the earlier one
+                continue
+            last = key
+            rank = entry[separator + 1:separator + 1 + RANK_BYTES]
+            self._data += entry[separator + 1 + RANK_BYTES:]
+            self._offsets.append(len(self._data))
+            self._ranks.append(int.from_bytes(rank, "big"))
+
+    @classmethod
+    def from_file(cls, path, **options):
+        """
+        Return an index of the titles in *path*, one per line, optionally
+        gzipped. A *page_title* header line, as in Wikimedia title dumps,
+        is skipped.
+        """
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="UTF-8") as lines:
+            titles = (line.strip() for line in lines)
+            return cls(
+                (title for title in titles if title and title != "page_title"),
+                **options,
+            )
+
+    def _title(self, position):
+        start, end = self._offsets[position], self._offsets[position + 1]
+        return self._data[start:end].decode("utf-8")
+
+    def _key_at(self, position):
+        # stored titles are normalized, so folding the case gives the key
+        return self._title(position).casefold()
+
+    def _bisect(self, below, low, high):
+        # first position from low whose key is not below
+        while low < high:
+            middle = (low + high) // 2
+            if below(self._key_at(middle)):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _prefix_range(self, prefix, low=0, high=None):
+        """Return the positions of the keys starting with *prefix*."""
+        if high is None:
+            high = len(self._ranks)
+        start = self._bisect(lambda key: key < prefix, low, high)
+        end = self._bisect(
+            lambda key: key[:len(prefix)] <= prefix, start, high
+        )
+        return start, end
+
+    def _skip(self, prefix, position, end):
+        """
+        Return the first position after *position*, whose key starts with
+        *prefix*, holding a key that does not.
+        """
+        # pruned prefixes mostly cover a few titles, so gallop forward
+        # rather than bisect the whole range
+        step = 1
+        while position + step < end:
+            if not self._key_at(position + step).startswith(prefix):
+                break
+            position += step
+            step *= 2
+        high = min(position + step, end)
+        return self._bisect(
+            lambda key: key.startswith(prefix), position + 1, high
+        )
+
+    def _find(self, key):
+        position = self._bisect(lambda other: other < key, 0, len(self))
+        if position < len(self) and self._key_at(position) == key:
+            return position
+        return None
+
+    def complete(self, prefix, limit=10):
+        """Return up to *limit* titles starting with *prefix*, best first."""
+        start, end = self._prefix_range(_key(prefix))
+        best = heapq.nsmallest(
+            limit, zip(self._ranks[start:end], range(start, end))
+        )
+        return [self._title(position) for _, position in best]
+
+    def search(self, query, max_distance=None, limit=5):
+        """
+        Return up to *limit* ``(title, distance)`` pairs within
+        *max_distance* edits of *query*, closest and best ranked first.
+        Titles must start with the first *prefix_length* characters of
+        the query.
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        key = _key(query)
+        position, end = self._prefix_range(key[: self.prefix_length])
+        found = []
+        # rows of the distance table by depth, for the prefix the current
+        # title shares with the one before, as a trie walk would keep them
+        rows = [list(range(len(key) + 1))]
+        previous = ""
+        while position < end:
+            title = self._title(position)
+            candidate = title.casefold()
+            depth = _common_prefix(previous, candidate, len(rows) - 1)
+            del rows[depth + 1:]
+            pruned = False
+            while depth < len(candidate):
+                depth += 1
+                row = _row(
+                    key,
+                    candidate[depth - 1],
+                    candidate[depth - 2] if depth > 1 else None,
+                    rows[depth - 1],
+                    rows[depth - 2] if depth > 1 else None,
+                    depth,
+                    max_distance,
+                )
+                rows.append(row)
+                if min(row) > max_distance:
+                    pruned = True
+                    break
+            previous = candidate
+            if pruned:
+                # no title sharing this prefix is close enough
+                position = self._skip(candidate[:depth], position, end)
+                continue
+            if rows[-1][-1] <= max_distance:
+                found.append((rows[-1][-1], self._ranks[position], title))
+            position += 1
+        return [
+            (title, distance)
+            for distance, _, title in heapq.nsmallest(limit, found)
+        ]
+
+    def resolve(self, query):
+        """
+        Return the title *query* names, or None when no title is close.
+
+        Counts the outcome in :py:attr:`stats`.
+        """
+        key = _key(query)
+        position = self._find(key)
+        if position is not None:
+            self.stats.incr("exact")
+            return self._title(position)
+        title = None
+        if len(key) >= self.min_prefix:
+            completions = self.complete(key, limit=1)
+            title = completions[0] if completions else None
+        allowed = min(self.max_distance, len(key) // CHARS_PER_EDIT)
+        # closer matches need far fewer titles searched, so try them first
+        for distance in range(1, allowed + 1):
+            if title is not None:
+                break
+            matches = self.search(key, distance, limit=1)
+            title = matches[0][0] if matches else None
+        self.stats.incr("resolved" if title is not None else "unresolved")
+        return title
+
+    @property
+    def resolved_rate(self):
+        """Share of queries missing an exact title that were resolved."""
+        snapshot = self.stats.snapshot()
+        misses = snapshot["resolved"] + snapshot["unresolved"]
+        return snapshot["resolved"] / misses if misses else 0.0
+
+    @property
+    def nbytes(self):
+        """Bytes held by the packed titles, offsets and ranks."""
+        return (
+            len(self._data)
+            + self._offsets.itemsize * len(self._offsets)
+            + self._ranks.itemsize * len(self._ranks)
+        )
+
+    def __contains__(self, title):
+        return self._find(_key(title)) is not None
+
+    def __len__(self):
+        return len(self._ranks)
+
+
+def _common_prefix(first, second, limit):
+    length = 0
+    for a, b in zip(first[:limit], second):
+        if a != b:
+            break
+        length += 1
+    return length
+
+
+def _row(key, char, last, previous, before, depth, max_distance):
+    """
+    Return the row of the distance table between *key* and a title prefix
+    ending with *char* at *depth*, after *last*.
+
+    Only cells within *max_distance* of the diagonal are computed; the
+    others are larger than *max_distance* anyway.
+    """
+    outside = max_distance + 1
+    row = [outside] * (len(key) + 1)
+    if depth <= max_distance:
+        row[0] = depth
+    low = max(1, depth - max_distance)
+    high = min(len(key), depth + max_distance)
+    for j in range(low, high + 1):
+        distance = min(
+            previous[j] + 1,
+            row[j - 1] + 1,
+            previous[j - 1] + (key[j - 1] != char),
+        )
+        if (
+            before is not None
+            and j > 1
+            and char == key[j - 2]
+            and last == key[j - 1]
+        ):
+            distance = min(distance, before[j - 2] + 1)
+        row[j] = min(distance, outside)
+    return row
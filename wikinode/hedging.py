@@ -0,0 +1,102 @@
+"""Hedged requests against slow responses."""
+import threading
+from collections import deque
+
+from wikinode.stats import Counters
+
+
+DEFAULT_PERCENTILE = 95
+DEFAULT_HEDGE_DELAY = 0.5
+DEFAULT_WINDOW = 1000
+# latencies observed before the percentile replaces the initial delay
+MIN_SAMPLES = 20
+# latencies observed between two updates of the percentile
+UPDATE_INTERVAL = 32
+
+
+class HedgePolicy:
+    """
+    Decides when a client sends a second copy of a slow request.
+
+    A request that has not answered after the given percentile of recent
+    latencies is sent again, and the first answer wins. Only the slowest
+    requests are duplicated, so the extra load stays around
+    ``100 - percentile`` percent while the tail latency drops. When the
+    server slows down as a whole, the hedges are capped at *budget* of the
+    requests rather than doubling its load.
+
+    Args:
+        percentile (float): Percentile of recent latencies to wait before
+            hedging.
+        initial_delay (float): Seconds to wait before hedging until enough
+            latencies were observed.
+        window (int): Number of recent latencies the percentile is taken
+            over.
+        budget (float): Largest share of requests hedged. By default,
+            ``1 - percentile / 100``.
+
+    Attributes:
+        stats (:py:class:`wikinode.stats.Counters`): *hedged* requests and
+            the hedges that answered first (*won*).
+
+    Example:
+
+        >>> client = wikinode.Client(hedge=HedgePolicy(percentile=95))
+    """
+
+    def __init__(
+        self,
+        percentile=DEFAULT_PERCENTILE,
+        initial_delay=DEFAULT_HEDGE_DELAY,
+        window=DEFAULT_WINDOW,
+        budget=None,
+    ):
+        self.percentile = percentile
+        if budget is None:
+            budget = 1 - percentile / 100
+        self.budget = budget
+        self.initial_delay = initial_delay
+        self.stats = Counters("hedged", "won")
+        self._latencies = deque(maxlen=window)
+        self._observed = 0
+        self._delay = initial_delay
+        self._requests = 0
+        self._hedges = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        """Record the latency of a request that answered."""
+        with self._lock:
+            self._latencies.append(seconds)
+            self._observed += 1
+            observed = self._observed
+            if observed < MIN_SAMPLES:
+                return
+            # sorting the window on every response would cost too much
+            if observed > MIN_SAMPLES and observed % UPDATE_INTERVAL:
+                return
+            latencies = sorted(self._latencies)
+            index = round(self.percentile / 100 * (len(latencies) - 1))
+            self._delay = latencies[index]
+
+    def delay(self):
+        """Return the seconds to wait before hedging a request."""
+        return self._delay
+
+    def request(self):
+        """Record a request that may be hedged."""
+        with self._lock:
+            self._requests += 1
+
+    def allow(self):
+        """
+        Return True when one more hedge fits the budget, counting it as
+        *hedged*.
+        """
+        with self._lock:
+            # one hedge is allowed before the budget adds up to one
+            if self._hedges >= self.budget * self._requests + 1:
+                return False
+            self._hedges += 1
+        self.stats.incr("hedged")
+        return True
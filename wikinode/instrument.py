@@ -0,0 +1,188 @@
+"""Request timing hooks and metrics."""
+import threading
+import time
+from collections import namedtuple
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from wikinode.stats import Counters
+
+
+stages = ("connect", "ttfb", "download", "decompress", "decode")
+
+RequestEvent = namedtuple(
+    "RequestEvent",
+    "url status_code redirects retries connect ttfb download decompress"
+    " decode wire_bytes body_bytes",
+)
+RequestEvent.__doc__ = """
+Timings of one request, passed to every hook of
+:py:class:`Instruments`.
+
+Attributes:
+    url (str): Requested URL.
+    status_code (int): Status of the final response.
+    redirects (int): Redirects followed.
+    retries (int): Retries sent before the final response.
+    connect (float): Seconds spent resolving and connecting, including the
+        TLS handshake. Zero when a pooled connection was reused.
+    ttfb (float): Seconds from sending the request until the response
+        headers arrived.
+    download (float): Seconds spent reading the body.
+    decompress (float): Seconds spent decompressing the body.
+    decode (float): Seconds spent decoding the JSON body.
+    wire_bytes (int): Size of the body as sent, compressed or not.
+    body_bytes (int): Size of the decompressed body.
+"""
+
+_connect_time = threading.local()
+
+
+def _timed_connect(connection_class):
+    class TimedConnection(connection_class):
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                super().connect()
+            finally:
+                elapsed = time.perf_counter() - start
+                _connect_time.seconds = connect_seconds() + elapsed
+
+    return TimedConnection
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _timed_connect(HTTPConnection)
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _timed_connect(HTTPSConnection)
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTP adapter recording the time spent opening connections."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+def connect_seconds():
+    """Seconds this thread spent opening connections since the last reset."""
+    return getattr(_connect_time, "seconds", 0)
+
+
+def reset_connect_seconds():
+    _connect_time.seconds = 0
+
+
+class Instruments:
+    """
+    Hooks and counters observing every request a client sends.
+
+    Attach an instance to a :py:class:`wikinode.client.Client`; clients
+    without one skip all timing.
+
+    Attributes:
+        stats (:py:class:`wikinode.stats.Counters`): *requests*,
+            *status_<code>*, *redirects*, *retries*, *cache_hits*,
+            *cache_misses*, *titles_exact*, *titles_resolved* and
+            *titles_unresolved* counters, the total size of the bodies received
+            (*wire_bytes*) and decompressed (*body_bytes*), and the total
+            seconds spent in each stage (*connect_seconds*, *ttfb_seconds*,
+            *download_seconds*, *decompress_seconds* and *decode_seconds*).
+
+    Example:
+
+        >>> instruments = Instruments()
+        >>> instruments.add_hook(lambda event: print(event.ttfb))
+        >>> client = wikinode.Client(instruments=instruments)
+        >>> wikinode.fetch("hello world", client=client)
+        0.0421
+        >>> print(instruments.to_prometheus())
+    """
+
+    def __init__(self):
+        self.hooks = []
+        self.stats = Counters(
+            "requests",
+            "redirects",
+            "retries",
+            "cache_hits",
+            "cache_misses",
+            "titles_exact",
+            "titles_resolved",
+            "titles_unresolved",
+            "wire_bytes",
+            "body_bytes",
+            *(f"{stage}_seconds" for stage in stages),
+        )
+
+    def add_hook(self, hook):
+        """Call *hook* with a :py:class:`RequestEvent` after each request."""
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def record(self, event):
+        stats = self.stats
+        stats.incr("requests")
+        stats.incr(f"status_{event.status_code}")
+        stats.incr("redirects", event.redirects)
+        stats.incr("retries", event.retries)
+        stats.incr("wire_bytes", event.wire_bytes)
+        stats.incr("body_bytes", event.body_bytes)
+        for stage in stages:
+            stats.incr(f"{stage}_seconds", getattr(event, stage))
+        for hook in self.hooks:
+            hook(event)
+
+    def record_cache(self, hit):
+        self.stats.incr("cache_hits" if hit else "cache_misses")
+
+    def record_title(self, outcome):
+        """Count a title lookup: *exact*, *resolved* or *unresolved*."""
+        self.stats.incr(f"titles_{outcome}")
+
+    def snapshot(self):
+        """Return a copy of all counters."""
+        return self.stats.snapshot()
+
+    def to_prometheus(self, prefix="wikinode"):
+        """Return the counters in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = [f"# TYPE {prefix}_requests_total counter"]
+        for name, value in sorted(snapshot.items()):
+            if name.startswith("status_"):
+                code = name.replace("status_", "", 1)
+                lines.append(
+                    f'{prefix}_requests_total{{status="{code}"}} {value}'
+                )
+        for name in ("redirects", "retries", "cache_hits", "cache_misses"):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {snapshot[name]}")
+        lines.append(f"# TYPE {prefix}_title_lookups_total counter")
+        for outcome in ("exact", "resolved", "unresolved"):
+            value = snapshot[f"titles_{outcome}"]
+            lines.append(
+                f'{prefix}_title_lookups_total{{outcome="{outcome}"}} {value}'
+            )
+        lines.append(f"# TYPE {prefix}_response_bytes_total counter")
+        for size in ("wire", "body"):
+            value = snapshot[f"{size}_bytes"]
+            lines.append(
+                f'{prefix}_response_bytes_total{{size="{size}"}} {value}'
+            )
+        lines.append(f"# TYPE {prefix}_stage_seconds_total counter")
+        for stage in stages:
+            value = snapshot[f"{stage}_seconds"]
+            lines.append(
+                f'{prefix}_stage_seconds_total{{stage="{stage}"}} {value}'
+            )
+        return "\n".join(lines) + "\n"
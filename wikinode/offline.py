@@ -0,0 +1,303 @@
+"""
+Local summary index built from a Wikipedia dump, read through mmap.
+
+Build an index once::
+
+    $ python -m wikinode.offline enwiki-latest-abstract.xml.gz enwiki.idx \
+        --redirects redirects.tsv
+
+then answer queries without the network::
+
+    >>> client = wikinode.Client(index=OfflineIndex("enwiki.idx"))
+    >>> wikinode.fetch("hello world", client=client)
+"""
+import argparse
+import gzip
+import json
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from xml.etree import ElementTree
+
+from wikinode.decoding import keep_fields, loads
+from wikinode.fields import default_fields, extended_fields
+from wikinode.requests import DEFAULT_LANG, wiki_host
+from wikinode.titles import normalize
+
+
+MAGIC = b"WKNIDX1\0"
+# magic, number of entries, offsets of the index, titles and payloads
+HEADER = struct.Struct("<8sQQQQ")
+# title offset and length, payload offset and length, kind
+ENTRY = struct.Struct("<QIQIB3x")
+STANDARD, DISAMBIGUATION, REDIRECT = 0, 1, 2
+# redirects followed before giving up on a loop
+MAX_REDIRECTS = 5
+payload_fields = ("type", *default_fields, *extended_fields)
+disambiguation_endings = ("may refer to:", "may also refer to:")
+
+
+def _open(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def read_abstracts(path):
+    """
+    Yield summary payloads from a Wikipedia abstracts dump, such as
+    *enwiki-latest-abstract.xml.gz*.
+
+    Pages whose title ends with "(disambiguation)" or whose abstract ends
+    with "may refer to:" are disambiguation pages.
+    """
+    with _open(path) as dump:
+        events = ElementTree.iterparse(dump, events=("start", "end"))
+        _, root = next(events)
+        for event, element in events:
+            if event != "end" or element.tag != "doc":
+                continue
+            title = element.findtext("title", "")
+            title = title.replace("Wikipedia: ", "", 1)
+            extract = (element.findtext("abstract") or "").strip()
+            # the feed keeps every doc read so far unless it is cleared
+            root.clear()
+            payload_type = "standard"
+            if title.endswith("(disambiguation)") or extract.endswith(
+                disambiguation_endings
+            ):
+                payload_type = "disambiguation"
+            yield {"type": payload_type, "title": title, "extract": extract}
+
+
+def read_summaries(path):
+    """
+    Yield records from a file of JSON lines, e.g. REST summary payloads.
+
+    A line such as ``{"redirect": "Leningrad", "title": "Saint
+    Petersburg"}`` is a redirect.
+    """
+    with _open(path) as lines:
+        for line in lines:
+            if line.strip():
+                yield loads(line)
+
+
+def read_redirects(path):
+    """Yield redirects from a file of ``alias<TAB>target`` lines."""
+    with _open(path) as lines:
+        for line in lines:
+            line = line.decode("utf-8").rstrip("\n")
+            alias, _, target = line.partition("\t")
+            if target:
+                yield {"redirect": alias, "title": target}
+
+
+def build(records, path, lang=DEFAULT_LANG):
+    """
+    Write an index of *records* to *path*.
+
+    Args:
+        records (iterable): Summary payloads and redirects, as yielded by
+            :py:func:`read_abstracts`, :py:func:`read_summaries` and
+            :py:func:`read_redirects`. A later record for the same title
+            replaces an earlier one.
+        path (str): Location of the index file.
+        lang (str): Wiki the records come from, as for
+            :py:class:`OfflineIndex`. Titles are normalized the way it
+            normalizes them.
+
+    Returns:
+        (int): Number of titles in the index.
+    """
+    host = wiki_host(lang)
+    entries = {}
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.TemporaryFile(dir=directory) as payloads:
+        offset = 0
+        for record in records:
+            if "redirect" in record:
+                key = normalize(record["redirect"], host)
+                body = normalize(record["title"], host).encode("utf-8")
+                kind = REDIRECT
+            else:
+                key = normalize(record["title"], host)
+                data = keep_fields(record, payload_fields)
+                body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+                kind = STANDARD
+                if data.get("type") == "disambiguation":
+                    kind = DISAMBIGUATION
+            payloads.write(body)
+            entries[key.encode("utf-8")] = (offset, len(body), kind)
+            offset += len(body)
+        keys = sorted(entries)
+        index_offset = HEADER.size
+        titles_offset = index_offset + ENTRY.size * len(keys)
+        payloads_offset = titles_offset + sum(len(key) for key in keys)
+        with open(path, "wb") as index:
+            index.write(
+                HEADER.pack(
+                    MAGIC,
+                    len(keys),
+                    index_offset,
+                    titles_offset,
+                    payloads_offset,
+                )
+            )
+            title_offset = titles_offset
+            for key in keys:
+                body_offset, length, kind = entries[key]
+                index.write(
+                    ENTRY.pack(
+                        title_offset,
+                        len(key),
+                        payloads_offset + body_offset,
+                        length,
+                        kind,
+                    )
+                )
+                title_offset += len(key)
+            for key in keys:
+                index.write(key)
+            payloads.seek(0)
+            shutil.copyfileobj(payloads, index)
+    return len(keys)
+
+
+class OfflineIndex:
+    """
+    Read-only summary index built by :py:func:`build`.
+
+    The file is memory-mapped, so processes opening the same index share
+    its pages through the operating system's page cache. Lookups binary
+    search the title-sorted entries and take microseconds. Redirects are
+    followed and disambiguation pages keep their type, so results have the
+    same shapes as those of the REST API.
+
+    Args:
+        path (str): Location of the index file.
+        fallback (bool): Request titles missing from the index from
+            Wikipedia. By default, they are reported as not found and the
+            network is never used.
+        lang (str): Wikipedia edition the dump was taken from, as for
+            :py:func:`wikinode.summary.fetch`. Queries for other wikis do not
+            use the index.
+
+    Example:
+
+        >>> index = OfflineIndex("enwiki.idx")
+        >>> client = wikinode.Client(index=index)
+        >>> wikinode.fetch_many(queries, client=client)
+    """
+
+    def __init__(self, path, fallback=False, lang=DEFAULT_LANG):
+        self.path = os.path.expanduser(path)
+        self.fallback = fallback
+        self.host = wiki_host(lang)
+        with open(self.path, "rb") as index:
+            self._mmap = mmap.mmap(index.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count, self._index_offset, _, _ = HEADER.unpack_from(
+            self._mmap
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a wikinode index.")
+
+    def _entry(self, position):
+        return ENTRY.unpack_from(
+            self._mmap, self._index_offset + position * ENTRY.size
+        )
+
+    def _find(self, key):
+        data = self._mmap
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            entry = self._entry(middle)
+            title = data[entry[0]:entry[0] + entry[1]]
+            if title < key:
+                low = middle + 1
+            elif title > key:
+                high = middle
+            else:
+                return entry
+        return None
+
+    def payload(self, title):
+        """
+        Return the summary payload of the normalized *title*, following
+        redirects, or None when the index does not know the title.
+        """
+        key = title.encode("utf-8")
+        for _ in range(MAX_REDIRECTS + 1):
+            entry = self._find(key)
+            if entry is None:
+                return None
+            _, _, offset, length, kind = entry
+            body = self._mmap[offset:offset + length]
+            if kind != REDIRECT:
+                return loads(body)
+            key = body
+        return None
+
+    def __contains__(self, title):
+        key = normalize(title, self.host).encode("utf-8")
+        return self._find(key) is not None
+
+    def __len__(self):
+        return self._count
+
+    def titles(self):
+        """Yield every title of the index, redirects included, in order."""
+        for position in range(self._count):
+            entry = self._entry(position)
+            yield self._mmap[entry[0]:entry[0] + entry[1]].decode("utf-8")
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m wikinode.offline",
+        description="Build a local summary index from a Wikipedia dump.",
+    )
+    parser.add_argument(
+        "dump",
+        help="abstracts dump (.xml) or summary payloads (.ndjson), "
+        "optionally gzipped",
+    )
+    parser.add_argument("output", help="index file to write")
+    parser.add_argument(
+        "--redirects", help="file of alias<TAB>target redirect lines"
+    )
+    parser.add_argument(
+        "--lang",
+        default=DEFAULT_LANG,
+        help="language code or host of the wiki the dump was taken from",
+    )
+    options = parser.parse_args(argv)
+    name = options.dump[:-3] if options.dump.endswith(".gz") else options.dump
+    if name.endswith(".xml"):
+        records = read_abstracts(options.dump)
+    else:
+        records = read_summaries(options.dump)
+
+    def all_records():
+        yield from records
+        if options.redirects:
+            yield from read_redirects(options.redirects)
+
+    count = build(all_records(), options.output, lang=options.lang)
+    print(f"{count} titles written to {options.output}")
+
+
+if __name__ == "__main__":
+    main()
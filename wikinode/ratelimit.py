@@ -0,0 +1,111 @@
+"""Client-side rate limiting and retry backoff."""
+import email.utils
+import random
+import threading
+import time
+
+
+DEFAULT_RATE = 100
+DEFAULT_BURST = 50
+DEFAULT_MIN_RATE = 1
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_MAX_BACKOFF = 30
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every request a client sends.
+
+    The rate adapts to the server: it is halved whenever Wikipedia pushes
+    back (HTTP 429 or 503) and climbs back towards *rate* with every
+    successful response.
+
+    Args:
+        rate (float): Maximum number of requests per second.
+        burst (int): Number of requests that can be sent at once after an
+            idle period.
+        min_rate (float): Lowest rate the limiter backs off to.
+
+    Example:
+
+        >>> client = wikinode.Client(limiter=RateLimiter(rate=20, burst=5))
+    """
+
+    def __init__(
+        self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, min_rate=DEFAULT_MIN_RATE
+    ):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._paused_until = 0
+        self._lock = threading.Lock()
+
+    def clone(self):
+        """Return a new limiter with the same settings and a full bucket."""
+        return RateLimiter(self.max_rate, self.burst, self.min_rate)
+
+    def reserve(self):
+        """Take a token and return the seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = max(0, -self._tokens / self.rate)
+            return max(wait, self._paused_until - now)
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def backoff(self, pause=0):
+        """Halve the rate and hold all requests for *pause* seconds."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            resume = time.monotonic() + pause
+            self._paused_until = max(self._paused_until, resume)
+
+    def recover(self):
+        """Raise the rate by one percent of its maximum."""
+        if self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 100)
+
+
+def parse_retry_after(value):
+    """Return the delay in seconds requested by a *Retry-After* header."""
+    if not value:
+        return None
+    try:
+        return max(0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0, date.timestamp() - time.time())
+
+
+def retry_delay(
+    attempt,
+    retry_after=None,
+    backoff_factor=DEFAULT_BACKOFF_FACTOR,
+    max_backoff=DEFAULT_MAX_BACKOFF,
+):
+    """
+    Return the seconds to wait before retry number *attempt* (from zero).
+
+    A delay requested by the server is honored; otherwise the delay is a
+    random fraction of an exponentially growing window.
+    """
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(max_backoff, backoff_factor * 2 ** attempt))
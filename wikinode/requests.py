@@ -1,3 +1,36 @@
-API_URL = "https://en.wikipedia.org/api/rest_v1/page/summary"
-RANDOM_SUMMARY_URL = "https://en.wikipedia.org/api/rest_v1/page/random/summary"
+DEFAULT_LANG = "en"
 USER_AGENT = "wikinode (https://github.com/rvlz/wikinode)"
+
+
+def wiki_host(lang):
+    """
+    Return the host of the Wikipedia edition in language *lang*.
+
+    A value containing a dot is taken as the host of another wiki.
+
+    Example:
+
+        >>> wiki_host("fr")
+        'fr.wikipedia.org'
+        >>> wiki_host("en.wiktionary.org")
+        'en.wiktionary.org'
+    """
+    return lang if "." in lang else f"{lang}.wikipedia.org"
+
+
+def summary_url(lang=DEFAULT_LANG):
+    return f"https://{wiki_host(lang)}/api/rest_v1/page/summary"
+
+
+def random_summary_url(lang=DEFAULT_LANG):
+    return f"https://{wiki_host(lang)}/api/rest_v1/page/random/summary"
+
+
+def action_api_url(lang=DEFAULT_LANG):
+    return f"https://{wiki_host(lang)}/w/api.php"
+
+
+DEFAULT_HOST = wiki_host(DEFAULT_LANG)
+API_URL = summary_url()
+RANDOM_SUMMARY_URL = random_summary_url()
+ACTION_API_URL = action_api_url()
@@ -0,0 +1,49 @@
+"""Deduplication of identical calls running at the same time."""
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Run a function once for all concurrent callers asking for the same key.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for its result instead of running it again.
+
+    Example:
+
+        >>> flights = SingleFlight()
+        >>> flights.do("Hello world", lambda: send("Hello world"))
+        (<payload>, False)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, timeout=None):
+        """
+        Return ``(result, shared)`` where *shared* is True when the result
+        came from a call started by another caller.
+
+        Callers joining a call in flight wait at most *timeout* seconds, then
+        :py:class:`concurrent.futures.TimeoutError` is raised.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        if not leader:
+            return call.result(timeout), True
+        try:
+            result = fn()
+        except BaseException as exc:
+            call.set_exception(exc)
+            raise
+        else:
+            call.set_result(result)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return result, False
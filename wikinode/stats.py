@@ -0,0 +1,38 @@
+"""Thread-safe counters used to report wikinode statistics."""
+import threading
+
+
+class Counters:
+    """
+    A set of named counters that can be incremented from many threads.
+
+    Args:
+        *names (str): Counters reported as zero before their first increment.
+
+    Example:
+
+        >>> counters = Counters("hits", "misses")
+        >>> counters.incr("hits")
+        >>> counters.snapshot()
+        {'hits': 1, 'misses': 0}
+    """
+
+    def __init__(self, *names):
+        self._lock = threading.Lock()
+        self._values = dict.fromkeys(names, 0)
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + amount
+
+    def __getitem__(self, name):
+        return self._values.get(name, 0)
+
+    def snapshot(self):
+        """Return a copy of all counter values."""
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self):
+        with self._lock:
+            self._values = dict.fromkeys(self._values, 0)
@@ -1,35 +1,315 @@
-import requests
+import time
+from collections import namedtuple
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    TimeoutError,
+    as_completed,
+    wait,
+)
 
+from wikinode import action
+from wikinode.client import get_default_client
+from wikinode.decoding import keep_fields
+from wikinode.fields import (
+    compile_fields,
+    default_fields,
+    default_projection,
+    extended_fields,
+)
 from wikinode.requests import (
     API_URL,
+    DEFAULT_HOST,
     RANDOM_SUMMARY_URL,
-    USER_AGENT,
+    random_summary_url,
+    summary_url,
+    wiki_host,
+)
+from wikinode.exceptions import (
+    QueryAmbiguousError,
+    RequestFailedError,
+    RequestTimeoutError,
 )
-from wikinode.exceptions import QueryAmbiguousError
+from wikinode.titles import (
+    normalize,
+    page_key,
+    quote_title,
+    title_from_url,
+)
+
+
+DEFAULT_WORKERS = 8
+# articles of a disambiguation page summarized when a query is expanded
+DEFAULT_MAX_CANDIDATES = 20
+# random batches in a row adding no sample before sampling stops
+MAX_IDLE_BATCHES = 10
+
+
+# only these answers describe the page; anything else is worth retrying
+cacheable_status_codes = (200, 404)
+
+
+def _payload_fields(client):
+    return ("type", *default_fields, *extended_fields, *client.extra_fields)
+
+
+def _projection(fields, client, compact=False):
+    projection = compile_fields(fields, compact)
+    missing = projection.roots.difference(_payload_fields(client))
+    if missing:
+        raise ValueError(
+            f"Invalid argument. Fields {sorted(missing)} are not kept by the "
+            "client; add them to its 'extra_fields'."
+        )
+    return projection
+
+
+def _count(stats, name):
+    if stats is not None:
+        stats.incr(name)
+
+
+def _query_url(title, host=DEFAULT_HOST):
+    base = API_URL if host == DEFAULT_HOST else summary_url(host)
+    return f"{base}/{quote_title(title)}?redirect=true"
+
+
+def _host(lang, client):
+    return client.host if lang is None else wiki_host(lang)
+
 
+def _read_index(title, client, stats):
+    data = client.index.payload(title)
+    if data is None and client.index.fallback:
+        return None
+    _count(stats, "indexed")
+    # titles missing from the index are answered like a 404
+    return data if data is not None else {}
 
-default_fields = ["title", "description", "extract"]
 
+def _resolve_title(title, host, client, stats):
+    # None when a strict title index knows no page for the query
+    titles = client.titles
+    if titles is None or titles.host != host:
+        return title
+    resolved = titles.resolve(title)
+    outcome = "exact" if resolved == title else "resolved"
+    if resolved is None:
+        outcome = "unresolved"
+    elif outcome == "resolved":
+        _count(stats, "resolved")
+    if client.instruments is not None:
+        client.instruments.record_title(outcome)
+    if resolved is None and not titles.strict:
+        return title
+    return resolved
 
-def _send_query(query):
-    url = f"{API_URL}/{query}?redirect=true"
-    response = requests.get(url, headers={"User-Agent": USER_AGENT})
-    return response.json()
 
+def _send_query(
+    query, client, stats=None, refresh=False, deadline=None, lang=None
+):
+    host = _host(lang, client)
+    title = client.aliases.resolve(query, host)
+    title = _resolve_title(title, host, client, stats)
+    if title is None:
+        _count(stats, "unresolved")
+        return {}
+    if client.index is not None and client.index.host == host:
+        data = _read_index(title, client, stats)
+        if data is not None:
+            return data
+    timeout = None
+    if deadline is not None:
+        timeout = max(deadline - time.monotonic(), 0)
+    try:
+        data, shared = client.flights.do(
+            page_key(title, host),
+            lambda: _read_through(
+                title, client, stats, refresh, deadline, host
+            ),
+            timeout=timeout,
+        )
+    except TimeoutError:
+        # joined a call for the same page that did not finish in time
+        raise RequestTimeoutError(_query_url(title, host), timeout) from None
+    if shared:
+        _count(stats, "coalesced")
+    return data
 
-def _send_request(url):
-    response = requests.get(url, headers={"User-Agent": USER_AGENT})
-    return response.json()
 
+def _read_through(
+    title, client, stats, refresh=False, deadline=None, host=DEFAULT_HOST
+):
+    cache = client.cache
+    key = page_key(title, host)
+    entry = None
+    headers = None
+    if cache is not None:
+        entry = cache.lookup(key)
+        if client.instruments is not None:
+            client.instruments.record_cache(entry is not None and entry.fresh)
+        if entry is not None and entry.fresh and not refresh:
+            _count(stats, "cached")
+            return entry.data
+        if entry is not None and entry.etag is not None:
+            headers = {"If-None-Match": entry.etag}
+    url = _query_url(title, host)
+    response, data = client.get_json(url, headers=headers, deadline=deadline)
+    if response.status_code == 304 and entry is not None:
+        cache.touch(key)
+        _count(stats, "revalidated")
+        return entry.data
+    data = keep_fields(data, _payload_fields(client))
+    _count(stats, "downloaded")
+    if response.history and response.status_code == 200:
+        # later queries for the alias skip the redirect and share the entry
+        canonical = title_from_url(response.url)
+        client.aliases.learn(title, canonical, host)
+        key = page_key(canonical, host)
+    if cache is not None and response.status_code in cacheable_status_codes:
+        cache.set(key, data, etag=response.headers.get("ETag"))
+    return data
 
-def _select_subset(data, fields=default_fields, extra=None):
-    subset = {k: data[k] for k in data if k in fields}
-    if extra is not None:
-        subset = {**subset, **extra}
-    return subset
 
+def _send_request(url, client):
+    _, data = client.get_json(url)
+    return keep_fields(data, _payload_fields(client))
 
-def fetch(query, short=False):
+
+class Summary:
+    """
+    Compact summary, returned instead of a dict when *compact* is set.
+
+    Instances have no per-object dict, so they take a fraction of the
+    memory of the equivalent dict. Fields missing from the summary are None.
+
+    Attributes:
+        query (str): The query, None for random summaries.
+        title (str): Article title.
+        description (str): Short description.
+        extract (str): First paragraph of the article, None when *short*.
+
+    Example:
+
+        >>> result = wikinode.fetch("hello world", compact=True)
+        >>> result.title
+        '"Hello, World!" program'
+        >>> result.to_dict()
+        {
+          'query': 'hello world',
+          'title': '"Hello, World!" program',
+          'description': "Traditional beginners' computer program",
+          'extract': 'A "Hello, World!" program generally is a computer...'
+        }
+    """
+
+    __slots__ = ("query", "title", "description", "extract")
+
+    def __init__(self, query=None, title=None, description=None, extract=None):
+        self.query = query
+        self.title = title
+        self.description = description
+        self.extract = extract
+
+    def to_dict(self):
+        """Return the dict the non-compact API returns for this summary."""
+        return {
+            name: getattr(self, name)
+            for name in self.__slots__
+            if getattr(self, name) is not None
+        }
+
+    def replace(self, **fields):
+        """Return a copy with the given fields replaced."""
+        return Summary(**{**self.to_dict(), **fields})
+
+    def __eq__(self, other):
+        if not isinstance(other, Summary):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={v!r}" for k, v in self.to_dict().items())
+        return f"Summary({fields})"
+
+
+def _parse_summary(
+    data, short=False, query=None, compact=False, projection=None
+):
+    payload_type = data.get("type")
+    summary = {}
+    if payload_type == "standard" and compact:
+        summary = Summary(
+            query=query,
+            title=data.get("title"),
+            description=data.get("description"),
+            extract=None if short else data.get("extract"),
+        )
+    elif payload_type == "standard":
+        projection = projection or default_projection
+        summary = projection.project(data)
+        if query is not None:
+            summary["query"] = query
+        if short:
+            summary.pop("extract", None)
+    elif payload_type == "disambiguation" and query is not None:
+        raise QueryAmbiguousError(query)
+    return summary
+
+
+def _candidates(title, client, options, deadline=None, lang=None):
+    """
+    Return summaries of the articles the disambiguation page *title*
+    lists, requested concurrently, or None when its links failed to load.
+    """
+    limit = options.get("max_candidates", DEFAULT_MAX_CANDIDATES)
+    try:
+        titles = action.send_links(
+            title, client, limit=limit, lang=lang, deadline=deadline
+        )
+    except RequestFailedError:
+        return None
+    titles = titles[:limit]
+
+    def load(candidate):
+        try:
+            data = _send_query(
+                candidate,
+                client,
+                stats=options.get("stats"),
+                deadline=deadline,
+                lang=lang,
+            )
+        except RequestFailedError:
+            return {}
+        # nested disambiguation pages parse to nothing without a query
+        return _parse_summary(
+            data,
+            short=options.get("short", False),
+            compact=options.get("compact", False),
+            projection=options.get("fields"),
+        )
+
+    if not titles:
+        return []
+    workers = min(len(titles), DEFAULT_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        summaries = list(executor.map(load, titles))
+    return [summary for summary in summaries if summary]
+
+
+def fetch(
+    query,
+    short=False,
+    client=None,
+    stats=None,
+    compact=False,
+    fields=None,
+    timeout=None,
+    lang=None,
+    expand=False,
+    max_candidates=DEFAULT_MAX_CANDIDATES,
+):
     """
     Request a single summary.
 
@@ -37,6 +317,35 @@ def fetch(query, short=False):
         query (str): Search term to find an article summary.
         short (bool): Exclude *extract* field from returned result.
             By default, the 'extract' field is included.
+        client (:py:class:`wikinode.client.Client`): Client used to send the
+            request. By default, a shared client created on first use.
+        stats (:py:class:`wikinode.stats.Counters`): Counters updated with
+            how the summary was obtained: *cached* (fresh cache entry),
+            *revalidated* (stale cache entry confirmed unchanged by the
+            server), *downloaded* (full response received), *coalesced*
+            (shared with a concurrent call for the same page), *indexed*
+            (answered by the client's offline index), *resolved* (query
+            matched to a title by the client's title index) or
+            *unresolved* (no title matched by a strict title index).
+        compact (bool): Return a :py:class:`Summary` instead of a dict.
+        fields (list): Payload fields to return instead of *title*,
+            *description* and *extract*. Besides those, *pageid*,
+            *revision*, *timestamp*, *thumbnail* and *coordinates* are
+            available, as are the client's *extra_fields*. Dotted paths such
+            as ``thumbnail.source`` pick nested values and keep the path as
+            their key. Fields missing from the payload are omitted.
+        timeout (float): Seconds the call may take, retries included. The
+            connect and read timeouts of every request are cut to what is
+            left. By default, only the client's timeouts apply.
+        lang (str): Language code of the Wikipedia edition to search, such
+            as ``"fr"``, or the host of another wiki. By default, the
+            client's *lang*.
+        expand (bool): When the query names a disambiguation page, request
+            the summaries of the articles it lists, concurrently, and attach
+            them to the raised error as *candidates*. Candidates that failed
+            or are not articles are left out.
+        max_candidates (int): Most articles of a disambiguation page
+            summarized when *expand* is set.
 
     Returns:
         (dict): Result contains the fields *query*, *title*, *description*,
@@ -45,6 +354,11 @@ def fetch(query, short=False):
     Raises:
         :py:class:`wikinode.exceptions.QueryAmbiguousError`
             If more than one article summary corresponds to the search term.
+            With *expand*, its *candidates* hold their summaries.
+        :py:class:`wikinode.exceptions.RequestFailedError`
+            If Wikipedia keeps answering with an error after all retries.
+        :py:class:`wikinode.exceptions.RequestTimeoutError`
+            If Wikipedia did not answer in time.
 
     Example:
 
@@ -61,34 +375,278 @@ def fetch(query, short=False):
           'title': '"Hello, World!" program',
           'description': "Traditional beginners' computer program"
         }
+        >>> wikinode.fetch("hello world", fields=["pageid", "revision"])
+        {'query': 'hello world', 'pageid': 13834, 'revision': '1001867466'}
+        >>> wikinode.fetch("Paris", lang="fr", fields=["description"])
+        {'query': 'Paris', 'description': 'capitale de la France'}
+        >>> try:
+        ...     wikinode.fetch("mercury", short=True, expand=True)
+        ... except QueryAmbiguousError as exc:
+        ...     [candidate["title"] for candidate in exc.candidates]
+        ['Mercury (element)', 'Mercury (mythology)', 'Mercury (planet)', ...]
     """
     if not isinstance(query, str):
         raise ValueError("Invalid argument. Argument must have type 'str'.")
-    data = _send_query(query)
-    payload_type = data.get("type")
-    summary = {}
-    if payload_type == "standard":
-        summary = _select_subset(data, extra={"query": query})
-        if short:
-            del summary["extract"]
-    elif payload_type == "disambiguation":
-        raise QueryAmbiguousError(query)
-    return summary
+    client = client or get_default_client()
+    projection = _projection(fields, client, compact)
+    deadline = None
+    if timeout is not None:
+        deadline = time.monotonic() + timeout
+    data = _send_query(
+        query, client, stats=stats, deadline=deadline, lang=lang
+    )
+    try:
+        return _parse_summary(
+            data,
+            short=short,
+            query=query,
+            compact=compact,
+            projection=projection,
+        )
+    except QueryAmbiguousError as exc:
+        if expand:
+            options = {
+                "short": short,
+                "compact": compact,
+                "fields": projection,
+                "stats": stats,
+                "max_candidates": max_candidates,
+            }
+            exc.candidates = _candidates(
+                data["title"], client, options, deadline, lang
+            )
+        raise
+
+
+def _split_query(query):
+    # a query is a string, or a (query, lang) pair naming its wiki
+    if isinstance(query, str):
+        return query, None
+    if (
+        isinstance(query, tuple)
+        and len(query) == 2
+        and all(isinstance(part, str) for part in query)
+    ):
+        return query
+    raise ValueError(
+        "Invalid argument. Queries must be strings or (query, lang) pairs."
+    )
+
+
+def _page(query, options):
+    # host and normalized title naming the page a query is for
+    query, lang = _split_query(query)
+    client = options.get("client") or get_default_client()
+    host = _host(lang or options.get("lang"), client)
+    return host, normalize(query, host)
+
+
+def _try_fetch(query, short, options, deadline=None):
+    query, lang = _split_query(query)
+    if lang is not None:
+        options = {**options, "lang": lang}
+    if deadline is not None:
+        # the batch deadline caps the timeout of every query
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            host, title = _page(query, options)
+            return RequestTimeoutError(_query_url(title, host), 0)
+        timeout = options.get("timeout")
+        if timeout is not None:
+            remaining = min(remaining, timeout)
+        options = {**options, "timeout": remaining}
+    try:
+        return fetch(query, short=short, **options)
+    except (QueryAmbiguousError, RequestFailedError) as exc:
+        return exc
+
+
+def _gather(futures, pages, deadline):
+    timeout = None
+    if deadline is not None:
+        timeout = max(deadline - time.monotonic(), 0)
+    done, _ = wait(futures, timeout=timeout)
+    outcomes = []
+    for future, (host, title) in zip(futures, pages):
+        if future in done:
+            outcomes.append(future.result())
+            continue
+        future.cancel()
+        outcomes.append(RequestTimeoutError(_query_url(title, host), timeout))
+    return outcomes
+
+
+def _share(result, query):
+    query, _ = _split_query(query)
+    if isinstance(result, QueryAmbiguousError):
+        return QueryAmbiguousError(query, result.candidates)
+    if isinstance(result, RequestFailedError):
+        return result
+    if isinstance(result, Summary):
+        return result.replace(query=query)
+    if result:
+        result = {**result, "query": query}
+    return result
+
+
+def _status(result):
+    if isinstance(result, QueryAmbiguousError):
+        return "ambiguous"
+    if isinstance(result, RequestTimeoutError):
+        return "timed_out"
+    if isinstance(result, RequestFailedError):
+        return "failed"
+    if result == {}:
+        return "not_found"
+    return "hit"
 
 
-def fetch_many(queries, short=False, meta=False):
+def _collect(queries, outcomes, meta, expand=False):
+    meta_data = {
+        "hits": 0,
+        "not_found": [],
+        "ambiguous": [],
+        "failed": [],
+        "timed_out": [],
+    }
+    if expand:
+        meta_data["candidates"] = {}
+    results = []
+    for query, result in zip(queries, outcomes):
+        status = _status(result)
+        if status == "ambiguous" and result.candidates is not None:
+            meta_data["candidates"][query] = result.candidates
+        if status != "hit":
+            meta_data[status].append(query)
+            continue
+        meta_data["hits"] += 1
+        results.append(result)
+    if meta:
+        results = {**meta_data, "results": results}
+    return results
+
+
+def _roots(projection):
+    return None if projection is None else projection.roots
+
+
+def _fetch_bulk(queries, short, max_workers, options):
+    client = options.get("client") or get_default_client()
+    stats = options.get("stats")
+    # host and title sent for each query; None when a strict title index
+    # knows no page for it
+    targets = []
+    groups = {}
+    for query in queries:
+        host, title = _page(query, options)
+        text, _ = _split_query(query)
+        resolved = _resolve_title(title, host, client, stats)
+        if resolved is None:
+            _count(stats, "unresolved")
+            targets.append(None)
+            continue
+        if resolved != title:
+            text = resolved
+        targets.append((host, text))
+        groups.setdefault(host, {})[text] = None
+
+    def fetch_host(host, group):
+        return action.fetch_payloads(
+            list(group),
+            client,
+            short=short,
+            max_workers=max_workers,
+            stats=options.get("stats"),
+            fields=_roots(options.get("fields")),
+            lang=host,
+        )
+
+    # every wiki has its own Action API; wikis are requested concurrently
+    if len(groups) <= 1:
+        payloads = {
+            host: fetch_host(host, group) for host, group in groups.items()
+        }
+    else:
+        with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+            futures = {
+                host: executor.submit(fetch_host, host, group)
+                for host, group in groups.items()
+            }
+        payloads = {host: future.result() for host, future in futures.items()}
+    outcomes = []
+    for query, target in zip(queries, targets):
+        if target is None:
+            outcomes.append({})
+            continue
+        host, title = target
+        text, _ = _split_query(query)
+        data = payloads[host][title]
+        if isinstance(data, RequestFailedError):
+            outcomes.append(data)
+            continue
+        try:
+            summary = _parse_summary(
+                data,
+                short=short,
+                query=text,
+                compact=options.get("compact", False),
+                projection=options.get("fields"),
+            )
+            outcomes.append(summary)
+        except QueryAmbiguousError as exc:
+            if options.get("expand"):
+                expand_options = {**options, "short": short}
+                exc.candidates = _candidates(
+                    data["title"], client, expand_options, lang=host
+                )
+            outcomes.append(exc)
+    return outcomes
+
+
+def fetch_many(
+    queries,
+    short=False,
+    meta=False,
+    max_workers=None,
+    bulk=False,
+    deadline=None,
+    **options,
+):
     """
     Request multiple summaries.
 
     Args:
         queries (list): A list of strings, each representing a single query.
+            A ``(query, lang)`` pair searches the Wikipedia edition in
+            *lang* instead, so one batch can mix languages.
         short (bool): Exclude the *extract* field from all successful results.
             By default, the 'extract' field is included.
         meta (bool): Include data about the batch of queries. The added keys
             include *hits* (number of successful queries), *not_found* (queries
-            that have no corresponding article), and *ambiguous* (queries that
-            have more than one corresponding article). The *results* key has
-            the summary data.
+            that have no corresponding article), *ambiguous* (queries that
+            have more than one corresponding article), *failed* (queries
+            Wikipedia kept answering with an error), and *timed_out*
+            (queries not answered in time). The *results* key has the
+            summary data. With *expand*, *candidates* maps each ambiguous
+            query to the summaries of the articles it may refer to.
+        max_workers (int): Number of threads used to send requests
+            concurrently. By default, queries are requested one at a time.
+            Results keep the order of *queries* either way.
+            Queries naming the same page are requested only once. Each wiki
+            gets its own *max_workers* threads.
+        bulk (bool): Request up to 50 titles at a time through the MediaWiki
+            Action API instead of one request per query. Extracts come from
+            the article's introduction and may be longer than those of the
+            REST API. Page properties none of the *fields* need, such as
+            extracts, are not requested, which keeps responses small.
+        deadline (float): Seconds the whole batch may take. Queries not
+            answered by then are reported as timed out and the results
+            received so far are returned. Does not apply in *bulk* mode.
+        **options: Passed to :py:func:`fetch` for every query, e.g. *client*,
+            *stats*, *compact*, *fields*, *lang* or *expand*. When the
+            client has a cache, cached queries are answered without a
+            request and only the misses reach the network. In *bulk* mode,
+            *pageid* is the only extended field available.
 
     Returns:
         (list): Each result contains the fields *query*, *title*,
@@ -117,6 +675,8 @@ def fetch_many(queries, short=False, meta=False):
           'hits': 2,
           'not_found': ['123hello'],  # Couldn't find summary for "123hello"
           'ambiguous': [],  # no ambiguous query
+          'failed': [],  # no server errors
+          'timed_out': [],  # every query answered in time
           'results': [
             {
               'query': 'hello world',
@@ -132,34 +692,156 @@ def fetch_many(queries, short=False, meta=False):
             }
           ]
         }
+        >>> wikinode.fetch_many(
+        ...     [("Paris", "fr"), ("Berlin", "de"), "London"],
+        ...     fields=["description"],
+        ...     max_workers=8,
+        ... )
+        [
+          {'query': 'Paris', 'description': 'capitale de la France'},
+          {'query': 'Berlin', 'description': 'Hauptstadt von Deutschland'},
+          {'query': 'London', 'description': 'Capital city of England...'}
+        ]
     """
     if not isinstance(queries, list):
         raise ValueError("Invalid argument. Argument must have type 'list'.")
-    meta_data = {"hits": 0, "not_found": [], "ambiguous": []}
-    results = []
     for query in queries:
-        try:
-            result = fetch(query, short=short)
-        except QueryAmbiguousError:
-            meta_data["ambiguous"].append(query)
-            continue
-        if result == {}:
-            meta_data["not_found"].append(query)
-            continue
-        meta_data["hits"] += 1
-        results.append(result)
-    if meta:
-        results = {**meta_data, "results": results}
-    return results
+        _split_query(query)
+    options = _compile_options(options)
+    if deadline is not None:
+        deadline = time.monotonic() + deadline
+    # first query naming each page
+    distinct = {}
+    for query in queries:
+        distinct.setdefault(_page(query, options), query)
+    if bulk:
+        outcomes = _fetch_bulk(
+            list(distinct.values()), short, max_workers, options
+        )
+    elif max_workers is None:
+        outcomes = [
+            _try_fetch(query, short, options, deadline)
+            for query in distinct.values()
+        ]
+    else:
+        # a pool per wiki, so a throttled wiki does not take every thread
+        executors = {
+            host: ThreadPoolExecutor(max_workers=max_workers)
+            for host, _ in distinct
+        }
+        futures = [
+            executors[host].submit(
+                _try_fetch, query, short, options, deadline
+            )
+            for (host, _), query in distinct.items()
+        ]
+        outcomes = _gather(futures, list(distinct), deadline)
+        for executor in executors.values():
+            # requests still in flight end by the deadline on their own
+            executor.shutdown(wait=deadline is None)
+    by_page = dict(zip(distinct, outcomes))
+    outcomes = (
+        _share(by_page[_page(query, options)], query) for query in queries
+    )
+    expand = options.get("expand", False)
+    return _collect(queries, outcomes, meta, expand)
+
 
+def _compile_options(options):
+    # compile the projection once for the whole batch
+    if options.get("fields") is None:
+        return options
+    client = options.get("client") or get_default_client()
+    projection = _projection(
+        options["fields"], client, options.get("compact", False)
+    )
+    return {**options, "fields": projection}
 
-def fetch_random(short=False):
+
+FetchResult = namedtuple("FetchResult", "query status summary")
+FetchResult.__doc__ = """
+A summary yielded by :py:func:`iter_fetch`.
+
+Attributes:
+    query (str): The query as given.
+    status (str): *hit*, *not_found*, *ambiguous*, *failed* or *timed_out*.
+    summary (dict): The summary, empty unless *status* is *hit*.
+"""
+
+
+def iter_fetch(queries, short=False, max_workers=DEFAULT_WORKERS, **options):
+    """
+    Request summaries for a stream of queries, yielding them as they arrive.
+
+    Queries are read lazily, and at most *max_workers* requests are in
+    flight, so memory does not grow with the number of queries. Results come
+    in completion order, not input order.
+
+    Args:
+        queries (iterable): Strings, each representing a single query, or
+            ``(query, lang)`` pairs as for :py:func:`fetch_many`. Any
+            iterable works, e.g. an open file with one query per line.
+        short (bool): Exclude the *extract* field from all successful results.
+        max_workers (int): Number of threads sending requests concurrently.
+        **options: Passed to :py:func:`fetch` for every query, e.g. *client*.
+
+    Yields:
+        (:py:class:`FetchResult`): The query, its status and its summary.
+
+    Example:
+
+        >>> with open("titles.txt") as titles:
+        ...     for result in wikinode.iter_fetch(
+        ...         line.strip() for line in titles
+        ...     ):
+        ...         print(result.status, result.query)
+        hit hello world
+        not_found 123hello
+    """
+    options = _compile_options(options)
+    outcomes = _iter_outcomes(
+        lambda query: _try_fetch(query, short, options), queries, max_workers
+    )
+    for query, outcome in outcomes:
+        yield _fetch_result(query, outcome)
+
+
+def _iter_outcomes(fetch, queries, max_workers):
+    # yields (query, fetch(query)) pairs in completion order
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        for query in queries:
+            pending[executor.submit(fetch, query)] = query
+            if len(pending) < max_workers:
+                continue
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+        for future in as_completed(pending):
+            yield pending[future], future.result()
+
+
+def _fetch_result(query, result):
+    status = _status(result)
+    summary = result if status == "hit" else {}
+    return FetchResult(query, status, summary)
+
+
+def fetch_random(
+    short=False, client=None, compact=False, fields=None, lang=None
+):
     """
     Request a random summary.
 
     Args:
         short (bool): Exclude *extract* field from returned result.
             By default, the 'extract' field is included.
+        client (:py:class:`wikinode.client.Client`): Client used to send the
+            request. By default, a shared client created on first use.
+        compact (bool): Return a :py:class:`Summary` instead of a dict.
+        fields (list): Payload fields to return, as for :py:func:`fetch`.
+        lang (str): Wikipedia edition to sample, as for :py:func:`fetch`.
+
     Returns:
         (dict): Result contains the fields *title*, *description*,
         and *extract*, which can be omitted.
@@ -178,11 +860,109 @@ def fetch_random(short=False):
           'description': "Traditional beginners' computer program"
         }
     """
-    data = _send_request(RANDOM_SUMMARY_URL)
-    payload_type = data.get("type")
-    if payload_type == "standard":
-        summary = _select_subset(data)
-        if short:
-            del summary["extract"]
-        return summary
-    return {}
+    client = client or get_default_client()
+    projection = _projection(fields, client, compact)
+    host = _host(lang, client)
+    url = RANDOM_SUMMARY_URL
+    if host != DEFAULT_HOST:
+        url = random_summary_url(host)
+    data = _send_request(url, client)
+    return _parse_summary(
+        data, short=short, compact=compact, projection=projection
+    )
+
+
+def fetch_random_many(
+    n,
+    unique=True,
+    short=False,
+    max_workers=DEFAULT_WORKERS,
+    client=None,
+    compact=False,
+    fields=None,
+    lang=None,
+):
+    """
+    Request *n* random summaries, yielding them as they arrive.
+
+    Articles are sampled through the MediaWiki Action API, up to 50 per
+    batch, with up to *max_workers* batches in flight, so far fewer requests
+    are sent than with :py:func:`fetch_random`. Like with bulk
+    :py:func:`fetch_many`, extracts come from the article's introduction.
+
+    Args:
+        n (int): Number of summaries to yield.
+        unique (bool): Skip articles already yielded, by page ID. On a
+            wiki with fewer articles than *n*, sampling stops once
+            :py:data:`MAX_IDLE_BATCHES` batches in a row added no new
+            article, so fewer than *n* summaries may be yielded.
+        short (bool): Exclude the *extract* field from all results. Batches
+            without extracts need a single request each.
+        max_workers (int): Number of batches requested concurrently.
+        client (:py:class:`wikinode.client.Client`): Client used to send the
+            requests. By default, a shared client created on first use.
+        compact (bool): Yield :py:class:`Summary` objects instead of dicts.
+        fields (list): Payload fields to return, as for :py:func:`fetch`.
+            Of the extended fields, only *pageid* is available.
+        lang (str): Wikipedia edition to sample, as for :py:func:`fetch`.
+
+    Yields:
+        (dict): Summaries with the fields *title*, *description*, and
+        *extract*, which can be omitted. Fewer than *n* when batches stop
+        adding samples, e.g. because they come back empty.
+
+    Raises:
+        :py:class:`wikinode.exceptions.RequestFailedError`
+            If Wikipedia keeps answering with an error after all retries.
+
+    Example:
+
+        >>> samples = list(wikinode.fetch_random_many(1000, short=True))
+        >>> len(samples)
+        1000
+    """
+    client = client or get_default_client()
+    projection = _projection(fields, client, compact)
+    seen = set()
+    count = 0
+    idle = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        try:
+            while count < n and idle < MAX_IDLE_BATCHES:
+                # only request the batches still needed
+                missing = -(-(n - count) // action.MAX_TITLES)
+                while len(pending) < min(max_workers, missing):
+                    pending.add(
+                        executor.submit(
+                            action.send_random_batch,
+                            client,
+                            size=action.MAX_TITLES,
+                            short=short,
+                            fields=projection.roots,
+                            lang=lang,
+                        )
+                    )
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    before = count
+                    for data in future.result():
+                        if count == n:
+                            break
+                        if unique:
+                            if data.get("pageid") in seen:
+                                continue
+                            seen.add(data.get("pageid"))
+                        summary = _parse_summary(
+                            data,
+                            short=short,
+                            compact=compact,
+                            projection=projection,
+                        )
+                        if summary:
+                            count += 1
+                            yield summary
+                    idle = idle + 1 if count == before else 0
+        finally:
+            for future in pending:
+                future.cancel()
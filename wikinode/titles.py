@@ -0,0 +1,141 @@
+"""Helpers for turning search terms into Wikipedia titles."""
+import json
+import os
+import threading
+from urllib.parse import quote, unquote, urlparse
+
+from wikinode.requests import DEFAULT_HOST
+
+
+# projects whose titles may start with a lowercase letter
+CASE_SENSITIVE_PROJECTS = (".wiktionary.org",)
+
+
+def case_sensitive(host):
+    """
+    Return True when page titles of the wiki at *host* keep the case of
+    their first letter, as on Wiktionary, where *apple* and *Apple* are
+    different entries.
+    """
+    return host.endswith(CASE_SENSITIVE_PROJECTS)
+
+
+def normalize(query, host=DEFAULT_HOST):
+    """
+    Normalize a query the way the wiki at *host* normalizes page titles.
+
+    Underscores become spaces, runs of whitespace are collapsed and the
+    first letter is capitalized, unless the wiki is :py:func:`case
+    sensitive <case_sensitive>`, so queries naming the same page share a
+    single key.
+
+    Example:
+
+        >>> normalize("  hello_world ")
+        'Hello world'
+        >>> normalize("apple", "en.wiktionary.org")
+        'apple'
+    """
+    title = " ".join(query.replace("_", " ").split())
+    if case_sensitive(host):
+        return title
+    return title[:1].upper() + title[1:]
+
+
+def quote_title(title):
+    """
+    Encode a normalized title as the last segment of a REST API URL.
+
+    Spaces become underscores, like in Wikipedia URLs, and every reserved
+    character, including ``/``, ``?`` and ``#``, is percent-encoded.
+
+    Example:
+
+        >>> quote_title("AC/DC")
+        'AC%2FDC'
+    """
+    return quote(title.replace(" ", "_"), safe="")
+
+
+def title_from_url(url):
+    """Return the normalized title named by the last segment of *url*."""
+    parts = urlparse(url)
+    title = unquote(parts.path.rsplit("/", 1)[-1])
+    return normalize(title, parts.hostname or DEFAULT_HOST)
+
+
+def page_key(title, host=DEFAULT_HOST):
+    """
+    Return the key naming the page *title* of the wiki at *host* in caches.
+
+    Pages of the default English Wikipedia are keyed by title alone, so
+    keys stored before other wikis were supported stay valid.
+
+    Example:
+
+        >>> page_key("Paris", "fr.wikipedia.org")
+        'fr.wikipedia.org:Paris'
+    """
+    return title if host == DEFAULT_HOST else f"{host}:{title}"
+
+
+class AliasMap:
+    """
+    Aliases of page titles learned from redirects, such as *Leningrad* for
+    *Saint Petersburg*.
+
+    Once an alias is known, queries for it go straight to the canonical
+    title, saving the redirect round trip. Aliases are kept in memory and,
+    when *path* is given, appended to a file of JSON lines loaded again by
+    later processes. Aliases of different wikis are kept apart.
+
+    Args:
+        path (str): File the aliases are stored in. It is created if
+            needed. By default, aliases are only kept in memory.
+
+    Example:
+
+        >>> aliases = AliasMap("~/.cache/wikinode-aliases.jsonl")
+        >>> client = wikinode.Client(aliases=aliases)
+        >>> wikinode.fetch("Leningrad", client=client)  # redirected
+        >>> aliases.get("Leningrad")
+        'Saint Petersburg'
+        >>> wikinode.fetch("leningrad", client=client)  # single request
+    """
+
+    def __init__(self, path=None):
+        self.path = os.path.expanduser(path) if path is not None else None
+        self._titles = {}
+        self._lock = threading.Lock()
+        if self.path is not None and os.path.exists(self.path):
+            with open(self.path, encoding="UTF-8") as lines:
+                for line in lines:
+                    # a line cut short by a crash is skipped
+                    try:
+                        alias, title = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._titles[alias] = title
+
+    def get(self, alias, host=DEFAULT_HOST):
+        """Return the canonical title for the normalized *alias*, or None."""
+        return self._titles.get(page_key(alias, host))
+
+    def learn(self, alias, title, host=DEFAULT_HOST):
+        """Record that the normalized *alias* redirects to *title*."""
+        key = page_key(alias, host)
+        if alias == title or self._titles.get(key) == title:
+            return
+        with self._lock:
+            self._titles[key] = title
+            if self.path is not None:
+                with open(self.path, "a", encoding="UTF-8") as lines:
+                    lines.write(json.dumps([key, title]) + "\n")
+
+    def resolve(self, query, host=DEFAULT_HOST):
+        """Return the canonical title of *query*, normalized."""
+        title = normalize(query, host)
+        return self._titles.get(page_key(title, host), title)
+
+    def __len__(self):
+        return len(self._titles)
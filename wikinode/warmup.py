@@ -0,0 +1,193 @@
+"""Background filling and refreshing of the summary cache."""
+import heapq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from wikinode.client import get_default_client
+from wikinode.stats import Counters
+from wikinode.summary import _send_query
+from wikinode.titles import normalize, page_key
+
+
+DEFAULT_PREFETCH_WORKERS = 4
+
+
+class Prefetcher:
+    """
+    Handle of a running :py:func:`prefetch`.
+
+    Attributes:
+        total (int): Number of distinct titles to prefetch.
+        stats (:py:class:`wikinode.stats.Counters`): *fetched* and *failed*
+            titles of the first pass, and *refreshed* and *refresh_failed*
+            entries of later passes.
+    """
+
+    def __init__(
+        self,
+        titles,
+        client,
+        max_workers=DEFAULT_PREFETCH_WORKERS,
+        refresh_ahead=None,
+    ):
+        cache = client.cache
+        if cache is None:
+            raise ValueError("Invalid argument. Client must have a cache.")
+        if refresh_ahead is not None and refresh_ahead >= cache.ttl:
+            raise ValueError(
+                "Invalid argument. refresh_ahead must be shorter than the "
+                "cache TTL."
+            )
+        # first title naming each page
+        distinct = {}
+        for title in titles:
+            distinct.setdefault(normalize(title, client.host), title)
+        self.titles = list(distinct.values())
+        self.total = len(self.titles)
+        self.client = client
+        self.max_workers = max_workers
+        self.refresh_ahead = refresh_ahead
+        self.stats = Counters(
+            "fetched", "failed", "refreshed", "refresh_failed"
+        )
+        self._filled = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def completed(self):
+        """Number of titles of the first pass done, fetched or failed."""
+        return self.stats["fetched"] + self.stats["failed"]
+
+    @property
+    def progress(self):
+        """Fraction of the first pass done, between 0 and 1."""
+        return self.completed / self.total if self.total else 1.0
+
+    def done(self):
+        """Return True once every title was prefetched once."""
+        return self._filled.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Wait until every title was prefetched once.
+
+        Returns:
+            (bool): False if *timeout* seconds passed first.
+        """
+        return self._filled.wait(timeout)
+
+    def stop(self, wait=True):
+        """Stop prefetching; requests in flight are completed."""
+        self._stopped.set()
+        if wait:
+            self._thread.join()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _fetch(self, title, refresh=False):
+        # titles queued before a stop are skipped
+        if self._stopped.is_set():
+            return title, None
+        try:
+            data = _send_query(title, self.client, refresh=refresh)
+        except Exception:
+            return title, None
+        return title, data
+
+    def _due(self, title, data):
+        entry = None
+        if data is not None:
+            host = self.client.host
+            key = page_key(self.client.aliases.resolve(title, host), host)
+            entry = self.client.cache.lookup(key)
+        if entry is None:
+            # retry failures while the entry may still be fresh
+            return time.monotonic() + self.refresh_ahead
+        # entries already cached keep their own expiry
+        fresh_for = entry.expires_at - time.time()
+        wait = max(fresh_for - self.refresh_ahead, fresh_for / 2, 0)
+        return time.monotonic() + wait
+
+    def _run(self):
+        schedule = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(self._fetch, self.titles)
+            for title, data in results:
+                self.stats.incr("fetched" if data is not None else "failed")
+                if self.refresh_ahead is not None:
+                    heapq.heappush(schedule, (self._due(title, data), title))
+                if self._stopped.is_set():
+                    break
+            self._filled.set()
+            while schedule and not self._stopped.is_set():
+                due = schedule[0][0]
+                if self._stopped.wait(max(due - time.monotonic(), 0)):
+                    break
+                titles = []
+                while schedule and schedule[0][0] <= time.monotonic():
+                    titles.append(heapq.heappop(schedule)[1])
+                for title, data in executor.map(
+                    lambda title: self._fetch(title, refresh=True), titles
+                ):
+                    if data is None:
+                        self.stats.incr("refresh_failed")
+                    else:
+                        self.stats.incr("refreshed")
+                    heapq.heappush(schedule, (self._due(title, data), title))
+
+    def __repr__(self):
+        return (
+            f"<Prefetcher {self.completed}/{self.total}"
+            f" refreshed={self.stats['refreshed']}>"
+        )
+
+
+def prefetch(
+    titles,
+    client=None,
+    max_workers=DEFAULT_PREFETCH_WORKERS,
+    refresh_ahead=None,
+):
+    """
+    Fill the client's cache with summaries of *titles* in the background.
+
+    Returns immediately; :py:func:`wikinode.summary.fetch` keeps serving
+    requests meanwhile, and a fetch for a title being prefetched shares its
+    request. Titles already fresh in the cache are not requested.
+
+    Args:
+        titles (list): Titles expected to be requested, e.g. the hot set of
+            a service.
+        client (:py:class:`wikinode.client.Client`): Client whose cache is
+            filled. By default, the shared client, which must have been
+            given a cache with :py:func:`wikinode.client.set_default_client`.
+        max_workers (int): Number of requests in flight at once.
+        refresh_ahead (float): Seconds before a cache entry expires to
+            request it again, so hot titles never miss the cache. Entries
+            carrying an ETag are revalidated with a conditional request. By
+            default, titles are only prefetched once.
+
+    Returns:
+        (:py:class:`Prefetcher`): Handle reporting progress; stop it to end
+        the refreshing.
+
+    Raises:
+        ValueError
+            If the client has no cache, or *refresh_ahead* is not shorter
+            than the cache TTL.
+
+    Example:
+
+        >>> client = wikinode.Client(cache=MemoryCache(ttl=3600))
+        >>> warmup = wikinode.prefetch(hot_titles, client, refresh_ahead=60)
+        >>> warmup.wait(timeout=30)
+        True
+        >>> warmup
+        <Prefetcher 5000/5000 refreshed=0>
+    """
+    client = client or get_default_client()
+    return Prefetcher(titles, client, max_workers, refresh_ahead).start()